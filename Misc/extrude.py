@@ -1,14 +1,53 @@
-import bpy
-import math
+import os
+import sys
 import numpy as np
 
-def v_index(i, j, n):
-    return i * n + j
+# The shared mesh helpers live in the Submission package, found as in
+# Submission/__init__.py when run from a text block
+path = os.path.abspath(__file__)
+if not os.path.exists(path):
+    import bpy
+    text = bpy.data.texts.get(os.path.basename(path))
+    path = bpy.path.abspath(text.filepath if text and text.filepath else "//" + os.path.basename(path))
+sys.path.append(os.path.dirname(os.path.dirname(path)))
+
+from Submission.geometry import morph
+from Submission.topology import ring_strip_topology
+from Submission import profiles
+from Submission.mesh_upload import new_mesh_object
+from Submission.mesh_cache import MeshCache, interpolation_key
+
+# Upload meshes through flat foreach_set buffers rather than Mesh.from_pydata
+USE_BULK_UPLOAD = True
+
+# Reuse meshes from earlier runs when the inputs haven't changed (bulk
+# upload only); set to None to always regenerate
+MESH_CACHE = MeshCache()
+
+def morph_mesh(key_vertices, iterations, keys=None, easing="linear"):
+    # Lofts through a sequence of equally sized vertex rings (e.g. circle ->
+    # square -> hexagon) in iterations steps; see geometry.morph for keys
+    # and easing
+    key = interpolation_key(key_vertices, iterations, keys, easing) if MESH_CACHE is not None else None
+    cached = MESH_CACHE.get(key) if key else None
+
+    if cached:
+        vertices, faces, edges = cached
+    else:
+        t = np.arange(iterations + 1) * 1.0 / iterations
+        vertices = morph(key_vertices, t, keys, easing).reshape(-1, 3)
+        faces, edges = ring_strip_topology(iterations + 1, len(key_vertices[0]))
+        if key:
+            MESH_CACHE.put(key, vertices, faces, edges)
+
+    new_mesh_object(vertices, faces, edges)
 
 def interpolate_mesh(start_vertices, end_vertices, iterations):
+    if USE_BULK_UPLOAD:
+        morph_mesh([start_vertices, end_vertices], iterations)
+        return
+
     vertices = []
-    edges = []
-    faces = []
 
     difference_vectors = end_vertices - start_vertices
     n = len(start_vertices)
@@ -22,27 +61,12 @@ def interpolate_mesh(start_vertices, end_vertices, iterations):
 
             vertices.append(list(vertex))
 
-    for i in range(0, iterations + 1):
-        for j in range(0, n):
-            bottom_left = v_index(i, j, n)
-            bottom_right = v_index(i, (j + 1) % n, n)
-
-            edges.append([bottom_left, bottom_right])
+    faces, edges = ring_strip_topology(iterations + 1, n)
 
-            if i < iterations:
-                top_left = v_index(i + 1, j, n)
-                top_right = v_index(i + 1, (j+1) % n, n)
-
-                edges += [
-                    [bottom_left, top_left], 
-                    [bottom_right, top_right], 
-                    [top_left, top_right]
-                ]
-
-                faces.append([bottom_left, bottom_right, top_right, top_left])
+    import bpy
 
     new_mesh = bpy.data.meshes.new('new_mesh')
-    new_mesh.from_pydata(vertices, edges, faces)
+    new_mesh.from_pydata(vertices, edges.tolist(), faces.tolist())
     new_mesh.update()
 
     new_object = bpy.data.objects.new('new_object', new_mesh)
@@ -52,61 +76,29 @@ def interpolate_mesh(start_vertices, end_vertices, iterations):
 
     new_collection.objects.link(new_object)
 
-def make_circle(x, y, z, r, n):
-    center = np.array([x, y, z])
-    theta = 2 * math.pi / n
-    vertices = []
-    for i in range(0, n):
-        xi = r * math.cos(i * theta) + center[0]
-        yi = r * math.sin(i * theta) + center[1]
-        zi = z
-        pi = np.array([xi, yi, zi])
-        vertices.append(pi)
-    return np.array(vertices)
-
-def make_square(x,y,z,r,n):
-    center = np.array([x,y,z])
-    theta = 2 * math.pi / n
-    side_offset = math.pi / 2
-    offset = math.pi / 4
-    vertices = []
+def profile_at(profile, x, y, z):
+    # A 2D profile from profiles.py laid flat at height z, centred on (x, y)
+    return np.column_stack([profile[:, 0] + x, profile[:, 1] + y, np.full(len(profile), z, dtype=np.float64)])
 
-    for i in range(0, n):
-        side = int(i * 4 / n)
-        ri = r / math.sqrt(2) / math.cos(i * theta - side * side_offset - offset)
-        xi = ri * math.cos(i * theta) + center[0]
-        yi = ri * math.sin(i * theta) + center[1]
-        zi = z
-        pi = np.array([xi, yi, zi])
-        vertices.append(pi)
-    return np.array(vertices)
-
-def make_hexagon(x,y,z,r,n):
-    center = np.array([x,y,z])
-    theta = 2 * math.pi / n
-    side_offset = math.pi / 3
-    offset = math.pi / 6
-    vertices = []
+def main():
+    c1 = profile_at(profiles.circle(1, 100), 0, 0, 0)
+    c2 = profile_at(profiles.circle(2, 100), 0, 0, 10)
+
+    c3 = profile_at(profiles.circle(1, 100), 10, 0, 0)
+    s1 = profile_at(profiles.square(2, 100), 10, 0, 10)
+
+    s2 = profile_at(profiles.square(1, 100), 0, 10, 0)
+    h1 = profile_at(profiles.hexagon(2, 100), 0, 10, 10)
+
+    interpolate_mesh(c1, c2, 20)
+    interpolate_mesh(c3,s1,20)
+    interpolate_mesh(s2, h1, 20)
+
+    c4 = profile_at(profiles.circle(1, 96), 10, 10, 0)
+    s3 = profile_at(profiles.square(1.5, 96), 10, 10, 10)
+    h2 = profile_at(profiles.hexagon(1, 96), 10, 10, 20)
+
+    morph_mesh([c4, s3, h2], 40, easing="smoothstep")
 
-    for i in range(0, n):
-        side = int(i * 6 / n)
-        ri = r / math.cos(i * theta - side * side_offset - offset)
-        xi = ri * math.cos(i * theta) + center[0]
-        yi = ri * math.sin(i * theta) + center[1]
-        zi = z
-        pi = np.array([xi, yi, zi])
-        vertices.append(pi)
-    return np.array(vertices)
-    
-c1 = make_circle(0, 0, 0, 1, 100)
-c2 = make_circle(0,0,10,2,100)
-
-c3 = make_circle(10,0,0,1,100)
-s1 = make_square(10,0,10,2,100)
-
-s2 = make_square(0,10,0,1,100)
-h1 = make_hexagon(0,10,10,2,100)
-
-interpolate_mesh(c1, c2, 20)
-interpolate_mesh(c3,s1,20)
-interpolate_mesh(s2, h1, 20)
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,39 @@
-import bpy
+texture_names = ["Fire",  "Marble", "Turbulence", "Water"]
 
 
-texture_names = ["Fire",  "Marble", "Turbulence", "Water"]
+def setup_materials():
+    # Nothing happens on import; run the script (or call this) inside Blender
+    import bpy
+
+    for name in texture_names:
+        mat_name = name
 
+        # Test if material exists
+        # If it does not exist, create it:
+        mat = (bpy.data.materials.get(mat_name) or 
+            bpy.data.materials.new(mat_name))
 
-for name in texture_names:
-    mat_name = name
+        # Enable 'Use nodes':
+        mat.use_nodes = True
+        nodes = mat.node_tree.nodes
+        links = mat.node_tree.links
 
-    # Test if material exists
-    # If it does not exist, create it:
-    mat = (bpy.data.materials.get(mat_name) or 
-        bpy.data.materials.new(mat_name))
+        # Remove any old nodes that exist in material
+        for node in nodes:
+            nodes.remove(node)
 
-    # Enable 'Use nodes':
-    mat.use_nodes = True
-    nodes = mat.node_tree.nodes
-    links = mat.node_tree.links
+        # Create new nodes
+        scriptNode = nodes.new('ShaderNodeScript')
+        scriptNode.location = (0,0)
+        scriptNode.script = bpy.data.texts[name.lower() + ".osl"]
 
-    # Remove any old nodes that exist in material
-    for node in nodes:
-        nodes.remove(node)
+        outNode = nodes.new("ShaderNodeOutputMaterial")
+        outNode.location = (200,0)
 
-    # Create new nodes
-    scriptNode = nodes.new('ShaderNodeScript')
-    scriptNode.location = (0,0)
-    scriptNode.script = bpy.data.texts[name.lower() + ".osl"]
 
-    outNode = nodes.new("ShaderNodeOutputMaterial")
-    outNode.location = (200,0)
+        # Connect the two nodes
+        links.new(scriptNode.outputs[0], outNode.inputs[0])
 
 
-    # Connect the two nodes
-    links.new(scriptNode.outputs[0], outNode.inputs[0])
+if __name__ == "__main__":
+    setup_materials()
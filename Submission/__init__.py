@@ -0,0 +1,30 @@
+# The shell code, importable as a package (import Submission) and runnable
+# as loose scripts inside Blender. Modules import each other relatively, so
+# every module is loaded once, as Submission.<name>. Blender doesn't put a
+# script's directory on the path, so the scripts meant to be run directly
+# (sweep.py, batch.py, genTexture.py, bake.py) start with the same guard:
+#
+#   if not __package__:
+#       path = os.path.abspath(__file__)
+#       if not os.path.exists(path):
+#           ...
+#       sys.path.append(os.path.dirname(os.path.dirname(path)))
+#       __package__ = "Submission"
+#
+# which makes this package importable and runs the script as part of it.
+# Run from Blender's text editor, __file__ is "<file>.blend/<text name>",
+# so the guard goes by the file the text block is linked to instead, or
+# failing that by a file of the same name next to the .blend: keep the
+# .blend in Submission/ or Misc/, or link its text blocks to the scripts
+# here (Text > Open, without "Make Internal").
+# Nothing imported here needs bpy: mesh upload, baking and the demo shells
+# (sweep.main) only import it when they are called.
+
+from .growth import GrowthFunction, Constant, Linear, Quadratic, Power, Piecewise, from_spec
+from .geometry import (
+    Vector2, Vector3, Vec3Array, coiling_axis, homotopy, morph, Morph,
+    generate_sweep_array, generate_sweep_adaptive, iterate_sweep, sweep_lods,
+    sweep_surface, ring_fingerprints,
+)
+from .topology import ring_strip_topology
+from . import profiles
@@ -0,0 +1,366 @@
+import math
+import os
+import sys
+import numpy as np
+
+if not __package__:
+    # Run as a loose script, from its file or a text block; see __init__.py
+    path = os.path.abspath(__file__)
+    if not os.path.exists(path):
+        import bpy
+        text = bpy.data.texts.get(os.path.basename(path))
+        path = bpy.path.abspath(text.filepath if text and text.filepath else "//" + os.path.basename(path))
+    sys.path.append(os.path.dirname(os.path.dirname(path)))
+    __package__ = "Submission"
+
+from .noise import PerlinNoiseFactory
+from .topology import ring_strip_corners
+
+# CPU versions of the shaders in shaders/, evaluated over whole arrays of
+# points so a texture can be baked to images once instead of running the
+# turbulence loop per shading sample on every render. The noise is our own
+# 4D Perlin noise rather than OSL's, so the patterns have the same character
+# but are not pixel-identical to the OSL script nodes. Only the functions
+# that write images and materials import bpy; the shaders and samplers run
+# anywhere.
+
+texture_names = ["Fire",  "Marble", "Turbulence", "Water"]
+
+# Cycles image textures, stored as float EXR since the shaders are not
+# limited to [0, 1]
+IMAGE_FORMAT = 'OPEN_EXR'
+IMAGE_EXTENSION = ".exr"
+
+perlin = PerlinNoiseFactory(4, seed=0)
+
+# Defaults of the shaders' use_uv, uv_radius and uv_length (see
+# surface_point in shaders/turbulence.h): world space unless asked for
+USE_UV = False
+UV_RADIUS = 2.0
+UV_LENGTH = 40.0
+
+def noise(points, time):
+    # noise("perlin", point, time) for an (N, 3) array of points
+    points_4d = np.empty((len(points), 4), dtype=np.float64)
+    points_4d[:, :3] = points
+    points_4d[:, 3] = time
+    return perlin.noise_array(points_4d)
+
+def smoothstep(edge0, edge1, x):
+    t = np.clip((x - edge0) / (edge1 - edge0), 0.0, 1.0)
+    return t * t * (3.0 - 2.0 * t)
+
+def mix(low, high, blend):
+    blend = blend[..., None]
+    return low * (1.0 - blend) + high * blend
+
+def turbulence_pixelsize(pixelsize):
+    # Ensure that the pixel size is between 0 and 1, not inclusive
+    return min(max(0.000001, pixelsize), 0.999999)
+
+def turbulence_octaves(pixelsize):
+    # Octaves at scales 1, 1/2, 1/4, ... above the pixel size
+    return int(math.ceil(-math.log2(turbulence_pixelsize(pixelsize))))
+
+def turbulence_fixed(points, time, octaves):
+    t = np.zeros(len(points), dtype=np.float64)
+    for i in range(octaves):
+        t += np.abs(noise(points * 2.0 ** i, time)) * 0.5 ** i
+    return t
+
+def turbulence(points, pixelsize, time, bandlimited=False):
+    # The turbulence algorithm from "An Image Synthesizer", as in
+    # shaders/turbulence.h: every octave above the pixel size, or with
+    # bandlimited, whole octaves down to twice the pixel size and the next
+    # one faded in
+    if not bandlimited:
+        return turbulence_fixed(points, time, turbulence_octaves(pixelsize))
+
+    octaves = -math.log2(turbulence_pixelsize(pixelsize))
+    whole = int(math.floor(octaves))
+    fade = octaves - whole
+
+    t = turbulence_fixed(points, time, whole)
+    if fade > 0:
+        t += fade * np.abs(noise(points * 2.0 ** whole, time)) * 0.5 ** whole
+    return t
+
+def marble(points, pixelsize=0.2, time=0.0, in_color=(0.0, 1.0, 0.0), period=1.0, bandlimited=False):
+    x = points[:, 1] + turbulence(points, pixelsize, time, bandlimited)
+    return np.asarray(in_color, dtype=np.float64) + np.sin(x / period)[:, None]
+
+def water(points, pixelsize=0.2, time=0.0,
+        in_color_low=(0.1, 0.919, 1.0), in_color_mid=(0.022, 0.441, 1.0), in_color_high=(0.0, 0.0, 0.634),
+        bandlimited=False):
+    turb = turbulence(points, pixelsize, time, bandlimited)
+    low = np.asarray(in_color_low, dtype=np.float64)
+    mid = np.asarray(in_color_mid, dtype=np.float64)
+    high = np.asarray(in_color_high, dtype=np.float64)
+
+    return np.where(
+        (turb < 0.5)[:, None],
+        mix(low, mid, smoothstep(0, 0.5, turb)),
+        mix(mid, high, smoothstep(0.5, 1, turb))
+    )
+
+def color_of_emission(radius, inner_radius, outer_radius):
+    # Interpolate radius between 0 and 1
+    x = (radius - inner_radius) / (outer_radius - inner_radius)
+    cutoff = 0.75
+
+    red = np.array([1.0, 0.0, 0.0])
+    yellow = np.array([1.0, 1.0, 0.0])
+    white = np.array([1.0, 1.0, 1.0])
+
+    return np.where(
+        (x < cutoff)[:, None],
+        mix(red, yellow, smoothstep(0, cutoff, x)),
+        mix(yellow, white, smoothstep(cutoff, 1, x))
+    )
+
+def fire(points, pixelsize=0.2, time=1.0, center=(0.0, 0.0, 0.0), inner_radius=1.0, outer_radius=2.0,
+        bandlimited=False):
+    v = points - np.asarray(center, dtype=np.float64)
+    radius = np.linalg.norm(v, axis=1)
+    dr = turbulence(v, pixelsize, time, bandlimited)
+    return color_of_emission(radius + 5 * dr, inner_radius, outer_radius)
+
+def turbulence_color(points, pixelsize=0.2, time=0.0, in_color=(1.0, 1.0, 1.0), bandlimited=False):
+    return np.asarray(in_color, dtype=np.float64) * turbulence(points, pixelsize, time, bandlimited)[:, None]
+
+# Same names as the materials genTexture.py builds
+shaders = {
+    "Fire": fire,
+    "Marble": marble,
+    "Turbulence": turbulence_color,
+    "Water": water,
+}
+
+def infer_ring_strip(mesh):
+    # Shell meshes are ring strips (see topology.py): the first quad is
+    # [0, 1, profile_len + 1, profile_len]
+    first_face = np.zeros(4, dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", first_face)
+    profile_len = int(first_face[3])
+    return len(mesh.vertices) // profile_len, profile_len
+
+def mesh_vertices(mesh):
+    co = np.zeros(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    return co.reshape(-1, 3).astype(np.float64)
+
+def sample_ring_strip(vertices, rings, profile_len, width, height, tiles=1):
+    # World space position under the centre of every texel, laid out the
+    # way ring_strip_uvs maps the shell: u runs around the (closed) profile,
+    # v runs along the rings, split over `tiles` UDIM tiles stacked along v.
+    # Returns (tiles, height, width, 3).
+    grid = np.asarray(vertices, dtype=np.float64).reshape(rings, profile_len, 3)
+
+    v = (np.arange(tiles * height) + 0.5) / (tiles * height) * (rings - 1)
+    u = (np.arange(width) + 0.5) / width * profile_len
+
+    i0 = np.minimum(np.floor(v).astype(np.int64), rings - 1)
+    i1 = np.minimum(i0 + 1, rings - 1)
+    j0 = np.floor(u).astype(np.int64) % profile_len
+    j1 = (j0 + 1) % profile_len
+
+    fv = (v - i0)[:, None, None]
+    fu = (u - np.floor(u))[None, :, None]
+
+    bottom = grid[i0][:, j0] * (1 - fu) + grid[i0][:, j1] * fu
+    top = grid[i1][:, j0] * (1 - fu) + grid[i1][:, j1] * fu
+    points = bottom * (1 - fv) + top * fv
+
+    return points.reshape(tiles, height, width, 3)
+
+def sample_uv_grid(width, height, tiles=1):
+    # The UV under the centre of every texel, in the same layout as
+    # sample_ring_strip but with v over [0, 1] across all tiles. Returns
+    # (tiles, height, width, 2).
+    v = (np.arange(tiles * height) + 0.5) / (tiles * height)
+    u = (np.arange(width) + 0.5) / width
+    grid = np.stack(np.broadcast_arrays(u[None, :], v[:, None]), axis=-1)
+    return grid.reshape(tiles, height, width, 2)
+
+def surface_points(uvs, radius=UV_RADIUS, length=UV_LENGTH):
+    # surface_point from shaders/turbulence.h over an (..., 2) array of UVs:
+    # u goes once around a cylinder, v runs along it
+    angle = 2 * np.pi * uvs[..., 0]
+    return np.stack([radius * np.cos(angle), radius * np.sin(angle), length * uvs[..., 1]], axis=-1)
+
+def ring_strip_uvs(rings, profile_len, tiles=1):
+    # Per-loop UVs in the loop order of ring_strip_topology's faces. The
+    # closing quad of each ring runs to u = 1 rather than wrapping to 0.
+    u = np.arange(profile_len + 1) / profile_len
+    v = np.arange(rings) / (rings - 1) * tiles
+    ring, column = ring_strip_corners(rings, profile_len)
+
+    return np.ascontiguousarray(np.stack([u[column], v[ring]], axis=-1), dtype=np.float32)
+
+def sample_bounding_grid(vertices, resolution):
+    # World space positions of an (nz, ny, nx) grid over the bounding box
+    # of the vertices, with the longest side split into `resolution` cells
+    vertices = np.asarray(vertices, dtype=np.float64)
+    low = vertices.min(axis=0)
+    high = vertices.max(axis=0)
+    cell = max(np.max(high - low), 1e-9) / resolution
+    counts = np.maximum(np.ceil((high - low) / cell).astype(np.int64), 1)
+
+    axes = [low[k] + (np.arange(counts[k]) + 0.5) * cell for k in range(3)]
+    z, y, x = np.meshgrid(axes[2], axes[1], axes[0], indexing="ij")
+    return np.stack([x, y, z], axis=-1), low, high
+
+def evaluate(shader_name, points, **parameters):
+    # Runs one of the shaders over any (..., 3) array of points and returns
+    # RGBA of the same leading shape
+    shape = points.shape[:-1]
+    color = shaders[shader_name](points.reshape(-1, 3), **parameters)
+
+    rgba = np.ones((len(color), 4), dtype=np.float32)
+    rgba[:, :3] = color
+    return rgba.reshape(shape + (4,))
+
+def volume_atlas(volume):
+    # Lays the z slices of an (nz, ny, nx, 4) volume out side by side in a
+    # square-ish grid of tiles, row by row from the bottom of the image
+    nz, ny, nx, channels = volume.shape
+    columns = int(math.ceil(math.sqrt(nz)))
+    rows = int(math.ceil(nz / columns))
+
+    atlas = np.zeros((rows * ny, columns * nx, channels), dtype=volume.dtype)
+    for k in range(nz):
+        row, column = divmod(k, columns)
+        atlas[row * ny:(row + 1) * ny, column * nx:(column + 1) * nx] = volume[k]
+    return atlas
+
+def write_image(name, rgba, filepath):
+    # rgba is (height, width, 4) with row 0 at the bottom, as Blender stores it
+    import bpy
+
+    height, width = rgba.shape[:2]
+    image = (bpy.data.images.get(name) or
+        bpy.data.images.new(name, width, height, alpha=True, float_buffer=True))
+    if tuple(image.size) != (width, height):
+        image.scale(width, height)
+
+    image.pixels.foreach_set(np.ascontiguousarray(rgba, dtype=np.float32).ravel())
+    image.filepath_raw = filepath
+    image.file_format = IMAGE_FORMAT
+    image.save()
+    return image
+
+def write_udim_tiles(name, tiles, directory):
+    # Writes one file per tile (name.1001.exr, name.1011.exr, ...) and loads
+    # them back as a single tiled image
+    import bpy
+
+    paths = []
+    for k, rgba in enumerate(tiles):
+        path = os.path.join(directory, "{0}.{1}{2}".format(name, 1001 + 10 * k, IMAGE_EXTENSION))
+        write_image("{0}.{1}".format(name, 1001 + 10 * k), rgba, path)
+        paths.append(path)
+
+    image = bpy.data.images.load(paths[0], check_existing=True)
+    image.name = name
+    if len(paths) > 1:
+        image.source = 'TILED'
+        for k in range(1, len(paths)):
+            if not image.tiles.get(1001 + 10 * k):
+                image.tiles.new(tile_number=1001 + 10 * k)
+        image.filepath = os.path.join(directory, name + ".<UDIM>" + IMAGE_EXTENSION)
+        image.reload()
+    return image
+
+def baked_material(name, image):
+    # Image texture straight into the material output, in place of the OSL
+    # script node genTexture.py uses
+    import bpy
+
+    mat_name = name + " Baked"
+    mat = (bpy.data.materials.get(mat_name) or
+        bpy.data.materials.new(mat_name))
+
+    mat.use_nodes = True
+    nodes = mat.node_tree.nodes
+    links = mat.node_tree.links
+
+    for node in list(nodes):
+        nodes.remove(node)
+
+    uvNode = nodes.new('ShaderNodeUVMap')
+    uvNode.location = (-400, 0)
+    uvNode.uv_map = "Bake"
+
+    imageNode = nodes.new('ShaderNodeTexImage')
+    imageNode.location = (-200, 0)
+    imageNode.image = image
+
+    outNode = nodes.new("ShaderNodeOutputMaterial")
+    outNode.location = (200, 0)
+
+    links.new(uvNode.outputs[0], imageNode.inputs[0])
+    links.new(imageNode.outputs[0], outNode.inputs[0])
+    return mat
+
+def bake_object(obj, shader_name, directory, width=512, height=512, tiles=1,
+        use_uv=USE_UV, uv_radius=UV_RADIUS, uv_length=UV_LENGTH, **parameters):
+    # Bakes a shader over a shell object's surface, gives the mesh a "Bake"
+    # UV layer to read it back with and assigns the baked material
+    mesh = obj.data
+    rings, profile_len = infer_ring_strip(mesh)
+
+    # Where the shaders sample: around the shell and along it as the
+    # sweep's UVMap runs (the Bake layer spaces u by profile point rather
+    # than arclength), or else P in world space
+    if use_uv:
+        points = surface_points(sample_uv_grid(width, height, tiles), uv_radius, uv_length)
+    else:
+        vertices = mesh_vertices(mesh)
+        matrix = np.array(obj.matrix_world, dtype=np.float64)
+        vertices = vertices @ matrix[:3, :3].T + matrix[:3, 3]
+        points = sample_ring_strip(vertices, rings, profile_len, width, height, tiles)
+    rgba = evaluate(shader_name, points, **parameters)
+
+    uv_layer = mesh.uv_layers.get("Bake") or mesh.uv_layers.new(name="Bake")
+    uv_layer.data.foreach_set("uv", ring_strip_uvs(rings, profile_len, tiles).ravel())
+
+    image = write_udim_tiles("{0} {1}".format(obj.name, shader_name), rgba, directory)
+    mat = baked_material("{0} {1}".format(obj.name, shader_name), image)
+
+    if mesh.materials:
+        mesh.materials[0] = mat
+    else:
+        mesh.materials.append(mat)
+    return image
+
+def bake_volume(vertices, shader_name, filepath, resolution=64, **parameters):
+    # Bakes a shader over the bounding box of a set of vertices. The volume
+    # is saved as .npy next to an atlas image of its z slices.
+    points, low, high = sample_bounding_grid(vertices, resolution)
+    volume = evaluate(shader_name, points, **parameters)
+
+    np.save(os.path.splitext(filepath)[0] + ".npy", volume)
+    write_image(os.path.basename(filepath), volume_atlas(volume), filepath)
+    return volume, low, high
+
+def bake_scene(directory, width=512, height=512, tiles=1):
+    # Same round-robin assignment as genTexture.py, over mesh objects with
+    # faces (not the Geometry Nodes profiles). Placements sharing one mesh
+    # are baked once, at the first one.
+    import bpy
+
+    os.makedirs(directory, exist_ok=True)
+    objects = []
+    seen = set()
+    for obj in bpy.data.objects:
+        if obj.type != 'MESH' or not len(obj.data.polygons) or obj.data.name in seen:
+            continue
+        seen.add(obj.data.name)
+        objects.append(obj)
+
+    for i, obj in enumerate(objects):
+        bake_object(obj, texture_names[i % len(texture_names)], directory, width, height, tiles)
+
+if __name__ == "__main__":
+    import bpy
+    bake_scene(bpy.path.abspath("//baked"))
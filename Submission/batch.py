@@ -0,0 +1,221 @@
+import argparse
+import json
+import os
+import sys
+from multiprocessing import Pool
+
+import numpy as np
+
+if not __package__:
+    # Run as a loose script, from its file or a text block; see __init__.py
+    path = os.path.abspath(__file__)
+    if not os.path.exists(path):
+        import bpy
+        text = bpy.data.texts.get(os.path.basename(path))
+        path = bpy.path.abspath(text.filepath if text and text.filepath else "//" + os.path.basename(path))
+    sys.path.append(os.path.dirname(os.path.dirname(path)))
+    __package__ = "Submission"
+
+from .geometry import (
+    Vector2, Vector3, coiling_axis, Morph,
+    generate_sweep_array, iterate_sweep, sweep_lods,
+)
+from .mesh_export import write_mesh, grid_rings
+from .growth import from_spec
+from . import profiles
+from .topology import ring_strip_topology
+
+# Headless batch generation of shell catalogues. Shell specs are read from a
+# JSON (or TOML) file, swept in a pool of worker processes that never touch
+# bpy, and written one .npz mesh file per shell. A final pass inside Blender
+# (import_shells) only uploads the results.
+#
+#   python batch.py shells.json out/ --processes 8
+#   python batch.py shells.json out/ --format ply    # streamed, for huge shells
+#   python batch.py shells.json out/ --lods 4        # name_LOD0 ... name_LOD3
+#   blender scene.blend --python batch.py -- --import out/
+#
+# A spec file holds a list of shells, either at the top level or under
+# "shells", with optional "defaults" merged into every shell:
+#
+#   {
+#     "defaults": {"tangent": [0, 0, 1], "normal": [1, 0, 0],
+#                  "coiling_rate": {"type": "linear", "a": 3.141592653589793, "divisor": 18}},
+#     "shells": [
+#       {"name": "classical", "start": [20, 0, 0], "iterations": 400,
+#        "displacement": {"type": "power", "a": 5, "l": 1.01, "k": 300},
+#        "coiling_radius": {"type": "power", "a": 1, "l": 1.01, "k": 300},
+#        "scaling_factor": {"type": "power", "a": 1, "l": 1.01, "k": 300},
+#        "profile": {"shape": "circle", "radius": 1, "points": 20}}
+#     ]
+#   }
+#
+# Growth parameters are a number (constant) or a growth function spec as
+# written by GrowthFunction.to_dict (see growth.py), e.g.
+#   {"type": "linear", "a": a, "b": b, "divisor": d}    n * a / d + b
+#   {"type": "power", "a": a, "l": l, "k": k}           a * l ** (n - k)
+#   {"type": "piecewise", "pieces": [[0, spec], [n0, spec], ...]}
+# Profiles are {"shape": "circle" | "square" | "hexagon", "radius": r,
+# "points": n}, {"shape": "polygon", "sides": s, "radius": r, "points": n},
+# {"shape": "spline", "points": n, "control": [[x, y], ...]} (a smoothed,
+# resampled hand-entered curve) or a list of [x, y] points, optionally
+# morphed into a second profile over the last iterations with
+# "morph": {"to": profile, "start": n0, "steps": N}. A morph can pass
+# through further profiles first ("via": [profile, ...]), reach each at
+# given weights ("keys": [0, ..., 1]) and ease between them ("easing":
+# "linear" | "ease_in" | "ease_out" | "smoothstep").
+
+GROWTH_PARAMETERS = ["coiling_rate", "displacement", "coiling_radius", "scaling_factor"]
+
+def make_profile(spec):
+    if isinstance(spec, list):
+        return [Vector2(x, y) for x, y in spec]
+
+    shape = spec["shape"]
+    if shape in ("circle", "square", "hexagon"):
+        return getattr(profiles, shape)(spec.get("radius", 1), spec["points"])
+    elif shape == "polygon":
+        return profiles.polygon(spec["sides"], spec.get("radius", 1), spec["points"])
+    elif shape == "spline":
+        return profiles.spline(spec["control"], spec["points"], spec.get("closed", True))
+
+    raise ValueError("Unknown profile shape {0!r}".format(shape))
+
+def make_generating_shape(spec):
+    profile = make_profile(spec["profile"])
+    if "morph" not in spec:
+        return profile
+
+    morph = spec["morph"]
+    shapes = [profile] + [make_profile(via) for via in morph.get("via", [])] + [make_profile(morph["to"])]
+    return Morph(shapes, morph["start"], morph["steps"], morph.get("keys"), morph.get("easing", "linear"))
+
+def make_axis(spec):
+    growth = [from_spec(spec[name]) for name in GROWTH_PARAMETERS]
+    return coiling_axis(
+        Vector3(*spec["start"]), Vector3(*spec["tangent"]), Vector3(*spec["normal"]),
+        *growth, make_generating_shape(spec), spec["iterations"]
+    )
+
+def load_specs(path):
+    if path.endswith(".toml"):
+        import tomllib
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    else:
+        with open(path) as f:
+            data = json.load(f)
+
+    if isinstance(data, list):
+        data = {"shells": data}
+
+    defaults = data.get("defaults", {})
+    specs = []
+    for i, shell in enumerate(data["shells"]):
+        spec = dict(defaults)
+        spec.update(shell)
+        spec.setdefault("name", "shell_{0:05d}".format(i))
+        specs.append(spec)
+    return specs
+
+def write_grid(path, grid):
+    # One (rings, profile, 3) vertex grid to .npz, .stl or .ply
+    if path.endswith(".npz"):
+        faces, edges = ring_strip_topology(*grid.shape[:2])
+        np.savez(path, vertices=grid.reshape(-1, 3).astype(np.float32), faces=faces, edges=edges)
+    else:
+        write_mesh(path, grid_rings(grid))
+
+def generate_shell(job):
+    # Runs in a worker: sweep one shell and write its mesh file(s)
+    spec, directory, file_format, lods = job
+    axis = make_axis(spec)
+
+    if lods > 1:
+        paths = []
+        for level, grid in enumerate(sweep_lods(axis, lods)):
+            paths.append(os.path.join(directory, "{0}_LOD{1}.{2}".format(spec["name"], level, file_format)))
+            write_grid(paths[-1], grid)
+        return spec["name"], paths[0]
+
+    if file_format != "npz":
+        # Stream ring by ring so memory doesn't grow with the shell
+        path = os.path.join(directory, spec["name"] + "." + file_format)
+        write_mesh(path, iterate_sweep(axis))
+        return spec["name"], path
+    vertices = generate_sweep_array(axis)
+    profile_len = len(axis.generating_shape(axis.current_iteration + 1))
+    faces, edges = ring_strip_topology(len(vertices) // profile_len, profile_len)
+
+    path = os.path.join(directory, spec["name"] + ".npz")
+    np.savez(path, vertices=vertices.astype(np.float32), faces=faces, edges=edges)
+    return spec["name"], path
+
+def generate_shells(specs, directory, processes=None, chunksize=4, file_format="npz", lods=1):
+    # Generates every shell in a process pool; returns {name: path} (the
+    # LOD0 path when writing levels of detail)
+    os.makedirs(directory, exist_ok=True)
+    jobs = [(spec, directory, file_format, lods) for spec in specs]
+
+    results = {}
+    with Pool(processes) as pool:
+        for name, path in pool.imap_unordered(generate_shell, jobs, chunksize):
+            results[name] = path
+    return results
+
+def import_shells(directory, collection_name="Shells"):
+    # The only step that needs Blender: upload every mesh file in the
+    # directory into one collection
+    import bpy
+    from .mesh_upload import fill_mesh, mark_shell
+
+    collection = (bpy.data.collections.get(collection_name) or
+        bpy.data.collections.new(collection_name))
+    if collection.name not in bpy.context.scene.collection.children:
+        bpy.context.scene.collection.children.link(collection)
+
+    objects = []
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".npz"):
+            continue
+        name = filename[:-len(".npz")]
+        with np.load(os.path.join(directory, filename)) as data:
+            mesh = bpy.data.meshes.new(name)
+            fill_mesh(mesh, data["vertices"], data["faces"], data["edges"])
+
+        obj = bpy.data.objects.new(name, mesh)
+        mark_shell(obj)
+        collection.objects.link(obj)
+        objects.append(obj)
+    return objects
+
+def main(argv=None):
+    if argv is None:
+        # Inside Blender our arguments come after "--"
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+
+    parser = argparse.ArgumentParser(description="Generate shell meshes in parallel from a spec file.")
+    parser.add_argument("specs", nargs="?", help="JSON or TOML shell spec file")
+    parser.add_argument("directory", help="where mesh files are written / read from")
+    parser.add_argument("--processes", "-j", type=int, default=None)
+    parser.add_argument("--format", choices=["npz", "stl", "ply"], default="npz",
+        help="npz for import_shells, or stream binary STL / PLY straight to disk")
+    parser.add_argument("--lods", type=int, default=1,
+        help="write this many levels of detail per shell as name_LOD0 ... name_LODn")
+    parser.add_argument("--import", dest="import_only", action="store_true",
+        help="import previously generated mesh files into the open Blender scene")
+    args = parser.parse_args(argv)
+
+    if args.import_only:
+        import_shells(args.directory)
+        return
+
+    if args.specs is None:
+        parser.error("a spec file is required unless --import is given")
+
+    specs = load_specs(args.specs)
+    results = generate_shells(specs, args.directory, args.processes, file_format=args.format, lods=args.lods)
+    print("Generated {0} shells in {1}".format(len(results), args.directory))
+
+if __name__ == "__main__":
+    main()
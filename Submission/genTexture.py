@@ -1,18 +1,108 @@
-import bpy
+import hashlib
+import os
+import re
+import sys
 
-bpy.context.scene.render.engine = 'CYCLES'
-bpy.context.scene.cycles.shading_system = True
+if not __package__:
+    # Run as a loose script, from its file or a text block; see __init__.py
+    path = os.path.abspath(__file__)
+    if not os.path.exists(path):
+        import bpy
+        text = bpy.data.texts.get(os.path.basename(path))
+        path = bpy.path.abspath(text.filepath if text and text.filepath else "//" + os.path.basename(path))
+    sys.path.append(os.path.dirname(os.path.dirname(path)))
+    __package__ = "Submission"
+
+from . import osl_cache
+from .mesh_upload import SHELL_PROPERTY
+
+# OSL materials for the shells. Running this is idempotent: a material's
+# node tree is only rebuilt when the shader script it was built from has
+# changed, so re-running it (or opening the file) doesn't make Cycles
+# recompile every shader.
 
 texture_names = ["Fire",  "Marble", "Turbulence", "Water"]
 
+# Bump when the node layout below changes, to rebuild existing materials
+MATERIAL_VERSION = "2"
+
+# Point script nodes at shaders precompiled to .oso (see osl_cache.py) in
+# EXTERNAL mode, so Cycles loads bytecode instead of compiling OSL. When a
+# shader can't be compiled here (no oslc, as inside Blender), the node
+# points at the .osl file in shaders/ instead, so that Blender compiles it
+# where its #include "turbulence.h" resolves. Only without shaders/ next to
+# this script does it use the .blend's own .osl text blocks, with headers
+# inlined from text blocks of the same name.
+USE_PRECOMPILED = True
+
+def script_hash(text):
+    h = hashlib.sha1(("material-" + MATERIAL_VERSION).encode("utf-8"))
+    h.update(text.as_string().encode("utf-8"))
+    return h.hexdigest()
+
+def shader_path(name):
+    return os.path.join(osl_cache.SHADER_DIRECTORY, name.lower() + ".osl")
+
+def precompiled_shader(name):
+    if not USE_PRECOMPILED:
+        return None
+    return osl_cache.compiled_shader(shader_path(name))
+
+def inlined_text(text):
+    # The text with each #include of another text block in the file replaced
+    # by that block's contents, as a text block of its own: Blender compiles
+    # text blocks from a temporary file, where no include would be found
+    import bpy
+
+    source = text.as_string()
+    includes = [name for name in osl_cache.include_pattern.findall(source) if name in bpy.data.texts]
+    if not includes:
+        return text
+
+    for name in includes:
+        pattern = r'^\s*#\s*include\s+[<"]{0}[">]'.format(re.escape(name))
+        source = re.sub(pattern, lambda match: bpy.data.texts[name].as_string(), source, flags=re.MULTILINE)
+
+    inlined_name = text.name + " (inlined)"
+    inlined = bpy.data.texts.get(inlined_name) or bpy.data.texts.new(inlined_name)
+    if inlined.as_string() != source:
+        inlined.from_string(source)
+    return inlined
+
+def setup_render():
+    import bpy
+
+    scene = bpy.context.scene
+    if scene.render.engine != 'CYCLES':
+        scene.render.engine = 'CYCLES'
+    if not scene.cycles.shading_system:
+        scene.cycles.shading_system = True
 
-for name in texture_names:
-    mat_name = name
+def setup_material(name):
+    import bpy
+
+    # The .oso path already names the hash of the shader source, and
+    # source_hash covers the .osl and the headers it includes
+    text = None
+    external = precompiled_shader(name)
+    if external:
+        digest = hashlib.sha1(("material-" + MATERIAL_VERSION + external).encode("utf-8")).hexdigest()
+    elif os.path.isfile(shader_path(name)):
+        external = shader_path(name)
+        source = osl_cache.source_hash(external)
+        digest = hashlib.sha1(("material-" + MATERIAL_VERSION + source).encode("utf-8")).hexdigest()
+    else:
+        text = inlined_text(bpy.data.texts[name.lower() + ".osl"])
+        digest = script_hash(text)
 
     # Test if material exists
     # If it does not exist, create it:
-    mat = (bpy.data.materials.get(mat_name) or 
-        bpy.data.materials.new(mat_name))
+    mat = (bpy.data.materials.get(name) or
+        bpy.data.materials.new(name))
+
+    # Already built from this script
+    if mat.use_nodes and mat.get("script_hash") == digest:
+        return mat
 
     # Enable 'Use nodes':
     mat.use_nodes = True
@@ -20,26 +110,85 @@ for name in texture_names:
     links = mat.node_tree.links
 
     # Remove any old nodes that exist in material
-    for node in nodes:
+    for node in list(nodes):
         nodes.remove(node)
 
     # Create new nodes
     scriptNode = nodes.new('ShaderNodeScript')
     scriptNode.location = (0,0)
-    scriptNode.script = bpy.data.texts[name.lower() + ".osl"]
+    if external:
+        scriptNode.mode = 'EXTERNAL'
+        scriptNode.filepath = external
+    else:
+        scriptNode.script = text
 
     outNode = nodes.new("ShaderNodeOutputMaterial")
     outNode.location = (200,0)
 
-
     # Connect the two nodes
     links.new(scriptNode.outputs[0], outNode.inputs[0])
 
-objects = bpy.data.objects
+    mat["script_hash"] = digest
+    return mat
+
+def setup_materials():
+    return [setup_material(name) for name in texture_names]
 
-for i in range(len(objects)):
-    mat = bpy.data.materials.get(texture_names[i % len(texture_names)])
-    if objects[i].data.materials:
-        objects[i].data.materials[0] = mat
+def shell_objects(collection=None):
+    # The objects showing shells (see mesh_upload.mark_shell) in a
+    # collection (a name or collection, including its children) or the
+    # whole file, in object order. Files made before shells were marked
+    # have every mesh object with faces instead.
+    import bpy
+
+    if collection is None:
+        objects = bpy.data.objects
     else:
-        objects[i].data.materials.append(mat)
\ No newline at end of file
+        if isinstance(collection, str):
+            collection = bpy.data.collections[collection]
+        objects = collection.all_objects
+    objects = [obj for obj in objects if obj.type == 'MESH']
+    shells = [obj for obj in objects if obj.get(SHELL_PROPERTY) is not None]
+    return shells or [obj for obj in objects if len(obj.data.polygons)]
+
+def assign_materials(materials, collection=None):
+    # Round-robin over the shells, setting the first material slot; the
+    # levels of a LOD pyramid are one shell and get the same material.
+    # Linked duplicates whose slots are linked to the object (see
+    # mesh_upload.link_materials_to_object) each get their own material;
+    # other objects sharing a mesh get it once, on the mesh. Slots that
+    # already have the right material are left alone. Returns the number of
+    # slots changed.
+    changed = 0
+    seen = set()
+    shell_materials = {}
+    for obj in shell_objects(collection):
+        per_object = bool(obj.material_slots) and obj.material_slots[0].link == 'OBJECT'
+        if not per_object:
+            if obj.data.name in seen:
+                continue
+            seen.add(obj.data.name)
+
+        shell = obj.get(SHELL_PROPERTY, obj.name)
+        if shell not in shell_materials:
+            shell_materials[shell] = materials[len(shell_materials) % len(materials)]
+        mat = shell_materials[shell]
+        if per_object:
+            if obj.material_slots[0].material == mat:
+                continue
+            obj.material_slots[0].material = mat
+        elif not obj.data.materials:
+            obj.data.materials.append(mat)
+        elif obj.data.materials[0] != mat:
+            obj.data.materials[0] = mat
+        else:
+            continue
+        changed += 1
+    return changed
+
+def main(collection=None):
+    setup_render()
+    assign_materials(setup_materials(), collection)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,666 @@
+from typing import Any
+
+import math
+import numpy as np
+
+from .growth import GrowthFunction, Constant, from_spec
+from .profiles import shape_array
+from .topology import ring_strip_topology
+
+# Shell geometry with no Blender dependency, so it can be used from worker
+# processes and tools that run outside Blender. sweep.py turns it into meshes.
+
+class Vector2(object):
+    __slots__ = ("x", "y")
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def __add__(self, other: 'Vector2'):
+        return Vector2(self.x + other.x, self.y + other.y)
+
+    def __iadd__(self, other: 'Vector2'):
+        self.x += other.x
+        self.y += other.y
+        return self
+
+    def __mul__(self, other: Any):
+        if other.__class__ is Vector2:
+            return self.x * other.x + self.y * other.y
+        return Vector2(other * self.x, other * self.y)
+
+    def __rmul__(self, other: Any):
+        return Vector2(other * self.x, other * self.y)
+
+    def __imul__(self, other: Any):
+        # Scaling only; a dot product can't be done in place
+        self.x = other * self.x
+        self.y = other * self.y
+        return self
+
+    def __sub__(self, other: 'Vector2'):
+        return Vector2(self.x - other.x, self.y - other.y)
+
+    def __neg__(self):
+        return Vector2(-1 * self.x, -1 * self.y)
+
+    def __abs__(self):
+        return math.sqrt(self.x * self.x + self.y * self.y)
+
+    def __str__(self):
+        return "({0},{1})".format(self.x, self.y)
+
+    def normalize(self):
+        inverse = 1 / math.sqrt(self.x * self.x + self.y * self.y)
+        return Vector2(inverse * self.x, inverse * self.y)
+
+    def project(self, other: 'Vector2'):
+        normal = other.normalize()
+        return normal * self.__mul__(normal)
+
+    def axpy(self, a, x: 'Vector2', b=None, y: 'Vector2' = None):
+        # self + a * x (+ b * y) without the intermediate vectors
+        if y is None:
+            return Vector2(self.x + a * x.x, self.y + a * x.y)
+        return Vector2(self.x + a * x.x + b * y.x, self.y + a * x.y + b * y.y)
+
+    def to_list(self):
+        return [self.x, self.y]
+
+class Vector3(object):
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x, y, z):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    def __add__(self, other: 'Vector3'):
+        return Vector3(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __iadd__(self, other: 'Vector3'):
+        self.x += other.x
+        self.y += other.y
+        self.z += other.z
+        return self
+
+    def __mul__(self, other: Any):
+        if other.__class__ is Vector3:
+            return self.x * other.x + self.y * other.y + self.z * other.z
+        return Vector3(other * self.x, other * self.y, other * self.z)
+
+    def __rmul__(self, other: Any):
+        return Vector3(other * self.x, other * self.y, other * self.z)
+
+    def __imul__(self, other: Any):
+        # Scaling only; a dot product can't be done in place
+        self.x = other * self.x
+        self.y = other * self.y
+        self.z = other * self.z
+        return self
+
+    def __sub__(self, other: 'Vector3'):
+        return Vector3(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def __neg__(self):
+        return Vector3(-1 * self.x, -1 * self.y, -1 * self.z)
+
+    def __abs__(self):
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    def normalize(self):
+        inverse = 1 / math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+        return Vector3(inverse * self.x, inverse * self.y, inverse * self.z)
+
+    def project(self, other: 'Vector3'):
+        normal = other.normalize()
+        return normal * self.__mul__(normal)
+
+    def __str__(self):
+        return "({0},{1},{2})".format(self.x, self.y, self.z)
+
+    def __pow__(self, other: 'Vector3'):
+        return Vector3(self.y * other.z - other.y * self.z, - self.x * other.z + other.x * self.z, self.x * other.y - other.x * self.y)
+
+    def axpy(self, a, x: 'Vector3', b=None, y: 'Vector3' = None):
+        # self + a * x (+ b * y) without the intermediate vectors, e.g.
+        # center.axpy(u, normal, v, tangent) for a point on a ring. Rounds
+        # exactly like center + u * normal + v * tangent.
+        if y is None:
+            return Vector3(self.x + a * x.x, self.y + a * x.y, self.z + a * x.z)
+        return Vector3(self.x + a * x.x + b * y.x, self.y + a * x.y + b * y.y, self.z + a * x.z + b * y.z)
+
+    def to_list(self):
+        return [self.x, self.y, self.z]
+
+class Vec3Array(object):
+    # Struct of arrays: n 3D vectors held as three contiguous float64 columns,
+    # with the Vector3 operations applied to all of them at once. Scalars
+    # may be numbers or length-n arrays (one per vector).
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x, y, z):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.z = np.asarray(z, dtype=np.float64)
+
+    @classmethod
+    def from_array(cls, array):
+        array = np.asarray(array, dtype=np.float64).reshape(-1, 3)
+        return cls(array[:, 0].copy(), array[:, 1].copy(), array[:, 2].copy())
+
+    @classmethod
+    def from_vectors(cls, vectors):
+        return cls.from_array([v.to_list() for v in vectors])
+
+    @classmethod
+    def repeat(cls, v: Vector3, n):
+        return cls(np.full(n, v.x, dtype=np.float64), np.full(n, v.y, dtype=np.float64), np.full(n, v.z, dtype=np.float64))
+
+    def __len__(self):
+        return len(self.x)
+
+    def __getitem__(self, i):
+        if np.ndim(i) == 0:
+            return Vector3(self.x[i].item(), self.y[i].item(), self.z[i].item())
+        return Vec3Array(self.x[i], self.y[i], self.z[i])
+
+    def __add__(self, other):
+        return Vec3Array(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __iadd__(self, other):
+        self.x += other.x
+        self.y += other.y
+        self.z += other.z
+        return self
+
+    def __sub__(self, other):
+        return Vec3Array(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def __neg__(self):
+        return Vec3Array(-self.x, -self.y, -self.z)
+
+    def __mul__(self, other):
+        # Scaling by a number or per-vector array; use dot for dot products
+        return Vec3Array(other * self.x, other * self.y, other * self.z)
+
+    __rmul__ = __mul__
+
+    def __imul__(self, other):
+        self.x *= other
+        self.y *= other
+        self.z *= other
+        return self
+
+    def dot(self, other):
+        return self.x * other.x + self.y * other.y + self.z * other.z
+
+    def cross(self, other):
+        return Vec3Array(self.y * other.z - other.y * self.z, - self.x * other.z + other.x * self.z, self.x * other.y - other.x * self.y)
+
+    def norm(self):
+        return np.sqrt(self.dot(self))
+
+    def normalize(self):
+        return self * (1 / self.norm())
+
+    def axpy(self, a, x, b=None, y=None):
+        # Same as Vector3.axpy, for every vector at once; x and y may be
+        # Vector3s (shared by all) or Vec3Arrays
+        if y is None:
+            return Vec3Array(self.x + a * x.x, self.y + a * x.y, self.z + a * x.z)
+        return Vec3Array(self.x + a * x.x + b * y.x, self.y + a * x.y + b * y.y, self.z + a * x.z + b * y.z)
+
+    def to_array(self):
+        return np.stack([self.x, self.y, self.z], axis=-1)
+
+    def to_list(self):
+        return self.to_array().tolist()
+
+def make_lambda_function(input):
+    # Numbers become Constant growth functions and dicts are read as growth
+    # specs (see growth.py); growth functions and other callables are used
+    # as they are
+    if type(input) is float or type(input) is int:
+        return Constant(input)
+    elif isinstance(input, dict):
+        return from_spec(input)
+    elif isinstance(input, GrowthFunction) or callable(input):
+        return input
+
+class ConstantShape(object):
+    # The generating shape of an axis built from a single shape. Unlike a
+    # lambda it pickles, so the axis can be sent to worker processes.
+    def __init__(self, shape):
+        self.shape = shape
+
+    def __call__(self, n):
+        return self.shape
+
+class coiling_axis(object):
+    def __init__(self, start_point: Vector3, tangent: Vector3, normal: Vector3, coiling_rate, displacement, coiling_radius, scaling_factor, generating_shape, iterations: int):        
+        self.start_point = start_point
+
+        self.tangent = tangent.normalize()
+        self.normal = (normal - normal.project(tangent)).normalize()
+        self.binormal = (normal ** tangent).normalize()
+
+        self.displacement = make_lambda_function(displacement)
+        self.coiling_rate = make_lambda_function(coiling_rate)
+        self.coiling_radius = make_lambda_function(coiling_radius)
+        self.scaling_factor = make_lambda_function(scaling_factor)
+
+        self.max_iterations = iterations
+        self.current_iteration = 0
+
+        if type(generating_shape) is list or isinstance(generating_shape, np.ndarray):
+            self.generating_shape = ConstantShape(generating_shape)
+        elif callable(generating_shape):
+            self.generating_shape = generating_shape
+
+    def get_axis_position(self):
+        current_axis_position = self.displacement(self.current_iteration)
+        return current_axis_position * self.tangent + self.start_point
+
+    def get_normal_vector(self):
+        current_angle = self.coiling_rate(self.current_iteration)
+        return math.cos(current_angle) * self.normal + math.sin(current_angle) * self.binormal
+
+    def get_tangent_vector(self):
+        return self.tangent
+
+    def get_radius(self):
+        return self.coiling_radius(self.current_iteration)
+
+    def get_scaling_factor(self):
+        return self.scaling_factor(self.current_iteration)
+
+    def get_generating_shape(self):
+        return self.generating_shape(self.current_iteration)
+
+    def iterate(self):
+        self.current_iteration += 1
+        return self.current_iteration < self.max_iterations
+
+def homotopy(start_shape, end_shape, n, N):
+    start_shape = shape_array(start_shape)
+    end_shape = shape_array(end_shape)
+    return start_shape + (1.0 * n / N) * (end_shape - start_shape)
+
+# Easing curves for morph, mapping blend weights in [0, 1] onto [0, 1]
+easings = {
+    "linear": lambda t: t,
+    "ease_in": lambda t: t * t,
+    "ease_out": lambda t: t * (2 - t),
+    "smoothstep": lambda t: t * t * (3 - 2 * t),
+}
+
+def _morph_arguments(shapes, keys, easing):
+    # (shapes, keys, ease) for morph, raising ValueError on arguments it
+    # can't blend
+    shapes = [shape_array(shape) for shape in shapes]
+    if len(shapes) < 2:
+        raise ValueError("A morph needs at least two key shapes, got {0}".format(len(shapes)))
+    if any(shape.shape != shapes[0].shape for shape in shapes):
+        raise ValueError("Key shapes must all have the same size, got {0}".format(
+            [shape.shape for shape in shapes]))
+    shapes = np.stack(shapes).astype(np.float64)
+
+    if keys is None:
+        keys = np.linspace(0, 1, len(shapes))
+    keys = np.asarray(keys, dtype=np.float64)
+    if keys.shape != (len(shapes),):
+        raise ValueError("Expected one key per shape ({0}), got {1}".format(len(shapes), keys.tolist()))
+    if np.any(np.diff(keys) <= 0):
+        raise ValueError("Keys must be increasing, got {0}".format(keys.tolist()))
+
+    if isinstance(easing, str):
+        if easing not in easings:
+            raise ValueError("Unknown easing {0!r}".format(easing))
+        easing = easings[easing]
+    return shapes, keys, easing
+
+def morph(shapes, weights, keys=None, easing="linear"):
+    # Blends a sequence of key shapes ((k, 2) profiles, or any equally sized
+    # arrays) at every weight at once, returning a (len(weights), k, 2)
+    # array. keys are the weights at which each key shape is reached
+    # (evenly spaced over [0, 1] by default); between two keys the blend is
+    # linear, or follows easing (a name from easings or a function of t).
+    # Weights outside the keys hold the first or last shape.
+    shapes, keys, ease = _morph_arguments(shapes, keys, easing)
+
+    weights = np.clip(np.asarray(weights, dtype=np.float64), keys[0], keys[-1])
+    segment = np.clip(np.searchsorted(keys, weights, side="right") - 1, 0, len(keys) - 2)
+    t = ease((weights - keys[segment]) / (keys[segment + 1] - keys[segment]))
+
+    t = t.reshape((-1,) + (1,) * (shapes.ndim - 1))
+    return shapes[segment] + t * (shapes[segment + 1] - shapes[segment])
+
+class Morph(object):
+    # A generating shape that holds shapes[0] up to iteration `start` and
+    # then morphs through the key shapes over the next `steps` iterations.
+    # Called per iteration like any generating_shape function, but the
+    # sweep evaluates it for every ring at once (see over).
+    def __init__(self, shapes, start, steps, keys=None, easing="linear"):
+        # Checked here rather than when the sweep first calls it
+        _morph_arguments(shapes, keys, easing)
+        if not steps > 0:
+            raise ValueError("A Morph needs a positive number of steps, got {0!r}".format(steps))
+        self.shapes = [shape_array(shape) for shape in shapes]
+        self.start = start
+        self.steps = steps
+        self.keys = keys
+        self.easing = easing
+
+    def weights(self, iterations):
+        return (np.asarray(iterations) - self.start) * 1.0 / self.steps
+
+    def over(self, iterations):
+        return morph(self.shapes, self.weights(iterations), self.keys, self.easing)
+
+    def __call__(self, n):
+        if n <= self.start:
+            return self.shapes[0]
+        return self.over([n])[0]
+
+def evaluate_over_iterations(function, iterations):
+    # Most growth functions are plain arithmetic on n and can be applied to a
+    # whole array of iterations at once. The array holds Python ints (or
+    # floats, for fractional iterations) so the arithmetic (l ** (n - 300),
+    # ...) rounds exactly as it does per iteration in generate_sweep. Anything that doesn't broadcast (math.cos, branching
+    # on n, ...) is evaluated one iteration at a time instead.
+    try:
+        values = np.asarray(function(iterations.astype(object)), dtype=np.float64)
+    except (TypeError, ValueError, OverflowError):
+        values = None
+
+    if values is None or values.shape not in ((), iterations.shape):
+        values = np.array([function(n.item()) for n in iterations], dtype=np.float64)
+
+    return np.broadcast_to(values, iterations.shape)
+
+def derivative_over_iterations(function, iterations):
+    # d/dn of a growth function (see GrowthFunction.derivative) at every
+    # iteration; other callables by central difference
+    derivative = getattr(function, "derivative", None)
+    if derivative is None:
+        iterations = np.asarray(iterations, dtype=np.float64)
+        return (evaluate_over_iterations(function, iterations + 0.5)
+            - evaluate_over_iterations(function, iterations - 0.5))
+    return evaluate_over_iterations(derivative, iterations)
+
+def generating_shape_array(coiling_axis, iterations):
+    if isinstance(coiling_axis.generating_shape, Morph):
+        return coiling_axis.generating_shape.over(iterations)
+
+    # Constant shapes hand back the same list every iteration, so only
+    # convert a shape to an array when it actually changes
+    shapes = []
+    last_shape = None
+    last_array = None
+    for n in iterations:
+        shape = coiling_axis.generating_shape(n.item())
+        if shape is not last_shape:
+            last_shape = shape
+            last_array = shape_array(shape)
+        shapes.append(last_array)
+
+    return np.stack(shapes)
+
+def sweep_vertices(coiling_axis, iterations):
+    # Vertices of the rings at the given iterations, as a
+    # (len(iterations), profile, 3) array
+    return _sweep(coiling_axis, iterations)[0]
+
+def sweep_surface(coiling_axis, iterations):
+    # sweep_vertices plus, from the same evaluation, what's needed to shade
+    # and texture the rings: (vertices, normals, uvs) with
+    #   normals (len(iterations), profile, 3): unit surface normals from the
+    #     derivatives of the sweep along the profile and along n, facing
+    #     the way ring_strip_topology's faces do (zero where the surface is
+    #     degenerate)
+    #   uvs (len(iterations), profile + 1, 2): u the arclength around the
+    #     profile from 0 to 1, with an extra point closing the seam at
+    #     u = 1, and v the iteration, 0 to 1 over the axis' iterations
+    return _sweep(coiling_axis, iterations, surface=True)
+
+def _sweep(coiling_axis, iterations, surface=False):
+    start_point = np.array(coiling_axis.start_point.to_list(), dtype=np.float64)
+    tangent = np.array(coiling_axis.tangent.to_list(), dtype=np.float64)
+    axis_normal = np.array(coiling_axis.normal.to_list(), dtype=np.float64)
+    binormal = np.array(coiling_axis.binormal.to_list(), dtype=np.float64)
+
+    displacement = evaluate_over_iterations(coiling_axis.displacement, iterations)
+    angle = evaluate_over_iterations(coiling_axis.coiling_rate, iterations)
+    coiling_radius = evaluate_over_iterations(coiling_axis.coiling_radius, iterations)
+    scaling_factor = evaluate_over_iterations(coiling_axis.scaling_factor, iterations)
+
+    # math.cos/math.sin rather than np.cos/np.sin so the result matches
+    # generate_sweep bit for bit; it is only one call per ring
+    cos = np.array([math.cos(a) for a in angle], dtype=np.float64)
+    sin = np.array([math.sin(a) for a in angle], dtype=np.float64)
+
+    axis_position = displacement[:, None] * tangent + start_point
+    normal = cos[:, None] * axis_normal + sin[:, None] * binormal
+    iteration_center = axis_position + coiling_radius[:, None] * normal
+
+    shape = generating_shape_array(coiling_axis, iterations)
+    generating_shape = scaling_factor[:, None, None] * shape
+
+    vertices = (iteration_center[:, None, :]
+        + generating_shape[:, :, 0:1] * normal[:, None, :]
+        + generating_shape[:, :, 1:2] * tangent)
+
+    if not surface:
+        return (vertices,)
+
+    # With N(n) = cos(a) normal + sin(a) binormal and B(n) = dN / da, a
+    # vertex is start + d T + r N + s (x N + y T), so
+    #   dS / dj = s x' N + s y' T
+    #   dS / dn = (r' + s' x + s x') N + (d' + s' y + s y') T + a' (r + s x) B
+    # with ' on x, y taken around the profile for dS / dj and along n for
+    # dS / dn (a central difference, for shapes that morph). N, T, B are
+    # orthonormal with N x T = B, so the cross product is worked out on
+    # their coefficients, per vertex, and only then turned into vectors.
+    d_displacement = derivative_over_iterations(coiling_axis.displacement, iterations)[:, None]
+    d_angle = derivative_over_iterations(coiling_axis.coiling_rate, iterations)[:, None]
+    d_radius = derivative_over_iterations(coiling_axis.coiling_radius, iterations)[:, None]
+    d_scale = derivative_over_iterations(coiling_axis.scaling_factor, iterations)[:, None]
+    along_n = iterations.astype(np.float64)
+    d_shape = generating_shape_array(coiling_axis, along_n + 0.5) - generating_shape_array(coiling_axis, along_n - 0.5)
+    around = (np.roll(shape, -1, axis=1) - np.roll(shape, 1, axis=1)) / 2
+
+    x, y = shape[:, :, 0], shape[:, :, 1]
+    s = scaling_factor[:, None]
+
+    j_normal = s * around[:, :, 0]
+    j_tangent = s * around[:, :, 1]
+    n_normal = d_radius + d_scale * x + s * d_shape[:, :, 0]
+    n_tangent = d_displacement + d_scale * y + s * d_shape[:, :, 1]
+    n_growth = d_angle * (coiling_radius[:, None] + s * x)
+
+    # (dS / dj) x (dS / dn)
+    normal_part = j_tangent * n_growth
+    tangent_part = -j_normal * n_growth
+    growth_part = j_normal * n_tangent - j_tangent * n_normal
+
+    length = np.sqrt(normal_part * normal_part + tangent_part * tangent_part + growth_part * growth_part)
+    scale = np.divide(1.0, length, out=np.zeros_like(length), where=length > 0)
+    growth = (-sin)[:, None] * axis_normal + cos[:, None] * binormal
+
+    # One batched (profile, 3) @ (3, 3) product per ring
+    frame = np.stack([normal, np.broadcast_to(tangent, normal.shape), growth], axis=1)
+    normals = np.stack([normal_part, tangent_part, growth_part], axis=-1) * scale[:, :, None] @ frame
+
+    # u by arclength around the closed profile
+    segments = np.linalg.norm(np.roll(shape, -1, axis=1) - shape, axis=2)
+    arclength = np.concatenate([np.zeros((len(shape), 1)), np.cumsum(segments, axis=1)], axis=1)
+    total = arclength[:, -1:]
+    uniform = np.linspace(0, 1, shape.shape[1] + 1)
+    u = np.divide(arclength, total, out=np.broadcast_to(uniform, arclength.shape).copy(), where=total > 0)
+
+    first = coiling_axis.current_iteration + 1
+    last = coiling_axis.max_iterations - 1
+    v = (along_n - first) / (last - first) if last > first else np.zeros(len(iterations))
+    uvs = np.stack([u, np.broadcast_to(v[:, None], u.shape)], axis=-1)
+
+    return vertices, normals, uvs
+
+def _hash_words(words, multipliers):
+    # Multilinear hash of the last axis of a float64 array: the sum of each
+    # 64-bit word times a fixed random odd multiplier, wrapping at 2 ** 64
+    words = np.ascontiguousarray(words, dtype=np.float64)
+    words = words.view(np.uint64).reshape(words.shape[:-1] + (-1,))
+    return (words * multipliers[:words.shape[-1]]).sum(axis=-1, dtype=np.uint64)
+
+def _fingerprint_multipliers(seed, size):
+    return np.random.default_rng(seed).integers(2 ** 64, size=size, dtype=np.uint64) | np.uint64(1)
+
+def _shape_hashes(coiling_axis, iterations, seed):
+    # Like generating_shape_array, but hashing each distinct shape once
+    # rather than stacking a copy of it per ring
+    if isinstance(coiling_axis.generating_shape, Morph):
+        shapes = coiling_axis.generating_shape.over(iterations).reshape(len(iterations), -1)
+        return _hash_words(shapes, _fingerprint_multipliers(seed, shapes.shape[1]))
+
+    hashes = np.empty(len(iterations), dtype=np.uint64)
+    last_shape = None
+    for i, n in enumerate(iterations):
+        shape = coiling_axis.generating_shape(n.item())
+        if shape is not last_shape:
+            last_shape = shape
+            points = shape_array(shape).ravel()
+            last_hash = _hash_words(points, _fingerprint_multipliers(seed, len(points)))
+        hashes[i] = last_hash
+    return hashes
+
+def ring_fingerprints(coiling_axis, iterations, surface=False):
+    # A 64-bit fingerprint per ring of everything its vertices depend on:
+    # the axis frame, the iteration, the four growth values and the
+    # generating shape. Rings whose fingerprint is unchanged between two
+    # versions of a shell have the same vertices. With surface, also of
+    # what sweep_surface's normals depend on: the growth derivatives and
+    # the shapes half an iteration either side.
+    iterations = np.asarray(iterations)
+    if len(iterations) == 0:
+        return np.zeros(0, dtype=np.uint64)
+
+    frame = np.array([v.to_list() for v in [coiling_axis.start_point, coiling_axis.tangent,
+        coiling_axis.normal, coiling_axis.binormal]], dtype=np.float64)
+    growth = [coiling_axis.displacement, coiling_axis.coiling_rate,
+        coiling_axis.coiling_radius, coiling_axis.scaling_factor]
+
+    columns = [iterations.astype(np.float64)] + [evaluate_over_iterations(f, iterations) for f in growth]
+    if surface:
+        columns += [derivative_over_iterations(f, iterations) for f in growth]
+    parameters = np.column_stack(columns)
+
+    fingerprints = _hash_words(parameters, _fingerprint_multipliers(1, parameters.shape[1]))
+    fingerprints += _hash_words(frame.ravel(), _fingerprint_multipliers(0, frame.size))
+    fingerprints += _shape_hashes(coiling_axis, iterations, 2) * np.uint64(0x9e3779b97f4a7c15)
+    if surface:
+        along_n = iterations.astype(np.float64)
+        fingerprints += _shape_hashes(coiling_axis, along_n - 0.5, 3) * np.uint64(0xc2b2ae3d27d4eb4f)
+        fingerprints += _shape_hashes(coiling_axis, along_n + 0.5, 4) * np.uint64(0x165667b19e3779f9)
+    return fingerprints
+
+def generate_sweep_array(coiling_axis):
+    # Same vertices as generate_sweep, in the same order, but evaluated for
+    # every iteration at once. The axis itself is left untouched.
+    iterations = np.arange(coiling_axis.current_iteration + 1, coiling_axis.max_iterations)
+    if len(iterations) == 0:
+        return np.zeros((0, 3), dtype=np.float64)
+
+    return sweep_vertices(coiling_axis, iterations).reshape(-1, 3)
+
+def sweep_lods(coiling_axis, levels=4, ring_step=2, profile_step=2, min_profile=4):
+    # Level-of-detail pyramid from a single evaluation of the sweep: LOD0 is
+    # the full (rings, profile, 3) vertex grid, and each further level keeps
+    # every ring_step-th ring and profile_step-th profile point of the full
+    # grid at ring_step ** level / profile_step ** level. The first and last
+    # rings are always kept so every level spans the whole shell.
+    iterations = np.arange(coiling_axis.current_iteration + 1, coiling_axis.max_iterations)
+    grid = sweep_vertices(coiling_axis, iterations)
+    rings, profile_len = grid.shape[:2]
+
+    lods = [grid]
+    for level in range(1, levels):
+        ring_index = np.unique(np.append(np.arange(0, rings, ring_step ** level), rings - 1))
+
+        step = profile_step ** level
+        if profile_len // step < min_profile:
+            step = max(1, profile_len // min_profile)
+        profile_index = np.arange(0, profile_len, step)
+
+        lods.append(grid[ring_index][:, profile_index])
+
+    return lods
+
+def iterate_sweep(coiling_axis, block_size=256):
+    # Streams the sweep one ring at a time, yielding (vertices, faces): the
+    # ring's (profile, 3) vertices and the (profile, 4) quads joining it to
+    # the previous ring, indexed like the full mesh (empty for the first
+    # ring). Rings are evaluated block_size at a time, so memory stays
+    # bounded however many iterations the axis runs for.
+    rings = 0
+    for start in range(coiling_axis.current_iteration + 1, coiling_axis.max_iterations, block_size):
+        block = np.arange(start, min(start + block_size, coiling_axis.max_iterations))
+        for ring in sweep_vertices(coiling_axis, block):
+            profile_len = len(ring)
+            if rings == 0:
+                faces = np.zeros((0, 4), dtype=np.int32)
+            else:
+                faces = ring_strip_topology(2, profile_len)[0].astype(np.int64) + (rings - 1) * profile_len
+            yield ring, faces
+            rings += 1
+
+def adaptive_iterations(coiling_axis, spacing, tolerance=None, min_scale=0.0):
+    # The iterations to keep rings at, a subset of the fixed one ring per
+    # iteration: roughly `spacing` apart in world space, with rings added
+    # back until every dropped ring is within `tolerance` of the faces
+    # between the rings either side of it. Rings whose scale is below
+    # min_scale are dropped.
+    return _adaptive_rings(coiling_axis, spacing, tolerance, min_scale)[0]
+
+def _adaptive_rings(coiling_axis, spacing, tolerance, min_scale):
+    # (kept iterations, their index into the dense rings, dense vertices)
+    iterations = np.arange(coiling_axis.current_iteration + 1, coiling_axis.max_iterations)
+    if min_scale > 0:
+        scale = np.abs(evaluate_over_iterations(coiling_axis.scaling_factor, iterations))
+        iterations = iterations[scale >= min_scale]
+
+    dense = sweep_vertices(coiling_axis, iterations)
+    if len(iterations) <= 2:
+        return iterations, np.arange(len(iterations)), dense
+
+    # A ring wherever the furthest moving vertex has travelled another
+    # `spacing` since the first ring
+    travel = np.concatenate([[0.0], np.cumsum(np.linalg.norm(np.diff(dense, axis=0), axis=2).max(axis=1))])
+    marks = np.arange(0, travel[-1], spacing) if spacing > 0 else travel
+    kept = np.unique(np.concatenate([np.searchsorted(travel, marks, side="right") - 1, [len(dense) - 1]]))
+
+    if tolerance is not None:
+        rings = np.arange(len(dense))
+        while True:
+            # Each dense ring against the straight faces between the kept
+            # rings either side of it, halving every span that strays too far
+            right = np.minimum(np.searchsorted(kept, rings, side="right"), len(kept) - 1)
+            left = right - 1
+            a, b = kept[left], kept[right]
+            f = ((rings - a) / (b - a))[:, None, None]
+            error = np.linalg.norm(dense - (dense[a] * (1 - f) + dense[b] * f), axis=2).max(axis=1)
+
+            bad = np.unique(left[error > tolerance])
+            if len(bad) == 0:
+                break
+            kept = np.union1d(kept, (kept[bad] + kept[bad + 1]) // 2)
+
+    return iterations[kept], kept, dense
+
+def generate_sweep_adaptive(coiling_axis, spacing, tolerance=None, min_scale=0.0):
+    # generate_sweep_array with rings placed by adaptive_iterations. Returns
+    # (vertices, iterations); the topology is
+    # ring_strip_topology(len(iterations), profile).
+    iterations, kept, dense = _adaptive_rings(coiling_axis, spacing, tolerance, min_scale)
+    return dense[kept].reshape(-1, 3), iterations
@@ -0,0 +1,272 @@
+import numpy as np
+
+from .growth import from_spec
+from .profiles import shape_array
+from .mesh_upload import mark_shell
+
+# Geometry Nodes backend for coiling_axis sweeps. Instead of evaluating the
+# sweep in Python and uploading a mesh, new_sweep_object builds a node group
+# that computes the same vertices inside Blender:
+#
+#   Curve Line -> Resample (one point per ring) --+
+#                                                 +-> Curve to Mesh -> Set Position
+#   profile object -> Mesh to Curve --------------+
+#
+# Curve to Mesh gives the ring-strip topology (vertex ring * P + j), and Set
+# Position moves vertex j of ring n to
+#
+#   start + (displacement(n) + scaling_factor(n) * y_j) * tangent
+#         + (coiling_radius(n) + scaling_factor(n) * x_j) * normal(coiling_rate(n))
+#
+# with the growth laws built out of Math nodes. Every number in them (a, l,
+# k, divisor, ...) is a modifier input named "<parameter> <field>", e.g.
+# "Displacement l", so shells can be edited and keyframed without Python.
+# Blender evaluates in single precision, so vertices agree with
+# generate_sweep_array to float32 rounding rather than bit for bit.
+
+GROWTH_PARAMETERS = [
+    ("Coiling Rate", "coiling_rate"),
+    ("Displacement", "displacement"),
+    ("Coiling Radius", "coiling_radius"),
+    ("Scaling Factor", "scaling_factor"),
+]
+
+def _enabled(sockets, name):
+    # Nodes like Sample Index have one socket per data type with the same
+    # name; only the one for the chosen type is enabled
+    for socket in sockets:
+        if socket.name == name and socket.enabled:
+            return socket
+    return sockets[name]
+
+class _NodeBuilder(object):
+    def __init__(self, tree):
+        self.tree = tree
+        self.nodes = tree.nodes
+        self.links = tree.links
+        self.column = 0
+        self.row = 0
+
+        for node in list(self.nodes):
+            self.nodes.remove(node)
+        self.group_input = self.node('NodeGroupInput')
+        self.group_output = self.node('NodeGroupOutput')
+        self.values = {}
+
+    def node(self, bl_idname, **properties):
+        node = self.nodes.new(bl_idname)
+        for key, value in properties.items():
+            setattr(node, key, value)
+        node.location = (200 * self.column, -160 * self.row)
+        self.row += 1
+        if self.row == 8:
+            self.row = 0
+            self.column += 1
+        return node
+
+    def new_socket(self, name, socket_type, in_out):
+        if hasattr(self.tree, "interface"):
+            return self.tree.interface.new_socket(name=name, in_out=in_out, socket_type=socket_type)
+        # Before Blender 4.0
+        sockets = self.tree.inputs if in_out == 'INPUT' else self.tree.outputs
+        return sockets.new(socket_type, name)
+
+    def input(self, name, value, socket_type='NodeSocketFloat'):
+        # A group input, shown on the modifier, starting at value
+        item = self.new_socket(name, socket_type, 'INPUT')
+        if value is not None:
+            item.default_value = value
+        self.values[name] = value
+        return self.group_input.outputs[name]
+
+    def connect(self, socket, value):
+        if hasattr(value, "is_linked") or hasattr(value, "links"):
+            self.links.new(value, socket)
+        else:
+            socket.default_value = value
+
+    def math(self, operation, a, b=None):
+        node = self.node('ShaderNodeMath', operation=operation)
+        self.connect(node.inputs[0], a)
+        if b is not None:
+            self.connect(node.inputs[1], b)
+        return node.outputs[0]
+
+    def scale(self, vector, factor):
+        node = self.node('ShaderNodeVectorMath', operation='SCALE')
+        self.connect(node.inputs[0], vector)
+        self.connect(_enabled(node.inputs, "Scale"), factor)
+        return node.outputs[0]
+
+    def add_vectors(self, a, b):
+        node = self.node('ShaderNodeVectorMath', operation='ADD')
+        self.connect(node.inputs[0], a)
+        self.connect(node.inputs[1], b)
+        return node.outputs[0]
+
+    def growth(self, function, n, prefix):
+        # Math nodes evaluating a growth function (see growth.py) at n
+        spec = function.to_dict()
+        kind = spec["type"]
+        inputs = {key: self.input("{0} {1}".format(prefix, key), float(value))
+            for key, value in spec.items() if key not in ("type", "pieces")}
+
+        if kind == "constant":
+            return inputs["value"]
+        if kind == "linear":
+            return self.math('ADD', self.math('DIVIDE', self.math('MULTIPLY', n, inputs["a"]), inputs["divisor"]), inputs["b"])
+        if kind == "quadratic":
+            a_n = self.math('MULTIPLY', self.math('MULTIPLY', inputs["a"], n), n)
+            polynomial = self.math('ADD', self.math('ADD', a_n, self.math('MULTIPLY', inputs["b"], n)), inputs["c"])
+            return self.math('DIVIDE', polynomial, inputs["divisor"])
+        if kind == "power":
+            power = self.math('POWER', inputs["l"], self.math('SUBTRACT', n, inputs["k"]))
+            return self.math('DIVIDE', self.math('MULTIPLY', inputs["a"], power), inputs["divisor"])
+        if kind == "piecewise":
+            # value += (n >= start) * (piece - value), piece by piece
+            pieces = function.pieces
+            value = self.growth(pieces[0][1], n, prefix + " 0")
+            for i, (start, piece) in enumerate(pieces[1:], 1):
+                start = self.input("{0} {1} start".format(prefix, i), float(start))
+                active = self.math('GREATER_THAN', n, self.math('SUBTRACT', start, 0.5))
+                piece = self.growth(piece, n, "{0} {1}".format(prefix, i))
+                value = self.math('ADD', value, self.math('MULTIPLY', active, self.math('SUBTRACT', piece, value)))
+            return value
+
+        raise ValueError("No Geometry Nodes version of {0!r} growth functions".format(kind))
+
+def sweep_node_group(tree, coiling_axis, profile_object):
+    # Fills a GeometryNodeTree with the sweep of coiling_axis. Returns
+    # {input name: value} for every input, to set on the modifier.
+    growth = {}
+    for label, attribute in GROWTH_PARAMETERS:
+        function = getattr(coiling_axis, attribute)
+        try:
+            growth[label] = from_spec(function)
+        except (TypeError, KeyError, ValueError):
+            raise ValueError("{0} must be a number or growth function (see growth.py) "
+                "for the Geometry Nodes backend, not {1!r}".format(label, function))
+
+    b = _NodeBuilder(tree)
+    b.new_socket("Geometry", 'NodeSocketGeometry', 'OUTPUT')
+
+    first = b.input("First Iteration", coiling_axis.current_iteration + 1, 'NodeSocketInt')
+    last = b.input("Iterations", coiling_axis.max_iterations, 'NodeSocketInt')
+    start = b.input("Start", tuple(coiling_axis.start_point.to_list()), 'NodeSocketVector')
+    profile = b.input("Profile", None, 'NodeSocketObject')
+    b.values["Profile"] = profile_object
+
+    # Rings along a line, one point each, swept with the profile curve
+    object_info = b.node('GeometryNodeObjectInfo')
+    b.connect(object_info.inputs["Object"], profile)
+    profile_curve = b.node('GeometryNodeMeshToCurve')
+    b.connect(profile_curve.inputs["Mesh"], object_info.outputs["Geometry"])
+
+    line = b.node('GeometryNodeCurvePrimitiveLine')
+    resample = b.node('GeometryNodeResampleCurve')
+    b.connect(resample.inputs["Curve"], line.outputs["Curve"])
+    b.connect(resample.inputs["Count"], b.math('SUBTRACT', last, first))
+
+    curve_to_mesh = b.node('GeometryNodeCurveToMesh')
+    b.connect(curve_to_mesh.inputs["Curve"], resample.outputs["Curve"])
+    b.connect(curve_to_mesh.inputs["Profile Curve"], profile_curve.outputs["Curve"])
+
+    # Ring n and profile point j of each vertex
+    size = b.node('GeometryNodeAttributeDomainSize', component='CURVE')
+    b.connect(size.inputs["Geometry"], profile_curve.outputs["Curve"])
+    profile_len = size.outputs["Point Count"]
+
+    # (index - j) / P rather than floor(index / P), which single precision
+    # can round up on the last point of a ring
+    index = b.node('GeometryNodeInputIndex').outputs["Index"]
+    j = b.math('MODULO', index, profile_len)
+    n = b.math('ADD', b.math('DIVIDE', b.math('SUBTRACT', index, j), profile_len), first)
+
+    sample = b.node('GeometryNodeSampleIndex', data_type='FLOAT_VECTOR', domain='POINT')
+    b.connect(sample.inputs["Geometry"], profile_curve.outputs["Curve"])
+    b.connect(_enabled(sample.inputs, "Value"), b.node('GeometryNodeInputPosition').outputs["Position"])
+    b.connect(sample.inputs["Index"], j)
+    xy = b.node('ShaderNodeSeparateXYZ')
+    b.connect(xy.inputs[0], _enabled(sample.outputs, "Value"))
+
+    values = {label: b.growth(function, n, label) for label, function in growth.items()}
+    scale = values["Scaling Factor"]
+    along = b.math('ADD', values["Displacement"], b.math('MULTIPLY', scale, xy.outputs["Y"]))
+    out = b.math('ADD', values["Coiling Radius"], b.math('MULTIPLY', scale, xy.outputs["X"]))
+    angle = values["Coiling Rate"]
+
+    position = b.add_vectors(start, b.scale(tuple(coiling_axis.tangent.to_list()), along))
+    position = b.add_vectors(position, b.scale(tuple(coiling_axis.normal.to_list()), b.math('MULTIPLY', out, b.math('COSINE', angle))))
+    position = b.add_vectors(position, b.scale(tuple(coiling_axis.binormal.to_list()), b.math('MULTIPLY', out, b.math('SINE', angle))))
+
+    set_position = b.node('GeometryNodeSetPosition')
+    b.connect(set_position.inputs["Geometry"], curve_to_mesh.outputs["Mesh"])
+    b.connect(set_position.inputs["Position"], position)
+    b.connect(b.group_output.inputs[0], set_position.outputs["Geometry"])
+
+    return b.values
+
+def new_profile_object(profile, name='new_profile'):
+    # The generating shape as a closed loop of vertices in the XY plane,
+    # hidden, for the node group's Profile input
+    import bpy
+
+    points = shape_array(profile)
+    vertices = np.column_stack([points, np.zeros(len(points))])
+    edges = np.column_stack([np.arange(len(points)), np.roll(np.arange(len(points)), -1)])
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(vertices))
+    mesh.vertices.foreach_set("co", vertices.astype(np.float32).ravel())
+    mesh.edges.add(len(edges))
+    mesh.edges.foreach_set("vertices", edges.astype(np.int32).ravel())
+    mesh.update()
+
+    obj = bpy.data.objects.new(name, mesh)
+    obj.hide_viewport = True
+    obj.hide_render = True
+    return obj
+
+def set_sweep_inputs(obj, values, modifier_name='Sweep'):
+    # Sets modifier inputs by name, e.g. {"Displacement l": 1.02}
+    modifier = obj.modifiers[modifier_name]
+    tree = modifier.node_group
+    if hasattr(tree, "interface"):
+        items = [item for item in tree.interface.items_tree if getattr(item, "in_out", None) == 'INPUT']
+    else:
+        items = list(tree.inputs)
+    identifiers = {item.name: item.identifier for item in items}
+
+    for name, value in values.items():
+        if value is not None:
+            modifier[identifiers[name]] = value
+    obj.update_tag()
+
+def new_sweep_object(coiling_axis, name='new_object'):
+    # Node-driven counterpart of new_mesh_object: an object whose Sweep
+    # modifier generates the shell. The generating shape has to be the same
+    # at every iteration (morphs aren't supported).
+    import bpy
+
+    first = coiling_axis.current_iteration + 1
+    profile = coiling_axis.generating_shape(first)
+    if coiling_axis.generating_shape(coiling_axis.max_iterations - 1) is not profile:
+        raise ValueError("The Geometry Nodes backend needs a constant generating shape")
+
+    new_collection = bpy.data.collections.new('new_collection')
+    bpy.context.scene.collection.children.link(new_collection)
+
+    profile_object = new_profile_object(profile, name + '_profile')
+    new_collection.objects.link(profile_object)
+
+    tree = bpy.data.node_groups.new(name + '_sweep', 'GeometryNodeTree')
+    values = sweep_node_group(tree, coiling_axis, profile_object)
+
+    new_object = bpy.data.objects.new(name, bpy.data.meshes.new(name))
+    modifier = new_object.modifiers.new('Sweep', 'NODES')
+    modifier.node_group = tree
+    mark_shell(new_object)
+    new_collection.objects.link(new_object)
+
+    set_sweep_inputs(new_object, values)
+    return new_object
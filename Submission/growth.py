@@ -0,0 +1,158 @@
+import hashlib
+import json
+import math
+
+import numpy as np
+
+# Declarative growth functions for coiling_axis. Unlike lambdas and closures
+# over a module-level `l` they can be pickled for worker processes, written
+# to spec files, hashed for caching, and evaluated on a whole array of
+# iterations at once. Each is written so that it rounds exactly like the
+# hand-written function it replaces, e.g. Linear(math.pi, divisor=18) is
+# n * math.pi / 18 and Power(0.5, 1.03, 300, divisor=6) is
+# 0.5 * 1.03 ** (n - 300) / 6.
+
+class GrowthFunction(object):
+    def __call__(self, n):
+        raise NotImplementedError
+
+    def derivative(self, n):
+        # d/dn, used for the sweep's surface normals; a central difference
+        # unless the function knows better
+        return self(n + 0.5) - self(n - 0.5)
+
+    def to_dict(self):
+        raise NotImplementedError
+
+    @property
+    def key(self):
+        # Stable across processes and runs, unlike hash()
+        text = json.dumps(self.to_dict(), sort_keys=True)
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def __eq__(self, other):
+        return isinstance(other, GrowthFunction) and self.to_dict() == other.to_dict()
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return "{0}({1})".format(type(self).__name__, self.to_dict())
+
+class Constant(GrowthFunction):
+    def __init__(self, value):
+        self.value = value
+
+    def __call__(self, n):
+        return self.value
+
+    def derivative(self, n):
+        return 0
+
+    def to_dict(self):
+        return {"type": "constant", "value": self.value}
+
+class Linear(GrowthFunction):
+    # n * a / divisor + b
+    def __init__(self, a, b=0, divisor=1):
+        self.a = a
+        self.b = b
+        self.divisor = divisor
+
+    def __call__(self, n):
+        return n * self.a / self.divisor + self.b
+
+    def derivative(self, n):
+        return self.a / self.divisor
+
+    def to_dict(self):
+        return {"type": "linear", "a": self.a, "b": self.b, "divisor": self.divisor}
+
+class Quadratic(GrowthFunction):
+    # (a * n ** 2 + b * n + c) / divisor
+    def __init__(self, a, b=0, c=0, divisor=1):
+        self.a = a
+        self.b = b
+        self.c = c
+        self.divisor = divisor
+
+    def __call__(self, n):
+        return (self.a * n ** 2 + self.b * n + self.c) / self.divisor
+
+    def derivative(self, n):
+        return (2 * self.a * n + self.b) / self.divisor
+
+    def to_dict(self):
+        return {"type": "quadratic", "a": self.a, "b": self.b, "c": self.c, "divisor": self.divisor}
+
+class Power(GrowthFunction):
+    # a * l ** (n - k) / divisor
+    def __init__(self, a, l, k=0, divisor=1):
+        self.a = a
+        self.l = l
+        self.k = k
+        self.divisor = divisor
+
+    def __call__(self, n):
+        # A float base, since NumPy won't raise integers to negative integer
+        # powers, e.g. Power(0.0075, 2, 300) over np.arange(1, 5)
+        return self.a * float(self.l) ** (n - self.k) / self.divisor
+
+    def derivative(self, n):
+        return self.a * float(self.l) ** (n - self.k) * math.log(self.l) / self.divisor
+
+    def to_dict(self):
+        return {"type": "power", "a": self.a, "l": self.l, "k": self.k, "divisor": self.divisor}
+
+class Piecewise(GrowthFunction):
+    # pieces: [(start, growth function), ...]; each piece applies from its
+    # start iteration up to the next piece's start
+    def __init__(self, pieces):
+        self.pieces = sorted(((start, from_spec(f)) for start, f in pieces), key=lambda piece: piece[0])
+
+    def _select(self, n, evaluate):
+        # evaluate(piece) of the piece each n falls in
+        if np.ndim(n) == 0:
+            value = evaluate(self.pieces[0][1])
+            for start, f in self.pieces[1:]:
+                if n >= start:
+                    value = evaluate(f)
+            return value
+
+        n = np.asarray(n)
+        values = np.broadcast_to(evaluate(self.pieces[0][1]), n.shape)
+        for start, f in self.pieces[1:]:
+            values = np.where((n >= start).astype(bool), evaluate(f), values)
+        return values
+
+    def __call__(self, n):
+        return self._select(n, lambda f: f(n))
+
+    def derivative(self, n):
+        return self._select(n, lambda f: f.derivative(n))
+
+    def to_dict(self):
+        return {"type": "piecewise", "pieces": [[start, f.to_dict()] for start, f in self.pieces]}
+
+growth_types = {
+    "constant": Constant,
+    "linear": Linear,
+    "quadratic": Quadratic,
+    "power": Power,
+}
+
+def from_spec(spec):
+    # Builds a growth function from a number, a to_dict() style dict, or
+    # passes an existing growth function through
+    if isinstance(spec, GrowthFunction):
+        return spec
+    if isinstance(spec, (int, float)):
+        return Constant(spec)
+
+    spec = dict(spec)
+    kind = spec.pop("type")
+    if kind == "piecewise":
+        return Piecewise(spec["pieces"])
+    if kind not in growth_types:
+        raise ValueError("Unknown growth function type {0!r}".format(kind))
+    return growth_types[kind](**spec)
@@ -0,0 +1,166 @@
+import copy
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from .geometry import Vector3, evaluate_over_iterations
+from .growth import GrowthFunction
+from .profiles import shape_array
+
+# On-disk cache of generated meshes, keyed by a hash of everything that goes
+# into them. Each entry is a directory of .npy files (vertices as float32,
+# which is all Blender keeps, plus int32 faces and edges) that is memory
+# mapped on load. Entries are touched on every hit and the least recently
+# used are evicted once the cache grows past max_bytes.
+
+# Bump when the geometry or the entry layout changes, to invalidate old
+# entries
+CACHE_VERSION = "1"
+
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser("~"), ".cache", "seashells", "meshes")
+
+def _update_vector(h, v):
+    h.update(np.array(v.to_list(), dtype=np.float64).tobytes())
+
+def _update_growth(h, function, iterations):
+    # Growth functions hash their definition; other callables can only be
+    # identified by what they evaluate to
+    if isinstance(function, GrowthFunction):
+        h.update(function.key.encode("utf-8"))
+    else:
+        h.update(evaluate_over_iterations(function, iterations).tobytes())
+
+def sweep_key(coiling_axis, options=None):
+    # Content hash of a coiling_axis: frame, growth functions, generating
+    # shapes and the iterations generate_sweep would visit, plus any
+    # options that change how it is swept (e.g. adaptive sampling)
+    h = hashlib.sha1(("sweep-" + CACHE_VERSION).encode("utf-8"))
+    if options:
+        h.update(json.dumps(options, sort_keys=True).encode("utf-8"))
+    iterations = np.arange(coiling_axis.current_iteration + 1, coiling_axis.max_iterations)
+    h.update(iterations[[0, -1]].tobytes() if len(iterations) else b"")
+
+    for v in [coiling_axis.start_point, coiling_axis.tangent, coiling_axis.normal, coiling_axis.binormal]:
+        _update_vector(h, v)
+
+    for function in [coiling_axis.displacement, coiling_axis.coiling_rate,
+            coiling_axis.coiling_radius, coiling_axis.scaling_factor]:
+        _update_growth(h, function, iterations)
+
+    # Constant shapes hand back the same list every iteration; hash each
+    # distinct shape once and the iteration it starts at
+    last_shape = None
+    for i, n in enumerate(iterations.tolist()):
+        shape = coiling_axis.generating_shape(n)
+        if shape is not last_shape:
+            last_shape = shape
+            h.update(iterations[i].tobytes())
+            h.update(np.ascontiguousarray(shape_array(shape), dtype=np.float64).tobytes())
+
+    return h.hexdigest()
+
+def instance_key(coiling_axis, options=None):
+    # sweep_key with the start point left out: shells with the same
+    # instance_key are the same mesh, translated
+    local = copy.copy(coiling_axis)
+    local.start_point = Vector3(0, 0, 0)
+    return sweep_key(local, options)
+
+def interpolation_key(key_vertices, iterations, keys=None, easing="linear"):
+    # Content hash of a morph between vertex rings (see extrude.py); an
+    # easing given as a function rather than by name can't be hashed
+    if not isinstance(easing, str):
+        return None
+    h = hashlib.sha1(("interpolate-" + CACHE_VERSION).encode("utf-8"))
+    for vertices in key_vertices:
+        h.update(np.ascontiguousarray(vertices, dtype=np.float64).tobytes())
+    keys = None if keys is None else [float(k) for k in keys]
+    h.update(json.dumps([iterations, keys, easing]).encode("utf-8"))
+    return h.hexdigest()
+
+class MeshCache(object):
+    def __init__(self, directory=DEFAULT_DIRECTORY, max_bytes=2 * 1024 ** 3):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _entry(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key, attributes=()):
+        # Returns memory-mapped (vertices, faces, edges) followed by the
+        # named attributes stored along with them (see put), or None on a
+        # miss
+        entry = self._entry(key)
+        try:
+            arrays = tuple(
+                np.load(os.path.join(entry, name + ".npy"), mmap_mode="r")
+                for name in ("vertices", "faces", "edges") + tuple(attributes)
+            )
+            os.utime(entry)
+        except (FileNotFoundError, ValueError):
+            # Missing, or evicted by another thread or process meanwhile
+            return None
+        return arrays
+
+    def put(self, key, vertices, faces, edges, **attributes):
+        # attributes: further float arrays to keep with the mesh, e.g.
+        # normals=..., uvs=...; keys should say whether they're included
+        entry = self._entry(key)
+        try:
+            os.utime(entry)
+            return
+        except FileNotFoundError:
+            pass
+
+        # Write into a scratch directory and rename it into place, so readers
+        # never see a half written entry. The cache directory itself is only
+        # created on the first put, so constructing a MeshCache is free.
+        os.makedirs(self.directory, exist_ok=True)
+        scratch = tempfile.mkdtemp(dir=self.directory, prefix=".tmp-")
+        np.save(os.path.join(scratch, "vertices.npy"), np.asarray(vertices, dtype=np.float32))
+        np.save(os.path.join(scratch, "faces.npy"), np.asarray(faces, dtype=np.int32))
+        np.save(os.path.join(scratch, "edges.npy"), np.asarray(edges, dtype=np.int32))
+        for name, values in attributes.items():
+            np.save(os.path.join(scratch, name + ".npy"), np.asarray(values, dtype=np.float32))
+        try:
+            os.rename(scratch, entry)
+        except OSError:
+            # Another process stored the same key first
+            shutil.rmtree(scratch, ignore_errors=True)
+
+        self.evict(keep=key)
+
+    def entries(self):
+        # [(last used, size in bytes, key)], oldest first
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for item in os.scandir(self.directory):
+            if not item.is_dir() or item.name.startswith("."):
+                continue
+            try:
+                size = sum(f.stat().st_size for f in os.scandir(item.path))
+                entries.append((item.stat().st_mtime, size, item.name))
+            except FileNotFoundError:
+                # Removed by a concurrent evict
+                continue
+        return sorted(entries)
+
+    def evict(self, keep=None):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._entry(key), ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        for _, _, key in self.entries():
+            shutil.rmtree(self._entry(key), ignore_errors=True)
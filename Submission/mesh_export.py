@@ -0,0 +1,136 @@
+import os
+import shutil
+import struct
+import tempfile
+
+import numpy as np
+
+# Streaming mesh writers for huge shells. They consume the (vertices, faces)
+# rings yielded by geometry.iterate_sweep and write straight to disk, keeping
+# only the previous ring in memory. Counts that binary STL and PLY want up
+# front are patched in once the stream ends, so the output file must be
+# seekable.
+
+STL_TRIANGLE = np.dtype([
+    ("normal", "<f4", 3),
+    ("vertices", "<f4", (3, 3)),
+    ("attribute", "<u2"),
+])
+
+PLY_VERTEX = np.dtype([("co", "<f4", 3)])
+
+PLY_FACE = np.dtype([("count", "u1"), ("vertex_indices", "<u4", 4)])
+
+# Wide enough for any count, and still a valid integer to PLY readers
+PLY_COUNT_WIDTH = 12
+
+def grid_rings(grid):
+    # The (vertices, faces) ring stream for an already built
+    # (rings, profile, 3) vertex grid, e.g. one level of sweep_lods
+    from .topology import ring_strip_topology
+
+    profile_len = grid.shape[1]
+    strip = ring_strip_topology(2, profile_len)[0].astype(np.int64)
+    for i, ring in enumerate(grid):
+        if i == 0:
+            yield ring, np.zeros((0, 4), dtype=np.int64)
+        else:
+            yield ring, strip + (i - 1) * profile_len
+
+def quads_to_triangles(quads):
+    # [a, b, c, d] -> [a, b, c], [a, c, d]
+    return np.concatenate([quads[:, [0, 1, 2]], quads[:, [0, 2, 3]]])
+
+def write_stl(path, rings, header=b"PerlinSeashells"):
+    # Binary STL; returns the number of triangles written
+    n_triangles = 0
+    previous = None
+    offset = 0
+
+    with open(path, "wb") as f:
+        f.write(header[:80].ljust(80, b"\0"))
+        f.write(struct.pack("<I", 0))
+
+        for vertices, faces in rings:
+            vertices = np.asarray(vertices, dtype=np.float64)
+            if len(faces):
+                # Faces only ever join the previous ring to this one
+                window = np.concatenate([previous, vertices])
+                triangles = window[quads_to_triangles(np.asarray(faces) - offset)]
+
+                normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+                lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+                normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+
+                records = np.zeros(len(triangles), dtype=STL_TRIANGLE)
+                records["normal"] = normals
+                records["vertices"] = triangles
+                f.write(records.tobytes())
+                n_triangles += len(triangles)
+
+                offset += len(previous)
+            previous = vertices
+
+        f.seek(80)
+        f.write(struct.pack("<I", n_triangles))
+
+    return n_triangles
+
+def write_ply(path, rings):
+    # Binary little endian PLY with quad faces; returns (vertices, faces).
+    # PLY lists every vertex before any face, so faces are spilled to a
+    # temporary file next to the output and appended at the end.
+    n_vertices = 0
+    n_faces = 0
+
+    header = (
+        "ply\n"
+        "format binary_little_endian 1.0\n"
+        "comment PerlinSeashells\n"
+        "element vertex {0}\n"
+        "property float x\n"
+        "property float y\n"
+        "property float z\n"
+        "element face {1}\n"
+        "property list uchar uint vertex_indices\n"
+        "end_header\n"
+    )
+    placeholder = "0" * PLY_COUNT_WIDTH
+
+    with open(path, "wb") as f, tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(path))) as spill:
+        f.write(header.format(placeholder, placeholder).encode("ascii"))
+
+        for vertices, faces in rings:
+            records = np.zeros(len(vertices), dtype=PLY_VERTEX)
+            records["co"] = vertices
+            f.write(records.tobytes())
+            n_vertices += len(vertices)
+
+            if len(faces):
+                records = np.zeros(len(faces), dtype=PLY_FACE)
+                records["count"] = 4
+                records["vertex_indices"] = faces
+                spill.write(records.tobytes())
+                n_faces += len(faces)
+
+        spill.seek(0)
+        shutil.copyfileobj(spill, f)
+
+        f.seek(0)
+        f.write(header.format(
+            str(n_vertices).zfill(PLY_COUNT_WIDTH), str(n_faces).zfill(PLY_COUNT_WIDTH)
+        ).encode("ascii"))
+
+    return n_vertices, n_faces
+
+writers = {
+    ".stl": write_stl,
+    ".ply": write_ply,
+}
+
+def write_mesh(path, rings):
+    # Picks the writer from the file extension
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in writers:
+        raise ValueError("Can't stream meshes to {0!r} files".format(extension))
+    return writers[extension](path, rings)
@@ -0,0 +1,275 @@
+import numpy as np
+
+# Writes mesh data straight into Blender's attribute arrays with foreach_set
+# instead of handing nested lists to Mesh.from_pydata, which walks them again
+# in Python. Everything is passed as flat, contiguous buffers.
+
+# Custom property marking the objects that show a shell (rather than e.g.
+# the hidden profiles of the Geometry Nodes backend), naming the shell: the
+# levels of a LOD pyramid share one
+SHELL_PROPERTY = "shell"
+
+def mark_shell(obj, shell=None):
+    obj[SHELL_PROPERTY] = shell or obj.name
+
+def fill_mesh(mesh, vertices, faces, edges=None, normals=None, uvs=None):
+    # vertices: (n, 3) positions, faces: (n_faces, k) vertex indices of
+    # k-sided polygons, edges: optional (n_edges, 2). Missing edges are
+    # derived from the faces by Blender. Optionally normals: (n, 3)
+    # per-vertex custom normals, and uvs: (n_faces * k, 2) per-loop UVs.
+    import bpy
+
+    vertices = np.ascontiguousarray(vertices, dtype=np.float32).reshape(-1, 3)
+    faces = np.ascontiguousarray(faces, dtype=np.int32)
+    n_faces, sides = faces.shape
+
+    mesh.vertices.add(len(vertices))
+    mesh.vertices.foreach_set("co", vertices.ravel())
+
+    if edges is not None:
+        edges = np.ascontiguousarray(edges, dtype=np.int32).reshape(-1, 2)
+        mesh.edges.add(len(edges))
+        mesh.edges.foreach_set("vertices", edges.ravel())
+
+    mesh.loops.add(n_faces * sides)
+    mesh.loops.foreach_set("vertex_index", faces.ravel())
+
+    mesh.polygons.add(n_faces)
+    mesh.polygons.foreach_set("loop_start", np.arange(0, n_faces * sides, sides, dtype=np.int32))
+    if bpy.app.version < (3, 6, 0):
+        # Since 3.6 Blender derives loop_total from loop_start (and it can't
+        # be set)
+        mesh.polygons.foreach_set("loop_total", np.full(n_faces, sides, dtype=np.int32))
+
+    mesh.update(calc_edges=edges is None)
+
+    if uvs is not None:
+        set_uvs(mesh, uvs)
+    if normals is not None:
+        set_vertex_normals(mesh, normals)
+    return mesh
+
+def set_uvs(mesh, uvs, name="UVMap"):
+    uv_layer = mesh.uv_layers.get(name) or mesh.uv_layers.new(name=name)
+    uv_layer.data.foreach_set("uv", np.ascontiguousarray(uvs, dtype=np.float32).ravel())
+
+def get_uvs(mesh, name="UVMap"):
+    uvs = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+    mesh.uv_layers[name].data.foreach_get("uv", uvs)
+    return uvs.reshape(-1, 2)
+
+# Point attribute keeping a copy of the normals given to set_vertex_normals,
+# so patch_mesh_vertices can replace some of them without reading every
+# custom normal back through the loops
+NORMALS_ATTRIBUTE = "sweep_normal"
+
+def set_vertex_normals(mesh, normals):
+    # Custom split normals, one per vertex, shading every face smooth so
+    # Blender uses them instead of computing its own. Zero vectors leave
+    # Blender's normal in place (where the sweep is degenerate).
+    normals = np.ascontiguousarray(normals, dtype=np.float32).reshape(-1, 3)
+    mesh.polygons.foreach_set("use_smooth", np.ones(len(mesh.polygons), dtype=bool))
+    if hasattr(mesh, "use_auto_smooth"):
+        # Before Blender 4.1 custom normals are only used with auto smooth
+        mesh.use_auto_smooth = True
+    mesh.normals_split_custom_set_from_vertices(normals)
+
+    attribute = (mesh.attributes.get(NORMALS_ATTRIBUTE) or
+        mesh.attributes.new(NORMALS_ATTRIBUTE, 'FLOAT_VECTOR', 'POINT'))
+    attribute.data.foreach_set("vector", normals.ravel())
+
+def get_vertex_normals(mesh):
+    # The normals set by set_vertex_normals, from their copy if the mesh
+    # has one or else read back through the loops
+    attribute = mesh.attributes.get(NORMALS_ATTRIBUTE)
+    if attribute is not None:
+        normals = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        attribute.data.foreach_get("vector", normals)
+        return normals.reshape(-1, 3)
+
+    loop_normals = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+    if hasattr(mesh, "corner_normals"):
+        mesh.corner_normals.foreach_get("vector", loop_normals)
+    else:
+        # Before Blender 4.1
+        mesh.calc_normals_split()
+        mesh.loops.foreach_get("normal", loop_normals)
+
+    loop_vertices = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vertices)
+
+    normals = np.zeros((len(mesh.vertices), 3), dtype=np.float32)
+    normals[loop_vertices] = loop_normals.reshape(-1, 3)
+    return normals
+
+def patch_mesh_vertices(mesh, indices, vertices, normals=None, loops=None, uvs=None):
+    # Moves the given vertices of an existing mesh to new positions in place,
+    # leaving its topology (and materials, modifiers, ... on the object)
+    # alone. One foreach_get / foreach_set round trip of the whole buffer,
+    # since bpy can't set a slice of it. Optionally also replaces their
+    # custom normals (see set_vertex_normals) and the UVs of the given
+    # loops.
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    co.reshape(-1, 3)[indices] = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)
+    mesh.vertices.foreach_set("co", co)
+    mesh.update()
+
+    if uvs is not None:
+        all_uvs = get_uvs(mesh)
+        all_uvs[loops] = np.asarray(uvs, dtype=np.float32).reshape(-1, 2)
+        set_uvs(mesh, all_uvs)
+    if normals is not None:
+        all_normals = get_vertex_normals(mesh)
+        all_normals[indices] = np.asarray(normals, dtype=np.float32).reshape(-1, 3)
+        set_vertex_normals(mesh, all_normals)
+    return mesh
+
+def set_ring_fingerprints(mesh, fingerprints, profile_len):
+    # Kept as custom properties so they are saved with the .blend file
+    mesh["ring_fingerprints"] = np.asarray(fingerprints, dtype=np.uint64).tobytes().hex()
+    mesh["profile_len"] = int(profile_len)
+
+def get_ring_fingerprints(mesh):
+    # (fingerprints, profile_len) from set_ring_fingerprints, or (None, None)
+    text = mesh.get("ring_fingerprints")
+    if text is None:
+        return None, None
+    return np.frombuffer(bytes.fromhex(text), dtype=np.uint64), mesh.get("profile_len")
+
+def new_mesh_object(vertices, faces, edges=None, normals=None, uvs=None):
+    # Bulk counterpart of generate_mesh: same new_mesh / new_object /
+    # new_collection layout
+    import bpy
+
+    new_mesh = bpy.data.meshes.new('new_mesh')
+    fill_mesh(new_mesh, vertices, faces, edges, normals, uvs)
+
+    new_object = bpy.data.objects.new('new_object', new_mesh)
+    mark_shell(new_object)
+
+    new_collection = bpy.data.collections.new('new_collection')
+    bpy.context.scene.collection.children.link(new_collection)
+
+    new_collection.objects.link(new_object)
+    return new_object
+
+def new_mesh_objects(meshes, collection_name='Shells', instances=()):
+    # Uploads many meshes in one pass: meshes is a list of (name, vertices,
+    # faces, edges[, normals, uvs]) (see fill_mesh), each becoming an object
+    # of that name in one collection.
+    # instances is a list of (name, source name) for linked duplicates:
+    # objects sharing the mesh of the object made for a source entry of
+    # meshes, so repeated shells are only stored once. Their materials are
+    # linked to the objects (see link_materials_to_object). Returns the objects
+    # for meshes, then those for instances. Objects left by an earlier run
+    # under the same name are reused (a mesh only has its data replaced if
+    # it isn't shared), so names stay stable instead of picking up .001
+    # suffixes. The collection is linked into the scene after everything
+    # is in it, so the scene hierarchy changes once; nothing here asks for
+    # evaluated data, so Blender evaluates the depsgraph once afterwards
+    # rather than per shell.
+    import bpy
+
+    collection = (bpy.data.collections.get(collection_name) or
+        bpy.data.collections.new(collection_name))
+
+    def reuse_object(name, mesh):
+        obj = bpy.data.objects.get(name)
+        if obj is None or obj.type != 'MESH':
+            obj = bpy.data.objects.new(name, mesh)
+        elif obj.data != mesh:
+            obj.data = mesh
+        if obj.name not in collection.objects:
+            collection.objects.link(obj)
+        mark_shell(obj)
+        return obj
+
+    objects = []
+    for name, vertices, faces, edges, *attributes in meshes:
+        # A mesh named after its object is one this function made for it
+        obj = bpy.data.objects.get(name)
+        if obj is not None and obj.type == 'MESH' and obj.data.name == name:
+            mesh = obj.data
+            mesh.clear_geometry()
+        else:
+            mesh = bpy.data.meshes.new(name)
+        fill_mesh(mesh, vertices, faces, edges, *attributes)
+        objects.append(reuse_object(name, mesh))
+
+    # By the requested name: Blender renames a new object (name.001) when a
+    # non-mesh object already has the name
+    sources = {entry[0]: obj for entry, obj in zip(meshes, objects)}
+    for name, source in instances:
+        obj = reuse_object(name, sources[source].data)
+        link_materials_to_object(sources[source])
+        link_materials_to_object(obj)
+        objects.append(obj)
+
+    if collection.name not in bpy.context.scene.collection.children:
+        bpy.context.scene.collection.children.link(collection)
+    return objects
+
+def link_materials_to_object(obj):
+    # Holds the object's materials in its own slots rather than its mesh's,
+    # so placements sharing one mesh can each have their own material
+    if not obj.data.materials:
+        obj.data.materials.append(None)
+    for slot in obj.material_slots:
+        if slot.link != 'OBJECT':
+            slot.link = 'OBJECT'
+
+def add_distance_switch(obj, camera, near, far):
+    # Drives the object's viewport and render visibility so it only shows
+    # while the camera is between near and far from it
+    for prop in ("hide_viewport", "hide_render"):
+        driver = obj.driver_add(prop).driver
+        driver.type = 'SCRIPTED'
+
+        distance = driver.variables.new()
+        distance.name = "d"
+        distance.type = 'LOC_DIFF'
+        distance.targets[0].id = obj
+        distance.targets[1].id = camera
+
+        if far == float("inf"):
+            driver.expression = "d < {0!r}".format(float(near))
+        else:
+            driver.expression = "not ({0!r} <= d < {1!r})".format(float(near), float(far))
+
+def new_lod_objects(lods, distances, name='new_object'):
+    # One object per level of a sweep_lods pyramid (name_LOD0, name_LOD1,
+    # ...) in a collection of their own. Level k shows while the scene
+    # camera is between distances[k] and distances[k + 1] from the shell;
+    # without a scene camera every level is left visible.
+    import bpy
+    from .topology import ring_strip_topology
+
+    new_collection = bpy.data.collections.new(name + '_LODs')
+    bpy.context.scene.collection.children.link(new_collection)
+
+    # Put the origin at the shell's centre so the distance switch measures
+    # from the shell rather than from the world origin
+    center = (lods[0].reshape(-1, 3).min(axis=0) + lods[0].reshape(-1, 3).max(axis=0)) / 2
+
+    camera = bpy.context.scene.camera
+    bounds = list(distances) + [float("inf")]
+
+    objects = []
+    for level, grid in enumerate(lods):
+        rings, profile_len = grid.shape[:2]
+        faces, edges = ring_strip_topology(rings, profile_len)
+
+        new_mesh = bpy.data.meshes.new('{0}_LOD{1}'.format(name, level))
+        fill_mesh(new_mesh, grid.reshape(-1, 3) - center, faces, edges)
+
+        new_object = bpy.data.objects.new('{0}_LOD{1}'.format(name, level), new_mesh)
+        new_object.location = center.tolist()
+        mark_shell(new_object, objects[0].name if objects else None)
+        new_collection.objects.link(new_object)
+
+        if camera is not None and level < len(bounds) - 1:
+            add_distance_switch(new_object, camera, bounds[level], bounds[level + 1])
+        objects.append(new_object)
+
+    return objects
@@ -0,0 +1,229 @@
+# Licensed under ISC Copyright 2018 github@evee
+# Used with modifications to the "bias functionality
+# so that the original Perlin noise is unmodified
+from itertools import product
+import math
+import random
+
+import numpy as np
+
+# Size of the permutation and gradient tables; must be a power of two
+TABLE_SIZE = 256
+
+# noise_array works through this many points at a time to bound the size
+# of its (points, 2 ** dimension) temporaries
+CHUNK_SIZE = 1 << 16
+
+
+def s_curve(t):
+    return t * t * (3. - 2. * t)
+
+def lerp(t, a, b):
+    return a + t * (b - a)
+
+class PerlinNoiseFactory(object):
+    """Callable that produces Perlin noise for an arbitrary point in an
+    arbitrary number of dimensions.  The underlying grid is aligned with the
+    integers.
+    There is no limit to the coordinates used; gradients are looked up in a
+    fixed table by hashing the lattice coordinates through a permutation, so
+    memory use is constant however much of the domain is sampled (the
+    pattern repeats every TABLE_SIZE units along each axis).
+    The tables are built once from the seed and never modified afterwards,
+    so a factory can be shared between threads, and pickling one sends only
+    its seed and settings: every process rebuilds the same tables.
+    """
+
+    def __init__(self, dimension, octaves=1, tile=(), seed=None):
+        """Create a new Perlin noise factory in the given number of dimensions,
+        which should be an integer and at least 1.
+        More octaves create a foggier and more-detailed noise pattern.  More
+        than 4 octaves is rather excessive.
+        ``tile`` can be used to make a seamlessly tiling pattern.  For example:
+            pnf = PerlinNoiseFactory(2, tile=(0, 3))
+        This will produce noise that tiles every 3 units vertically, but never
+        tiles horizontally.
+        ``seed`` fixes the permutation and gradient tables, so two factories
+        with the same seed produce the same noise.  Without one, a seed is
+        drawn from the global ``random`` module and kept in ``self.seed``.
+        """
+        self.dimension = dimension
+        self.octaves = octaves
+        self._tile_arg = tile
+        self.tile = tile + (0,) * dimension
+
+        # For n dimensions, the range of Perlin noise is ±sqrt(n)/2; multiply
+        # by this to scale to ±1
+        self.scale_factor = 2 * dimension ** -0.5
+
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.seed = seed
+
+        rng = random.Random(seed)
+        self.permutation = list(range(TABLE_SIZE))
+        rng.shuffle(self.permutation)
+        self.gradients = [self._generate_gradient(rng) for _ in range(TABLE_SIZE)]
+
+        self._permutation_array = np.array(self.permutation, dtype=np.int64)
+        self._gradient_array = np.array(self.gradients, dtype=np.float64)
+        self._corners = np.array(list(product((0, 1), repeat=dimension)), dtype=np.int64)
+
+    def __reduce__(self):
+        # Rebuild from the seed rather than shipping the tables
+        return (type(self), (self.dimension, self.octaves, self._tile_arg, self.seed))
+
+    def _lattice_hash(self, grid_point):
+        # Fold each lattice coordinate into the permutation table in turn
+        h = 0
+        for coord in grid_point:
+            h = self.permutation[(h + coord) & (TABLE_SIZE - 1)]
+        return h
+
+    def _generate_gradient(self, rng):
+        # Generate a random unit vector at each grid point -- this is the
+        # "gradient" vector, in that the grid tile slopes towards it
+
+        # 1 dimension is special, since the only unit vector is trivial;
+        # instead, use a slope between -1 and 1
+        if self.dimension == 1:
+            return (rng.uniform(-1, 1),)
+
+        # Generate a random point on the surface of the unit n-hypersphere;
+        # this is the same as a random unit vector in n dimensions.  Thanks
+        # to: http://mathworld.wolfram.com/SpherePointPicking.html
+        # Pick n normal random variables with stddev 1
+        random_point = [rng.gauss(0, 1) for _ in range(self.dimension)]
+        # Then scale the result to a unit vector
+        scale = sum(n * n for n in random_point) ** -0.5
+        return tuple(coord * scale for coord in random_point)
+
+    def get_plain_noise(self, *point):
+        """Get plain noise for a single point, without taking into account
+        either octaves or tiling.
+        """
+        if len(point) != self.dimension:
+            raise ValueError("Expected {} values, got {}".format(
+                self.dimension, len(point)))
+
+        # Build a list of the (min, max) bounds in each dimension
+        grid_coords = []
+        for coord in point:
+            min_coord = math.floor(coord)
+            max_coord = min_coord + 1
+            grid_coords.append((min_coord, max_coord))
+
+        # Compute the dot product of each gradient vector and the point's
+        # distance from the corresponding grid point.  This gives you each
+        # gradient's "influence" on the chosen point.
+        dots = []
+        for grid_point in product(*grid_coords):
+            gradient = self.gradients[self._lattice_hash(grid_point)]
+
+            dot = 0
+            for i in range(self.dimension):
+                dot += gradient[i] * (point[i] - grid_point[i])
+            dots.append(dot)
+
+        # Interpolate all those dot products together.  The interpolation is
+        # done with s_curve to smooth out the slope as you pass from one
+        # grid cell into the next.
+        # Due to the way product() works, dot products are ordered such that
+        # the last dimension alternates: (..., min), (..., max), etc.  So we
+        # can interpolate adjacent pairs to "collapse" that last dimension.  Then
+        # the results will alternate in their second-to-last dimension, and so
+        # forth, until we only have a single value left.
+        dim = self.dimension
+        while len(dots) > 1:
+            dim -= 1
+            s = s_curve(point[dim] - grid_coords[dim][0])
+
+            next_dots = []
+            while dots:
+                next_dots.append(lerp(s, dots.pop(0), dots.pop(0)))
+
+            dots = next_dots
+
+        return dots[0] * self.scale_factor
+
+    def __call__(self, *point):
+        """Get the value of this Perlin noise function at the given point.  The
+        number of values given should match the number of dimensions.
+        """
+        ret = 0
+        for o in range(self.octaves):
+            o2 = 1 << o
+            new_point = []
+            for i, coord in enumerate(point):
+                coord *= o2
+                if self.tile[i]:
+                    coord %= self.tile[i] * o2
+                new_point.append(coord)
+            ret += self.get_plain_noise(*new_point) / o2
+
+        # Need to scale n back down since adding all those extra octaves has
+        # probably expanded it beyond ±1
+        # 1 octave: ±1
+        # 2 octaves: ±1½
+        # 3 octaves: ±1¾
+        ret /= 2 - 2 ** (1 - self.octaves)
+
+        return ret
+
+    def get_plain_noise_array(self, points):
+        """Vectorized get_plain_noise for an (N, dimension) array of points.
+        Matches get_plain_noise point for point.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        floor = np.floor(points)
+        lattice = floor.astype(np.int64)
+
+        # Hash every corner of every point's grid cell, in the same order as
+        # product() visits them in get_plain_noise
+        mask = TABLE_SIZE - 1
+        hashes = np.zeros((len(points), len(self._corners)), dtype=np.int64)
+        grid_points = []
+        for i in range(self.dimension):
+            grid_point = lattice[:, i, None] + self._corners[:, i]
+            hashes = self._permutation_array[(hashes + grid_point) & mask]
+            grid_points.append(grid_point)
+
+        gradients = self._gradient_array[hashes]
+        dots = 0
+        for i in range(self.dimension):
+            dots = dots + gradients[:, :, i] * (points[:, i, None] - grid_points[i])
+
+        # Collapse the last remaining dimension each pass, as get_plain_noise
+        # does with adjacent pairs
+        for dim in reversed(range(self.dimension)):
+            s = s_curve(points[:, dim] - lattice[:, dim])[:, None]
+            dots = lerp(s, dots[:, 0::2], dots[:, 1::2])
+
+        return dots[:, 0] * self.scale_factor
+
+    def noise_array(self, points):
+        """Get the value of this Perlin noise function at each row of an
+        (N, dimension) array of points, with octaves and tiling applied
+        exactly as in __call__.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        if points.ndim == 1:
+            points = points.reshape(-1, self.dimension)
+        if points.shape[1] != self.dimension:
+            raise ValueError("Expected {} values per point, got {}".format(
+                self.dimension, points.shape[1]))
+
+        ret = np.zeros(len(points), dtype=np.float64)
+        for start in range(0, len(points), CHUNK_SIZE):
+            chunk = points[start:start + CHUNK_SIZE]
+            for o in range(self.octaves):
+                o2 = 1 << o
+                new_points = chunk * o2
+                for i in range(self.dimension):
+                    if self.tile[i]:
+                        new_points[:, i] %= self.tile[i] * o2
+                ret[start:start + CHUNK_SIZE] += self.get_plain_noise_array(new_points) / o2
+
+        ret /= 2 - 2 ** (1 - self.octaves)
+
+        return ret
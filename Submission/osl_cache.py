@@ -0,0 +1,119 @@
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+
+# Compiles the OSL shaders in shaders/ to .oso bytecode once, keyed by a hash
+# of their source (and of every file they #include), so script nodes can
+# load the bytecode in EXTERNAL mode instead of Cycles compiling the
+# shaders whenever a material is rebuilt or the file is reopened. Run it as
+# a build step before rendering, e.g. on each render farm node:
+#
+#   python osl_cache.py [shader directory] [--cache-dir DIR]
+#
+# genTexture.py finds the compiled shaders through the same cache.
+
+OSLC = os.environ.get("OSLC", "oslc")
+
+DEFAULT_DIRECTORY = os.environ.get("SEASHELLS_OSO_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "seashells", "oso"))
+
+SHADER_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "shaders")
+
+include_pattern = re.compile(r'^\s*#\s*include\s+[<"]([^">]+)[">]', re.MULTILINE)
+
+def _update_source(h, path, include_dirs, seen):
+    path = os.path.abspath(path)
+    if path in seen:
+        return
+    seen.add(path)
+
+    with open(path, "rb") as f:
+        source = f.read()
+    h.update(source)
+
+    # Headers found next to the shader or on the include path; ones that
+    # aren't (stdosl.h, ...) come with oslc
+    for name in include_pattern.findall(source.decode("utf-8", "replace")):
+        for directory in [os.path.dirname(path)] + list(include_dirs):
+            candidate = os.path.join(directory, name)
+            if os.path.isfile(candidate):
+                h.update(name.encode("utf-8"))
+                _update_source(h, candidate, include_dirs, seen)
+                break
+
+def source_hash(path, include_dirs=()):
+    h = hashlib.sha1(b"oso-")
+    _update_source(h, path, include_dirs, set())
+    return h.hexdigest()
+
+def compile_shader(path, directory=DEFAULT_DIRECTORY, include_dirs=(), oslc=OSLC):
+    # Returns the path of the compiled .oso for an .osl file, compiling it
+    # only if no shader with the same source has been compiled before
+    name = os.path.splitext(os.path.basename(path))[0]
+    entry = os.path.join(directory, source_hash(path, include_dirs))
+    oso = os.path.join(entry, name + ".oso")
+    if os.path.isfile(oso):
+        return oso
+
+    # Compile into a scratch directory and rename it into place, so
+    # concurrent builds never see a half written file
+    os.makedirs(directory, exist_ok=True)
+    scratch = tempfile.mkdtemp(dir=directory, prefix=".tmp-")
+    try:
+        include_flags = ["-I" + d for d in [os.path.dirname(os.path.abspath(path))] + list(include_dirs)]
+        subprocess.run([oslc, "-q", "-o", os.path.join(scratch, name + ".oso")] + include_flags + [path],
+            check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        try:
+            os.rename(scratch, entry)
+        except OSError:
+            # Another build compiled the same source first
+            pass
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    return oso
+
+def compiled_shader(path, directory=DEFAULT_DIRECTORY, include_dirs=(), oslc=OSLC):
+    # compile_shader, or None when the shader or oslc isn't available (the
+    # caller falls back to the .osl text). Compile errors still raise.
+    if not os.path.isfile(path):
+        return None
+    try:
+        return compile_shader(path, directory, include_dirs, oslc)
+    except FileNotFoundError:
+        return None
+
+def compile_shaders(shader_directory=SHADER_DIRECTORY, directory=DEFAULT_DIRECTORY, oslc=OSLC):
+    # {shader name: .oso path} for every .osl in the shader directory
+    compiled = {}
+    for filename in sorted(os.listdir(shader_directory)):
+        if filename.endswith(".osl"):
+            path = os.path.join(shader_directory, filename)
+            compiled[filename[:-len(".osl")]] = compile_shader(path, directory, oslc=oslc)
+    return compiled
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precompile OSL shaders to cached .oso files.")
+    parser.add_argument("shaders", nargs="?", default=SHADER_DIRECTORY, help="directory of .osl files")
+    parser.add_argument("--cache-dir", default=DEFAULT_DIRECTORY)
+    parser.add_argument("--oslc", default=OSLC, help="OSL compiler to run")
+    args = parser.parse_args(argv)
+
+    try:
+        compiled = compile_shaders(args.shaders, args.cache_dir, args.oslc)
+    except subprocess.CalledProcessError as e:
+        sys.stderr.write(e.stderr.decode("utf-8", "replace"))
+        return 1
+
+    for name, oso in compiled.items():
+        print("{0}: {1}".format(name, oso))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
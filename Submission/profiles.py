@@ -0,0 +1,120 @@
+from functools import lru_cache
+
+import math
+import numpy as np
+
+# Generating profiles as contiguous (n, 2) arrays. The trig for each unit
+# shape is worked out once per (shape, n) and cached; the public functions
+# scale a copy of the cached table. The unit tables are built with the same
+# per-point arithmetic the old make_* generators used, so a circle of any
+# radius (and every shape at r = 1) comes out exactly as before.
+
+def _freeze(points):
+    points = np.ascontiguousarray(points, dtype=np.float64).reshape(-1, 2)
+    points.flags.writeable = False
+    return points
+
+@lru_cache(maxsize=128)
+def unit_profile(shape, n):
+    # shape is "circle", "square", "hexagon" or ("polygon", sides)
+    theta = 2 * math.pi / n
+    points = []
+
+    if shape == "circle":
+        for i in range(0, n):
+            points.append((math.cos(i * theta), math.sin(i * theta)))
+
+    elif shape == "square":
+        # Corners on the unit circle
+        side_offset = math.pi / 2
+        offset = math.pi / 4
+        for i in range(0, n):
+            side = int(i * 4 / n)
+            ri = 1 / math.sqrt(2) / math.cos(i * theta - side * side_offset - offset)
+            points.append((ri * math.cos(i * theta), ri * math.sin(i * theta)))
+
+    elif shape == "hexagon":
+        # Sides tangent to the unit circle, as in extrude.py
+        side_offset = math.pi / 3
+        offset = math.pi / 6
+        for i in range(0, n):
+            side = int(i * 6 / n)
+            ri = 1 / math.cos(i * theta - side * side_offset - offset)
+            points.append((ri * math.cos(i * theta), ri * math.sin(i * theta)))
+
+    elif isinstance(shape, tuple) and shape[0] == "polygon":
+        # Regular polygon with its corners on the unit circle, starting at
+        # angle 0
+        sides = shape[1]
+        side_offset = 2 * math.pi / sides
+        offset = math.pi / sides
+        for i in range(0, n):
+            side = int(i * sides / n)
+            ri = math.cos(offset) / math.cos(i * theta - side * side_offset - offset)
+            points.append((ri * math.cos(i * theta), ri * math.sin(i * theta)))
+
+    else:
+        raise ValueError("Unknown profile shape {0!r}".format(shape))
+
+    return _freeze(points)
+
+def circle(r, n):
+    return r * unit_profile("circle", n)
+
+def square(r, n):
+    return r * unit_profile("square", n)
+
+def hexagon(r, n):
+    return r * unit_profile("hexagon", n)
+
+def polygon(sides, r, n):
+    return r * unit_profile(("polygon", sides), n)
+
+@lru_cache(maxsize=128)
+def _spline(points, n, closed):
+    control = np.array(points, dtype=np.float64)
+
+    # Catmull-Rom segments between consecutive control points, densely
+    # sampled to measure arclength
+    if closed:
+        padded = np.concatenate([control[-1:], control, control[:2]])
+    else:
+        padded = np.concatenate([control[:1], control, control[-1:], control[-1:]])
+    segments = len(control) if closed else len(control) - 1
+
+    samples = 16
+    t = np.linspace(0, 1, samples, endpoint=False)[:, None]
+    t2 = t * t
+    t3 = t2 * t
+
+    dense = []
+    for k in range(segments):
+        p0, p1, p2, p3 = padded[k:k + 4]
+        dense.append(0.5 * (2 * p1 + (p2 - p0) * t
+            + (2 * p0 - 5 * p1 + 4 * p2 - p3) * t2
+            + (3 * p1 - p0 - 3 * p2 + p3) * t3))
+    dense = np.concatenate(dense + [control[:1] if closed else control[-1:]])
+
+    # Resample at n equally spaced arclengths; a closed curve doesn't repeat
+    # its first point at the end
+    lengths = np.concatenate([[0.0], np.cumsum(np.linalg.norm(np.diff(dense, axis=0), axis=1))])
+    targets = np.linspace(0, lengths[-1], n, endpoint=not closed)
+    resampled = np.stack([
+        np.interp(targets, lengths, dense[:, 0]),
+        np.interp(targets, lengths, dense[:, 1]),
+    ], axis=1)
+
+    return _freeze(resampled)
+
+def spline(points, n, closed=True):
+    # A hand-entered curve (Vector2s, pairs or an (k, 2) array) smoothed by
+    # a Catmull-Rom spline through its points and resampled to n points
+    # evenly spaced along it
+    key = tuple(tuple(p) for p in shape_array(points).tolist())
+    return _spline(key, n, closed).copy()
+
+def shape_array(shape):
+    # Any generating shape (list of Vector2s or (n, 2) array) as an array
+    if isinstance(shape, np.ndarray):
+        return shape
+    return np.array([v.to_list() if hasattr(v, "to_list") else list(v) for v in shape], dtype=np.float64).reshape(-1, 2)
@@ -0,0 +1,90 @@
+/* Turbulence from "An Image Synthesizer", shared by the shaders in this
+ * directory:
+ *
+ *     #include "turbulence.h"
+ *
+ * The octave count follows from the pixel size alone, so it is worked out
+ * once up front instead of being tested against a shrinking scale in the
+ * loop. turbulence() sums exactly the octaves the original
+ * while (scale > pixelsize) loop did; turbulence_bandlimited() fades the
+ * last octave in by how far it is above the pixel size instead of cutting
+ * it off, which keeps detail near the pixel size from aliasing. */
+
+#ifndef TURBULENCE_H
+#define TURBULENCE_H
+
+/* Where the shaders sample their noise. With use_uv, a cylinder wrapped by
+ * the mesh's UV map: u (around the profile) goes once around it, so there
+ * is no seam at u = 1, and v (along the growth) runs uv_length along it.
+ * That stays attached to the surface when a shell is moved or re-swept in
+ * place; since the UVs don't know the shell's size, set uv_radius and
+ * uv_length to its typical ring radius and length to keep the noise scale
+ * of world space. Off by default, so materials render as before, and on
+ * meshes without UVs: P in world space. */
+point surface_point(int use_uv, float uv_radius, float uv_length)
+{
+    point uv;
+    if (use_uv && getattribute("geom:uv", uv))
+        return point(uv_radius * cos(M_2PI * uv[0]), uv_radius * sin(M_2PI * uv[0]), uv_length * uv[1]);
+    return P;
+}
+
+/* Ensure that the pixel size is between 0 and 1, not inclusive */
+float turbulence_pixelsize(float pixelsize)
+{
+    return clamp(pixelsize, 0.000001, 0.999999);
+}
+
+/* Octaves at scales 1, 1/2, 1/4, ... above the pixel size: the smallest k
+ * with 2^-k <= pixelsize */
+int turbulence_octaves(float pixelsize)
+{
+    return (int) ceil(-log2(turbulence_pixelsize(pixelsize)));
+}
+
+/* A fixed number of octaves, starting at scale 1 */
+float turbulence_fixed(point Point, float Time, int octaves)
+{
+    float t = 0;
+    float scale = 1;
+    float frequency = 1;
+
+    for (int i = 0; i < octaves; i++) {
+        t += abs(noise("perlin", Point * frequency, Time)) * scale;
+        scale *= 0.5;
+        frequency *= 2;
+    }
+
+    return t;
+}
+
+float turbulence(point Point, float pixelsize, float Time)
+{
+    return turbulence_fixed(Point, Time, turbulence_octaves(pixelsize));
+}
+
+/* Whole octaves down to twice the pixel size, then the next octave weighted
+ * by the fractional part of -log2(pixelsize): 0 when its scale is at the
+ * pixel size, 1 when it is twice that. Continuous in pixelsize. */
+float turbulence_bandlimited(point Point, float pixelsize, float Time)
+{
+    float octaves = -log2(turbulence_pixelsize(pixelsize));
+    int whole = (int) floor(octaves);
+    float fade = octaves - whole;
+
+    float t = turbulence_fixed(Point, Time, whole);
+    if (fade > 0) {
+        t += fade * abs(noise("perlin", Point * pow(2, whole), Time)) * pow(0.5, whole);
+    }
+    return t;
+}
+
+/* The variant chosen by a shader's bandlimited parameter */
+float turbulence(point Point, float pixelsize, float Time, int bandlimited)
+{
+    if (bandlimited)
+        return turbulence_bandlimited(Point, pixelsize, Time);
+    return turbulence(Point, pixelsize, Time);
+}
+
+#endif
@@ -1,444 +1,507 @@
-import bpy
-from typing import Any, Union
-
 import math
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+if not __package__:
+    # Run as a loose script, from its file or a text block; see __init__.py
+    path = os.path.abspath(__file__)
+    if not os.path.exists(path):
+        import bpy
+        text = bpy.data.texts.get(os.path.basename(path))
+        path = bpy.path.abspath(text.filepath if text and text.filepath else "//" + os.path.basename(path))
+    sys.path.append(os.path.dirname(os.path.dirname(path)))
+    __package__ = "Submission"
+
+from .growth import Linear, Quadratic, Power
+from . import profiles
+from .geometry import (
+    Vector2, Vector3, coiling_axis, Morph,
+    sweep_lods, sweep_vertices, sweep_surface, generate_sweep_adaptive, ring_fingerprints,
+)
+from .profiles import shape_array
+from .topology import ring_strip_topology, ring_strip_corners
+from .mesh_upload import (
+    fill_mesh, new_mesh_object, new_mesh_objects, new_lod_objects, mark_shell,
+    patch_mesh_vertices, get_ring_fingerprints, set_ring_fingerprints,
+)
+from .mesh_cache import MeshCache, sweep_key, instance_key
+from .geometry_nodes import new_sweep_object
+
+# Upload meshes through flat foreach_set buffers (sweep_mesh +
+# new_mesh_object) rather than per-vertex Vector3s and Mesh.from_pydata
+USE_BULK_UPLOAD = True
+
+# Reuse meshes from earlier runs when a shell's parameters haven't changed
+# (bulk upload only); set to None to always regenerate
+MESH_CACHE = MeshCache()
+
+# Place rings a roughly constant distance apart instead of one per
+# iteration (bulk upload only), e.g.
+# dict(spacing=0.5, tolerance=0.02, min_scale=0.02); see adaptive_iterations
+ADAPTIVE_SAMPLING = None
+
+# Build a level-of-detail pyramid per shell instead of a single mesh, with
+# each level switched in by camera distance (bulk upload only), e.g.
+# dict(levels=4, distances=(0, 25, 60, 150)); see sweep_lods
+LEVELS_OF_DETAIL = None
+
+# Build each shell as a Geometry Nodes modifier that sweeps it inside
+# Blender, with the growth law parameters as modifier inputs, instead of
+# uploading a mesh; see geometry_nodes.py
+USE_GEOMETRY_NODES = False
+
+# Store a fingerprint of each ring's parameters on meshes made by the bulk
+# path (without adaptive sampling), so update_sweep can later re-sweep just
+# the rings that changed, e.g. after tweaking the lip of a shell:
+#
+#   obj = generate_sweep(axis)
+#   ...                      # change the axis' late-stage shape or growth
+#   update_sweep(axis, obj)
+INCREMENTAL_UPDATES = True
+
+# Give meshes from the bulk path the sweep's own surface normals (as custom
+# split normals) and a UV layer, u running around the profile by arclength
+# and v along the shell's iterations, both computed along with the
+# vertices; see sweep_surface
+NORMALS_AND_UVS = True
 
-class Vector2(object):
-    def __init__(self, x, y):
-        self.x = x
-        self.y =y
-    
-    def __add__(self, other: 'Vector2'):
-        return Vector2(self.x + other.x, self.y + other.y)
-
-    def __mul__(self, other: Any):
-        if type(other) is type(self):
-            return self.x * other.x + self.y * other.y
-        else:
-            return Vector2(other * self.x, other * self.y)
-
-    def __rmul__(self, other: Any):
-        return self.__mul__(other)
-
-    def __sub__(self, other: 'Vector3'):
-        return Vector2(self.x - other.x, self.y - other.y)
-
-    def __neg__(self):
-        return Vector2(-1 * self.x, -1 * self.y)
-
-    def __abs__(self):
-        return math.sqrt(self.x * self.x + self.y * self.y)
-
-    def __str__(self):
-        return "({0},{1})".format(self.x, self.y)
-
-    def normalize(self):
-        return self.__mul__(1/ self.__abs__()) 
-
-    def project(self, other: 'Vector2'):
-        normal = other.normalize()
-        return normal * self.__mul__(normal)
-
-    def to_list(self):
-        return [self.x, self.y]
-
-class Vector3(object):
-    def __init__(self, x, y, z):
-        self.x = x
-        self.y =y
-        self.z = z
-    
-    def __add__(self, other: 'Vector3'):
-        return Vector3(self.x + other.x, self.y + other.y, self.z + other.z)
-
-    def __mul__(self, other: Any):
-        if type(other) is type(self):
-            return self.x * other.x + self.y * other.y + self.z * other.z
-        else:
-            return Vector3(other * self.x, other * self.y, other * self.z)
-
-    def __rmul__(self, other: Any):
-        return self.__mul__(other)
-
-    def __sub__(self, other: 'Vector3'):
-        return Vector3(self.x - other.x, self.y - other.y, self.z - other.z)
-
-    def __neg__(self):
-        return Vector3(-1 * self.x, -1 * self.y, -1 * self.y)
-
-    def __abs__(self):
-        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
-
-    def normalize(self):
-        return self.__mul__(1/ self.__abs__()) 
-
-    def project(self, other: 'Vector3'):
-        normal = other.normalize()
-        return normal * self.__mul__(normal)
-
-    def __str__(self):
-        return "({0},{1},{2})".format(self.x, self.y, self.z)
-
-    def __pow__(self, other: 'Vector3'):
-        return Vector3(self.y * other.z - other.y * self.z, - self.x * other.z + other.x * self.z, self.x * other.y - other.x * self.y)
-
-    def to_list(self):
-        return [self.x, self.y, self.z]
-
-def make_lambda_function(input):
-    if type(input) is float or type(input) is int:
-        return lambda x : input
-    elif type(input) is type(lambda x : None):
-        return input
-
-class coiling_axis(object):
-    def __init__(self, start_point: Vector3, tangent: Vector3, normal: Vector3, coiling_rate, displacement, coiling_radius, scaling_factor, generating_shape, iterations: int):        
-        self.start_point = start_point
-
-        self.tangent = tangent.normalize()
-        self.normal = (normal - normal.project(tangent)).normalize()
-        self.binormal = (normal ** tangent).normalize()
-
-        self.displacement = make_lambda_function(displacement)
-        self.coiling_rate = make_lambda_function(coiling_rate)
-        self.coiling_radius = make_lambda_function(coiling_radius)
-        self.scaling_factor = make_lambda_function(scaling_factor)
-
-        self.max_iterations = iterations
-        self.current_iteration = 0
-
-        if type(generating_shape) is list:
-            self.generating_shape = lambda x : generating_shape
-        elif type(generating_shape) is type(lambda x : None):
-            self.generating_shape = generating_shape
-
-    def get_axis_position(self):
-        current_axis_position = self.displacement(self.current_iteration)
-        return current_axis_position * self.tangent + self.start_point
-
-    def get_normal_vector(self):
-        current_angle = self.coiling_rate(self.current_iteration)
-        return math.cos(current_angle) * self.normal + math.sin(current_angle) * self.binormal
-
-    def get_tangent_vector(self):
-        return self.tangent
-
-    def get_radius(self):
-        return self.coiling_radius(self.current_iteration)
-
-    def get_scaling_factor(self):
-        return self.scaling_factor(self.current_iteration)
-
-    def get_generating_shape(self):
-        return self.generating_shape(self.current_iteration)
+def generate_sweep(coiling_axis):
+    if USE_GEOMETRY_NODES:
+        new_object = new_sweep_object(coiling_axis)
+        coiling_axis.current_iteration = max(coiling_axis.current_iteration, coiling_axis.max_iterations)
+        return new_object
 
-    def iterate(self):
-        self.current_iteration += 1
-        return self.current_iteration < self.max_iterations
+    if USE_BULK_UPLOAD and LEVELS_OF_DETAIL:
+        options = dict(LEVELS_OF_DETAIL)
+        distances = options.pop("distances")
+        lods = sweep_lods(coiling_axis, **options)
 
-def make_circle(r, n):
-    center = Vector2(0, 0)
-    theta = 2 * math.pi / n
-    vertices = []
-    for i in range(0, n):
-        r_i = r * Vector2(math.cos(i * theta), math.sin(i * theta))
-        p_i = center + r_i
-        vertices.append(p_i)
-    return vertices
-
-def make_square(r,n):
-    center = Vector2(0,0)
-    theta = 2 * math.pi / n
-    side_offset = math.pi / 2
-    offset = math.pi / 4
-    vertices = []
+        coiling_axis.current_iteration = max(coiling_axis.current_iteration, coiling_axis.max_iterations)
+        return new_lod_objects(lods, distances)
 
-    for i in range(0, n):
-        side = int(i * 4 / n)
-        ri = r / math.sqrt(2) / math.cos(i * theta - side * side_offset - offset)
-        pi = center + ri * Vector2(math.cos(i * theta) , math.sin(i * theta))
-        vertices.append(pi)
-    return vertices
+    if USE_BULK_UPLOAD:
+        vertices, faces, edges, normals, uvs, fingerprints = sweep_mesh(coiling_axis)
 
-def homotopy(start_shape, end_shape, n, N):
-    vertices = []
-    for i in range(len(start_shape)):
-        s = start_shape[i]
-        e = end_shape[i]
-        vertices.append(s + (1.0 * n / N) * (e - s))
-    
-    return vertices
+        coiling_axis.current_iteration = max(coiling_axis.current_iteration, coiling_axis.max_iterations)
+        new_object = new_mesh_object(vertices, faces, edges, normals, uvs)
+        if fingerprints is not None:
+            set_ring_fingerprints(new_object.data, fingerprints, len(vertices) // max(len(fingerprints), 1))
+        return new_object
 
-def generate_sweep(coiling_axis):
     vertices = []
-    n_vertices = 0
-    edges = []
-    faces = []
+    rings = 0
+    profile_len = 0
 
-    last_vertices = []
     tangent = coiling_axis.get_tangent_vector()
 
     while coiling_axis.iterate():
-        new_vertices = []
-
         axis_position = coiling_axis.get_axis_position()
         normal = coiling_axis.get_normal_vector()
         coiling_radius = coiling_axis.get_radius()
         scaling_factor = coiling_axis.get_scaling_factor()
 
-        iteration_center = axis_position + coiling_radius * normal
+        iteration_center = axis_position.axpy(coiling_radius, normal)
 
         generating_shape = coiling_axis.get_generating_shape()
 
-        for gen_v in generating_shape:
-            gen_v = scaling_factor * gen_v
-            v = iteration_center + gen_v.x * normal + gen_v.y * tangent
-            new_vertices.append(n_vertices)
+        for x, y in shape_array(generating_shape).tolist():
+            v = iteration_center.axpy(scaling_factor * x, normal, scaling_factor * y, tangent)
             vertices.append(v.to_list())
-            n_vertices += 1
-
-        l = len(generating_shape)
-        for i in range(0, l):
-            edges.append([new_vertices[i], new_vertices[(i + 1) % l]])
-
-            if (last_vertices):
-                edges.append([last_vertices[i], last_vertices[(i + 1) % l]])
-                edges.append([last_vertices[i], new_vertices[i]])
-                edges.append([last_vertices[(i + 1) % l], new_vertices[(i + 1) % l]])
-
-                faces.append([
-                    last_vertices[i], last_vertices[(i + 1) % l],
-                    new_vertices[(i + 1) % l], new_vertices[i]
-                ])
-                
-        last_vertices = new_vertices
 
-    generate_mesh(vertices, edges, faces)
+        rings += 1
+        profile_len = len(generating_shape)
+
+    faces, edges = ring_strip_topology(rings, profile_len)
+
+    return generate_mesh(vertices, edges.tolist(), faces.tolist())
+
+def sweep_mesh(coiling_axis):
+    # The bulk path of generate_sweep up to the upload, without bpy and
+    # without advancing the axis: (vertices, faces, edges, normals, uvs,
+    # fingerprints), normals and uvs as fill_mesh takes them and None
+    # unless NORMALS_AND_UVS, fingerprints None unless INCREMENTAL_UPDATES.
+    # Runs in sweep_meshes' worker processes.
+    options = dict(ADAPTIVE_SAMPLING or {})
+    attributes = ()
+    if NORMALS_AND_UVS:
+        options["normals_and_uvs"] = True
+        attributes = ("normals", "uvs")
+
+    key = sweep_key(coiling_axis, options or None) if MESH_CACHE is not None else None
+    cached = MESH_CACHE.get(key, attributes) if key else None
+
+    fingerprints = None
+    if INCREMENTAL_UPDATES and not ADAPTIVE_SAMPLING:
+        fingerprints = ring_fingerprints(coiling_axis,
+            np.arange(coiling_axis.current_iteration + 1, coiling_axis.max_iterations), NORMALS_AND_UVS)
+
+    normals = uvs = None
+    if cached:
+        vertices, faces, edges = cached[:3]
+        if NORMALS_AND_UVS:
+            normals, uvs = cached[3:]
+    else:
+        vertices = None
+        if ADAPTIVE_SAMPLING:
+            # Placing the rings sweeps all of them, so the kept ones come
+            # with their vertices
+            vertices, iterations = generate_sweep_adaptive(coiling_axis, **ADAPTIVE_SAMPLING)
+        else:
+            iterations = np.arange(coiling_axis.current_iteration + 1, coiling_axis.max_iterations)
+        profile_len = len(coiling_axis.generating_shape(coiling_axis.current_iteration + 1))
+        rings = len(iterations)
+
+        if rings == 0:
+            vertices = np.zeros((0, 3), dtype=np.float64)
+        elif NORMALS_AND_UVS:
+            # Normals and UVs are only worked out for the kept rings
+            vertices, normals, uvs = sweep_surface(coiling_axis, iterations)
+            vertices = vertices.reshape(-1, 3)
+            normals = normals.reshape(-1, 3)
+        elif vertices is None:
+            vertices = sweep_vertices(coiling_axis, iterations).reshape(-1, 3)
+        faces, edges = ring_strip_topology(rings, profile_len)
+
+        if NORMALS_AND_UVS:
+            if rings > 1:
+                ring, column = ring_strip_corners(rings, profile_len)
+                uvs = uvs[ring, column]
+            else:
+                normals = np.zeros_like(vertices)
+                uvs = np.zeros((0, 2))
+        if key:
+            MESH_CACHE.put(key, vertices, faces, edges, **dict(zip(attributes, (normals, uvs))))
+
+    return vertices, faces, edges, normals, uvs, fingerprints
+
+def _sweep_options():
+    return dict(ADAPTIVE_SAMPLING=ADAPTIVE_SAMPLING, NORMALS_AND_UVS=NORMALS_AND_UVS,
+        INCREMENTAL_UPDATES=INCREMENTAL_UPDATES, MESH_CACHE=MESH_CACHE)
+
+def _set_sweep_options(options):
+    # Worker process initializer: the flags as the parent has them, which a
+    # spawned worker would otherwise read from a fresh import
+    globals().update(options)
+
+def _picklable(value):
+    try:
+        pickle.dumps(value)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+    return True
+
+def _in_blender():
+    # Blender's own bpy, rather than e.g. benchmarks/fake_bpy.py
+    bpy = sys.modules.get("bpy")
+    return bpy is not None and bool(getattr(bpy.app, "binary_path", ""))
+
+def sweep_meshes(axes, workers=None):
+    # sweep_mesh of every axis, here by default or spread over `workers`
+    # processes. A shell sweeps in milliseconds, so a pool only pays off
+    # for many large shells outside Blender: much of a sweep holds the GIL
+    # (growth functions on object arrays, per-shape loops, NumPy calls on
+    # small arrays), so threads wouldn't run it in parallel, and inside
+    # Blender a worker would fork all of Blender or, spawned, re-run its
+    # __main__. There, and for axes that don't pickle (lambdas or local
+    # functions as growth functions), the sweeps always run here.
+    if not workers or workers < 2 or len(axes) < 2 or _in_blender() or not _picklable(axes):
+        return [sweep_mesh(axis) for axis in axes]
+
+    with ProcessPoolExecutor(min(workers, len(axes)), initializer=_set_sweep_options,
+            initargs=(_sweep_options(),)) as pool:
+        return list(pool.map(sweep_mesh, axes))
+
+def build_scene(shells, collection_name='Shells', workers=None):
+    # Sweeps many shells at once, shells being {object name: coiling_axis}.
+    # The sweeps run outside bpy, in `workers` processes if given (see
+    # sweep_meshes), and the meshes are then uploaded in one pass into a single collection, see
+    # new_mesh_objects. Shells that only differ in where they start (e.g.
+    # the same variant placed many times in a catalogue) are swept once:
+    # the first is built as usual and the rest become linked duplicates of
+    # it, sharing its mesh and offset by the difference of their start
+    # points, so memory and build time go with the number of distinct
+    # shells. Returns the objects, in the order of shells.
+    if USE_GEOMETRY_NODES or LEVELS_OF_DETAIL or not USE_BULK_UPLOAD:
+        # Those paths build their own objects in Blender
+        return [generate_sweep(axis) for axis in shells.values()]
+
+    sources = {}
+    unique = []
+    instances = []
+    for name, axis in shells.items():
+        key = instance_key(axis, ADAPTIVE_SAMPLING)
+        if key in sources:
+            instances.append((name, sources[key]))
+        else:
+            sources[key] = name
+            unique.append(name)
+
+    results = sweep_meshes([shells[name] for name in unique], workers)
+
+    objects = new_mesh_objects([(name,) + tuple(result[:5]) for name, result in zip(unique, results)],
+        collection_name, instances)
+    objects = dict(zip(unique + [name for name, _ in instances], objects))
+
+    for name, result in zip(unique, results):
+        objects[name].location = [0.0, 0.0, 0.0]
+        fingerprints = result[5]
+        if fingerprints is not None:
+            set_ring_fingerprints(objects[name].data, fingerprints, len(result[0]) // max(len(fingerprints), 1))
+    for name, source in instances:
+        objects[name].location = (shells[name].start_point - shells[source].start_point).to_list()
+
+    for axis in shells.values():
+        axis.current_iteration = max(axis.current_iteration, axis.max_iterations)
+    return [objects[name] for name in shells]
+
+def update_sweep(coiling_axis, obj):
+    # Re-sweeps obj, a shell made by generate_sweep with INCREMENTAL_UPDATES,
+    # after its coiling_axis changed. Only the rings whose fingerprint
+    # differs from the one stored on the mesh are computed, and they're
+    # written into obj's existing mesh rather than a new object. When the
+    # number of rings or profile points changed (or the mesh has no
+    # fingerprints) the mesh data is rebuilt in place instead. Returns the
+    # number of rings swept.
+    # The vertices are swept relative to obj's location, where build_scene
+    # places its linked duplicates, and a mesh shared with other objects is
+    # copied first, so updating one placement leaves the others alone.
+    iterations = np.arange(coiling_axis.current_iteration + 1, coiling_axis.max_iterations)
+    fingerprints = ring_fingerprints(coiling_axis, iterations, NORMALS_AND_UVS)
+    profile_len = len(coiling_axis.generating_shape(coiling_axis.current_iteration + 1))
+    surface = NORMALS_AND_UVS and len(iterations) > 1
+    origin = np.array(obj.location[:], dtype=np.float64)
+
+    mesh = obj.data
+    if mesh.users > 1:
+        mesh = obj.data = mesh.copy()
+    old_fingerprints, old_profile_len = get_ring_fingerprints(mesh)
+
+    if (old_fingerprints is None or len(old_fingerprints) != len(fingerprints)
+            or old_profile_len != profile_len or (surface and mesh.uv_layers.get("UVMap") is None)):
+        changed = np.arange(len(iterations))
+        faces, edges = ring_strip_topology(len(iterations), profile_len)
+        mesh.clear_geometry()
+        if surface:
+            vertices, normals, uvs = sweep_surface(coiling_axis, iterations)
+            ring, column = ring_strip_corners(len(iterations), profile_len)
+            fill_mesh(mesh, vertices - origin, faces, edges, normals, uvs[ring, column])
+        else:
+            fill_mesh(mesh, sweep_vertices(coiling_axis, iterations) - origin, faces, edges)
+    else:
+        changed = np.flatnonzero(fingerprints != old_fingerprints)
+        if len(changed):
+            indices = (changed[:, None] * profile_len + np.arange(profile_len)).ravel()
+            if surface:
+                vertices, normals, uvs = sweep_surface(coiling_axis, iterations[changed])
+
+                # The loops at the corners of the changed rings, and which
+                # of the new rings each one reads its UV from
+                ring, column = ring_strip_corners(len(iterations), profile_len)
+                position = np.full(len(iterations), -1)
+                position[changed] = np.arange(len(changed))
+                loops = np.flatnonzero(position[ring] >= 0)
+
+                patch_mesh_vertices(mesh, indices, vertices - origin, normals, loops, uvs[position[ring[loops]], column[loops]])
+            else:
+                patch_mesh_vertices(mesh, indices, sweep_vertices(coiling_axis, iterations[changed]) - origin)
+
+    # After sweeping, which measures v over the axis' iterations
+    coiling_axis.current_iteration = max(coiling_axis.current_iteration, coiling_axis.max_iterations)
+    set_ring_fingerprints(mesh, fingerprints, profile_len)
+    return len(changed)
 
 def generate_mesh(vertices, edges, faces):
+    import bpy
+
     new_mesh = bpy.data.meshes.new('new_mesh')
     new_mesh.from_pydata(vertices, edges, faces)
     new_mesh.update()
 
     new_object = bpy.data.objects.new('new_object', new_mesh)
+    mark_shell(new_object)
 
     new_collection = bpy.data.collections.new('new_collection')
     bpy.context.scene.collection.children.link(new_collection)
 
     new_collection.objects.link(new_object)
+    return new_object
 
-# Generating some seashells...
-
-# Tubular Shell
-start = Vector3(0,0,10)
-tangent = Vector3(0,0,1)
-normal = Vector3(1,0,0)
-
-l = 2
+def main():
+    # Generating some seashells...
+    shells = {}
 
-def coiling_rate(n):
-    return n * math.pi / 18
+    # Tubular Shell
+    start = Vector3(0,0,10)
+    tangent = Vector3(0,0,1)
+    normal = Vector3(1,0,0)
 
-def displacement(n):
-    return 0
+    l = 2
 
-def coiling_radius(n):
-    return 0.0005 * n ** 2
+    coiling_rate = Linear(math.pi, divisor=18)
+    displacement = 0
+    coiling_radius = Quadratic(0.0005)
+    scaling_factor = Quadratic(0.0005)
 
-def scaling_factor(n):
-    return 0.0005 * n ** 2
+    iterations = 109
 
-iterations = 109
+    circle = profiles.circle(1, 20)
+    axis = coiling_axis(start, tangent, normal, coiling_rate, displacement, coiling_radius, scaling_factor, circle, iterations)
 
-circle = make_circle(1, 20)
-axis = coiling_axis(start, tangent, normal, coiling_rate, displacement, coiling_radius, scaling_factor, circle, iterations)
+    shells["Tubular"] = axis
 
-generate_sweep(axis)
+    # Classical shell
+    start = Vector3(20,0,0)
+    tangent = Vector3(0,0,1)
+    normal = Vector3(1,0,0)
 
-# Classical shell
-start = Vector3(20,0,0)
-tangent = Vector3(0,0,1)
-normal = Vector3(1,0,0)
+    l = 1.01
 
-l = 1.01
+    coiling_rate = Linear(math.pi, divisor=18)
+    displacement = Power(5, l, 300)
+    coiling_radius = Power(1, l, 300)
+    scaling_factor = Power(1, l, 300)
 
-def coiling_rate(n):
-    return n * math.pi / 18
+    iterations = 400
 
-def displacement(n):
-    return 5 * l ** (n - 300)
+    circle = profiles.circle(1, 20)
+    axis = coiling_axis(start, tangent, normal, coiling_rate, displacement, coiling_radius, scaling_factor, circle, iterations)
 
-def coiling_radius(n):
-    return l ** (n - 300)
+    shells["Classical"] = axis
 
-def scaling_factor(n):
-    return l ** (n - 300)
+    # spherical shell
 
-iterations = 400
+    start = Vector3(35,0,0)
+    tangent = Vector3(0,0,1)
+    normal = Vector3(1,0,0)
 
-circle = make_circle(1, 20)
-axis = coiling_axis(start, tangent, normal, coiling_rate, displacement, coiling_radius, scaling_factor, circle, iterations)
+    l = 1.03
 
-generate_sweep(axis)
+    coiling_rate = Linear(math.pi, divisor=18)
+    displacement = Power(0.35 * 1.5, l, 300)
+    coiling_radius = Power(0.35, l, 300)
+    scaling_factor = Power(0.35, l, 300)
 
-# spherical shell
+    iterations = 400
 
-start = Vector3(35,0,0)
-tangent = Vector3(0,0,1)
-normal = Vector3(1,0,0)
+    circle = profiles.circle(1, 20)
+    axis = coiling_axis(start, tangent, normal, coiling_rate, displacement, coiling_radius, scaling_factor, circle, iterations)
 
-l = 1.03
+    shells["Spherical"] = axis
 
-def coiling_rate(n):
-    return n * math.pi / 18
+    # custom generating curve shell...
 
-def displacement(n):
-    return 0.35 * 1.5 * l ** (n - 300)
+    start = Vector3(55,0,0)
+    tangent = Vector3(0,0,1)
+    normal = Vector3(1,0,0)
 
-def coiling_radius(n):
-    return 0.35 * l ** (n - 300)
+    l = 1.03
 
-def scaling_factor(n):
-    return 0.35 * l ** (n - 300)
+    coiling_rate = Linear(math.pi, divisor=18)
+    displacement = Power(0.5 * 1.5, l, 300)
+    coiling_radius = 0
+    scaling_factor = Power(0.5, l, 300, divisor=6)
 
-iterations = 400
+    iterations = 400
 
-circle = make_circle(1, 20)
-axis = coiling_axis(start, tangent, normal, coiling_rate, displacement, coiling_radius, scaling_factor, circle, iterations)
+    generating_curve = [
+        Vector2(0,-6), Vector2(0,-4), Vector2(0,-2), Vector2(0,0), Vector2(0,2), Vector2(0,4), Vector2(0,6),
+        Vector2(0.2, 6.3), Vector2(0.4, 6.1), Vector2(0.672, 5.5), Vector2(0.845, 5), Vector2(1, 4), Vector2(2, 2),
+        Vector2(3.394, 0), Vector2(4.363, -2), Vector2(3.394, -4), Vector2(1.104, -6), Vector2(0.4, -6.4), Vector2(0.2, -6.3)
+    ]
+    axis = coiling_axis(start, tangent, normal, coiling_rate, displacement, coiling_radius, scaling_factor, generating_curve, iterations)
 
-generate_sweep(axis)
+    shells["Custom Curve"] = axis
 
-# custom generating curve shell...
+    '''
+    Homotopy Example
 
-start = Vector3(55,0,0)
-tangent = Vector3(0,0,1)
-normal = Vector3(1,0,0)
+    start = Vector3(0,0,0)
+    tangent = Vector3(0,0,1)
+    normal = Vector3(1,0,0)
 
-l = 1.03
+    def coiling_rate(n):
+        return n * math.pi / 18
 
-def coiling_rate(n):
-    return n * math.pi / 18
+    def displacement(n):
+        return n / 9
 
-def displacement(n):
-    return 0.5 * 1.5 * l ** (n - 300)
+    def coiling_radius(n):
+        return 5
 
-def coiling_radius(n):
-    return 0
+    def scaling_factor(n):
+        return 1
 
-def scaling_factor(n):
-    return 0.5 * (l ** (n - 300)) / 6
+    iterations = 108
 
-iterations = 400
+    circle = profiles.circle(1, 20)
+    square = profiles.square(1, 20)
 
-generating_curve = [
-    Vector2(0,-6), Vector2(0,-4), Vector2(0,-2), Vector2(0,0), Vector2(0,2), Vector2(0,4), Vector2(0,6),
-    Vector2(0.2, 6.3), Vector2(0.4, 6.1), Vector2(0.672, 5.5), Vector2(0.845, 5), Vector2(1, 4), Vector2(2, 2),
-    Vector2(3.394, 0), Vector2(4.363, -2), Vector2(3.394, -4), Vector2(1.104, -6), Vector2(0.4, -6.4), Vector2(0.2, -6.3)
-]
-axis = coiling_axis(start, tangent, normal, coiling_rate, displacement, coiling_radius, scaling_factor, generating_curve, iterations)
 
-generate_sweep(axis)
+    # or, with the morph eased in and out, and through a hexagon on the way:
+    # generating_shape = Morph([circle, profiles.hexagon(1, 20), square], 0, iterations, easing="smoothstep")
+    generating_shape = Morph([circle, square], 0, iterations)
 
-'''
-Homotopy Example
+    axis = coiling_axis(start, tangent, normal, coiling_rate, displacement, coiling_radius, scaling_factor, generating_shape, iterations)
 
-start = Vector3(0,0,0)
-tangent = Vector3(0,0,1)
-normal = Vector3(1,0,0)
+    shells["Homotopy"] = axis
+    '''
 
-def coiling_rate(n):
-    return n * math.pi / 18
+    # Varying generating curve example...
+    start = Vector3(70,0,0)
+    tangent = Vector3(0,0,1)
+    normal = Vector3(1,0,0)
 
-def displacement(n):
-    return n / 9
+    l = 1.03
 
-def coiling_radius(n):
-    return 5
+    coiling_rate = Linear(math.pi, divisor=18)
+    displacement = Power(0.5 * 1.5, l, 300)
+    coiling_radius = 0
+    scaling_factor = Power(0.5, l, 300, divisor=6)
 
-def scaling_factor(n):
-    return 1
+    iterations = 400
 
-iterations = 108
-
-circle = make_circle(1, 20)
-square = make_square(1, 20)
-
-
-def generating_shape(n):
-    return homotopy(circle, square, n, iterations)
-        
-
-axis = coiling_axis(start, tangent, normal, coiling_rate, displacement, coiling_radius, scaling_factor, generating_shape, iterations)
-
-generate_sweep(axis)
-'''
-
-# Varying generating curve example...
-start = Vector3(70,0,0)
-tangent = Vector3(0,0,1)
-normal = Vector3(1,0,0)
-
-l = 1.03
-
-def coiling_rate(n):
-    return n * math.pi / 18
-
-def displacement(n):
-    return 0.5 * 1.5 * l ** (n - 300)
-
-def coiling_radius(n):
-    return 0
-
-def scaling_factor(n):
-    return 0.5 * (l ** (n - 300)) / 6
-
-iterations = 400
-
-inner_curve = [
-    Vector2(0,-6), Vector2(0,-4), Vector2(0,-2), Vector2(0,0), Vector2(0,2), Vector2(0,4), Vector2(0,6),
-    Vector2(0.2, 6.3), Vector2(0.4, 6.1), Vector2(0.672, 5.5), Vector2(0.845, 5), Vector2(1 * 0.75, 4), Vector2(2 * 0.75, 2),
-    Vector2(3.394 * 0.75, 0), Vector2(4.363 * 0.75, -2), Vector2(3.394 * 0.75, -4), Vector2(1.104 * 0.75, -6), Vector2(0.4, -6.4), Vector2(0.2, -6.3)
-]
-
-outer_curve = [
-    Vector2(0,-6), Vector2(0,-4), Vector2(0,-2), Vector2(0,0), Vector2(0,2), Vector2(0,4), Vector2(0,6),
-    Vector2(0.2, 6.3), Vector2(0.4, 6.1), Vector2(0.672,5.5), Vector2(0.845*1.25, 4.5), Vector2(2,4), Vector2(3.5,3),
-    Vector2(5,1), Vector2(5.2,-2), Vector2(3.394*1.25,-4), Vector2(2,-5.5), Vector2(0.8,-6.4), Vector2(0.2, -6.3)
-]
-
-def generating_curve(n):
-    if n < 395:
-        return inner_curve
-    else:
-        return homotopy(inner_curve, outer_curve, n - 395, 5)
+    inner_curve = [
+        Vector2(0,-6), Vector2(0,-4), Vector2(0,-2), Vector2(0,0), Vector2(0,2), Vector2(0,4), Vector2(0,6),
+        Vector2(0.2, 6.3), Vector2(0.4, 6.1), Vector2(0.672, 5.5), Vector2(0.845, 5), Vector2(1 * 0.75, 4), Vector2(2 * 0.75, 2),
+        Vector2(3.394 * 0.75, 0), Vector2(4.363 * 0.75, -2), Vector2(3.394 * 0.75, -4), Vector2(1.104 * 0.75, -6), Vector2(0.4, -6.4), Vector2(0.2, -6.3)
+    ]
 
+    outer_curve = [
+        Vector2(0,-6), Vector2(0,-4), Vector2(0,-2), Vector2(0,0), Vector2(0,2), Vector2(0,4), Vector2(0,6),
+        Vector2(0.2, 6.3), Vector2(0.4, 6.1), Vector2(0.672,5.5), Vector2(0.845*1.25, 4.5), Vector2(2,4), Vector2(3.5,3),
+        Vector2(5,1), Vector2(5.2,-2), Vector2(3.394*1.25,-4), Vector2(2,-5.5), Vector2(0.8,-6.4), Vector2(0.2, -6.3)
+    ]
 
-axis = coiling_axis(start, tangent, normal, coiling_rate, displacement, coiling_radius, scaling_factor, generating_curve, iterations)
+    generating_curve = Morph([inner_curve, outer_curve], 395, 5)
 
-generate_sweep(axis)
+    axis = coiling_axis(start, tangent, normal, coiling_rate, displacement, coiling_radius, scaling_factor, generating_curve, iterations)
 
-# Patelliform Shell
-start = Vector3(80,0,10)
-tangent = Vector3(0,1,0)
-normal = Vector3(1,0,0)
+    shells["Varying Curve"] = axis
 
-l = 1.34
+    # Patelliform Shell
+    start = Vector3(80,0,10)
+    tangent = Vector3(0,1,0)
+    normal = Vector3(1,0,0)
 
-def coiling_rate(n):
-    return n * math.pi / 18
+    l = 1.34
 
-def displacement(n):
-    return 0
+    coiling_rate = Linear(math.pi, divisor=18)
+    displacement = 0
+    coiling_radius = Power(0.0075, l, 300)
+    scaling_factor = Power(0.0075, l, 300)
 
-def coiling_radius(n):
-    return 0.0075 * l ** (n - 300)
+    iterations = 325
 
-def scaling_factor(n):
-    return 0.0075 * l ** (n - 300)
+    circle = profiles.circle(1, 20)
+    axis = coiling_axis(start, tangent, normal, coiling_rate, displacement, coiling_radius, scaling_factor, circle, iterations)
 
-iterations = 325
+    shells["Patelliform"] = axis
 
-circle = make_circle(1, 20)
-axis = coiling_axis(start, tangent, normal, coiling_rate, displacement, coiling_radius, scaling_factor, circle, iterations)
+    # Swept, then added to the scene in one go
+    build_scene(shells, 'Seashells')
 
-generate_sweep(axis)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+from functools import lru_cache
+
+import numpy as np
+
+# Index layout shared by every ring-strip mesh in the project: ring i holds
+# vertices i * profile_len ... (i + 1) * profile_len - 1, and consecutive
+# rings are joined by a strip of quads.
+
+@lru_cache(maxsize=32)
+def ring_strip_topology(rings: int, profile_len: int, closed: bool = True):
+    # Returns (faces, edges) as read-only contiguous int32 arrays of shape
+    # (n_faces, 4) and (n_edges, 2). Every edge appears exactly once. The
+    # result is cached, so shells with the same resolution share it.
+    segments = profile_len if closed else profile_len - 1
+
+    ring = np.arange(rings, dtype=np.int32)[:, None] * profile_len
+    j = np.arange(segments, dtype=np.int32)
+    j_next = (j + 1) % profile_len
+
+    # Quads winding bottom left, bottom right, top right, top left, the same
+    # order generate_sweep and interpolate_mesh have always used
+    bottom = ring[:-1]
+    top = ring[1:]
+    faces = np.stack([
+        bottom + j, bottom + j_next,
+        top + j_next, top + j
+    ], axis=-1).reshape(-1, 4)
+
+    ring_edges = np.stack([ring + j, ring + j_next], axis=-1).reshape(-1, 2)
+
+    column = np.arange(profile_len, dtype=np.int32)
+    side_edges = np.stack([bottom + column, top + column], axis=-1).reshape(-1, 2)
+
+    faces = np.ascontiguousarray(faces, dtype=np.int32)
+    edges = np.ascontiguousarray(np.concatenate([ring_edges, side_edges]), dtype=np.int32)
+
+    faces.flags.writeable = False
+    edges.flags.writeable = False
+
+    return faces, edges
+
+@lru_cache(maxsize=32)
+def ring_strip_corners(rings: int, profile_len: int):
+    # (ring, column) of every face corner (loop) of the closed
+    # ring_strip_topology, in loop order. The closing quad of each ring
+    # reaches column profile_len rather than wrapping to 0, so per-vertex
+    # values with an extra seam column (UVs running to u = 1) can be looked
+    # up as values[ring, column].
+    i = np.arange(rings - 1, dtype=np.int32)[:, None] + np.zeros(profile_len, dtype=np.int32)
+    j = np.arange(profile_len, dtype=np.int32)[None, :] + np.zeros((rings - 1, 1), dtype=np.int32)
+
+    # bottom left, bottom right, top right, top left, as in the faces
+    ring = np.ascontiguousarray(np.stack([i, i, i + 1, i + 1], axis=-1).reshape(-1))
+    column = np.ascontiguousarray(np.stack([j, j + 1, j + 1, j], axis=-1).reshape(-1))
+
+    ring.flags.writeable = False
+    column.flags.writeable = False
+
+    return ring, column
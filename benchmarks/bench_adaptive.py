@@ -0,0 +1,87 @@
+# Compares the fixed one-ring-per-iteration sweep with adaptive ring
+# sampling on the shells in Submission/shells.json, reporting vertex counts,
+# time and how far the adaptive surface strays from the full one. Adaptive
+# sampling sweeps every ring to measure that, so it takes longer than the
+# fixed sweep; what it saves is mesh size (upload, memory, rendering).
+#
+#   python benchmarks/bench_adaptive.py [spacing] [tolerance] [min scale]
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from Submission import batch
+from Submission.geometry import generate_sweep_array, generate_sweep_adaptive
+from Submission.topology import ring_strip_topology
+
+SPECS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Submission", "shells.json")
+
+
+def timed(function, repeat=3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def max_deviation(full, full_iterations, adaptive, adaptive_iterations, profile_len):
+    # Largest distance between a full-resolution ring and the adaptive mesh
+    # linearly interpolated to the same iteration, over the part of the
+    # shell the adaptive mesh still covers (rings dropped for being too
+    # small are reported separately)
+    kept = full_iterations >= adaptive_iterations[0]
+    full = full.reshape(-1, profile_len, 3)[kept]
+    full_iterations = full_iterations[kept]
+    adaptive = adaptive.reshape(-1, profile_len, 3)
+
+    k = np.clip(np.searchsorted(adaptive_iterations, full_iterations, side="right") - 1, 0, len(adaptive) - 1)
+    k1 = np.minimum(k + 1, len(adaptive) - 1)
+    span = adaptive_iterations[k1] - adaptive_iterations[k]
+    f = np.divide(full_iterations - adaptive_iterations[k], span, out=np.zeros(len(k)), where=span > 0)
+    f = np.clip(f, 0, 1)[:, None, None]
+
+    interpolated = adaptive[k] * (1 - f) + adaptive[k1] * f
+    return np.max(np.linalg.norm(interpolated - full, axis=2))
+
+
+def main():
+    spacing = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+    tolerance = float(sys.argv[2]) if len(sys.argv) > 2 else 0.02
+    min_scale = float(sys.argv[3]) if len(sys.argv) > 3 else 0.02
+
+    print("spacing={0} tolerance={1} min_scale={2}".format(spacing, tolerance, min_scale))
+    print("{0:14} {1:>9} {2:>9} {3:>8} {4:>9} {5:>9} {6:>10} {7:>11}".format(
+        "shell", "full", "adaptive", "saved", "full ms", "adapt ms", "max error", "apex from"))
+    failures = 0
+
+    for spec in batch.load_specs(SPECS):
+        axis = batch.make_axis(spec)
+        profile_len = len(axis.generating_shape(axis.current_iteration + 1))
+        full_iterations = np.arange(axis.current_iteration + 1, axis.max_iterations)
+
+        # Generation plus the (uncached) topology, since both scale with rings
+        full_time, full = timed(lambda: generate_sweep_array(axis))
+        adaptive_time, (adaptive, iterations) = timed(
+            lambda: generate_sweep_adaptive(axis, spacing, tolerance, min_scale))
+        full_time += timed(lambda: ring_strip_topology.__wrapped__(len(full_iterations), profile_len))[0]
+        adaptive_time += timed(lambda: ring_strip_topology.__wrapped__(len(iterations), profile_len))[0]
+
+        error = max_deviation(full, full_iterations, adaptive, iterations, profile_len)
+        within = error <= tolerance and len(adaptive) <= len(full)
+        failures += not within
+        print("{0:14} {1:9d} {2:9d} {3:7.1f}% {4:9.2f} {5:9.2f} {6:10.4f} {7:11d}{8}".format(
+            spec["name"], len(full), len(adaptive), 100 * (1 - len(adaptive) / len(full)),
+            1000 * full_time, 1000 * adaptive_time, error, iterations[0],
+            "" if within else "  over tolerance or more rings than the full sweep"))
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# Times re-generating the varying-curve shell from sweep.py after its lip
+# changes: a fresh generate_sweep against update_sweep patching the mesh
+# from the first run, with and without custom normals and UVs, and checks
+# both end up with the same vertices, normals and UVs.
+# Also updates shells too short to have any faces, and one of several
+# build_scene placements sharing a mesh, checking the others stay put.
+#
+#   python benchmarks/bench_incremental.py [iterations] [profile points]
+import itertools
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+import fake_bpy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+bpy = fake_bpy.install()
+
+from Submission import sweep, profiles
+from Submission.geometry import Vector3, coiling_axis, Morph
+from Submission.growth import Linear, Power
+
+
+def make_axis(iterations, profile_points, lip, x=0):
+    # The varying-curve shell: the profile flares out over the last 5 rings
+    l = 1.03
+    k = iterations * 3 // 4
+    shape = Morph([profiles.circle(1, profile_points), profiles.circle(lip, profile_points)], iterations - 5, 5)
+    return coiling_axis(Vector3(x, 0, 0), Vector3(0, 0, 1), Vector3(1, 0, 0),
+        Linear(math.pi, divisor=18), Power(0.75, l, k), 0, Power(0.5, l, k, divisor=6),
+        shape, iterations)
+
+
+def world_vertices(obj):
+    return obj.data.vertices.data["co"].reshape(-1, 3) + np.array(obj.location, dtype=np.float32)
+
+
+def timed(function, repeat=5):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    profile_points = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    sweep.MESH_CACHE = None
+
+    print("iterations={0} profile={1}".format(iterations, profile_points))
+    # With and without the custom normals and UVs, which update_sweep
+    # patches along with the vertices
+    for surface in (True, False):
+        sweep.NORMALS_AND_UVS = surface
+        obj = sweep.generate_sweep(make_axis(iterations, profile_points, 1.3))
+        full, fresh = timed(lambda: sweep.generate_sweep(make_axis(iterations, profile_points, 1.6)))
+        # Alternate the lip so every update has rings to re-sweep
+        lips = itertools.cycle([1.6, 1.3])
+        incremental, rings = timed(lambda: sweep.update_sweep(make_axis(iterations, profile_points, next(lips)), obj))
+
+        print(" {0}".format("normals and uvs" if surface else "vertices only"))
+        print("  generate_sweep  {0:8.2f} ms".format(full * 1000))
+        print("  update_sweep    {0:8.2f} ms   {1:.1f}x   ({2} rings re-swept)".format(
+            incremental * 1000, full / incremental, rings))
+
+        sweep.update_sweep(make_axis(iterations, profile_points, 1.6), obj)
+        same = [np.array_equal(obj.data.vertices.data["co"], fresh.data.vertices.data["co"])]
+        if surface:
+            same += [np.array_equal(obj.data.custom_normals, fresh.data.custom_normals),
+                np.array_equal(obj.data.uv_layers["UVMap"].data.data["uv"], fresh.data.uv_layers["UVMap"].data.data["uv"])]
+        print("  identical output: " + ", ".join("{0} {1}".format(name, value)
+            for name, value in zip(["vertices", "normals", "uvs"], same)))
+    sweep.NORMALS_AND_UVS = True
+
+    # Shells too short for any faces: no rings at all, and a single ring
+    for short in (1, 2):
+        obj = sweep.generate_sweep(make_axis(short, profile_points, 1.3))
+        rings = sweep.update_sweep(make_axis(short, profile_points, 1.6), obj)
+        print("iterations={0}: {1} vertices, {2} rings re-swept".format(short, len(obj.data.vertices), rings))
+
+    # Placements of one shell share a mesh; updating one of them mustn't
+    # move the others
+    names = ["A", "B", "C"]
+    objects = sweep.build_scene({name: make_axis(iterations, profile_points, 1.3, 10 * i)
+        for i, name in enumerate(names)})
+    before = [world_vertices(obj) for obj in objects]
+    rings = sweep.update_sweep(make_axis(iterations, profile_points, 1.6, 10), objects[1])
+    fresh = sweep.generate_sweep(make_axis(iterations, profile_points, 1.6, 10))
+    print("updated placement B ({0} rings re-swept): A unchanged {1}, C unchanged {2}, B matches {3}".format(
+        rings, np.array_equal(world_vertices(objects[0]), before[0]),
+        np.array_equal(world_vertices(objects[2]), before[2]),
+        np.allclose(world_vertices(objects[1]), world_vertices(fresh), atol=1e-4)))
+
+
+if __name__ == "__main__":
+    main()
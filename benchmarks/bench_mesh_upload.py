@@ -0,0 +1,76 @@
+# Compares Mesh.from_pydata against the foreach_set upload in mesh_upload.py,
+# using the fake bpy mesh from fake_bpy.py.
+#
+#   python benchmarks/bench_mesh_upload.py [rings] [profile points]
+import os
+import sys
+import time
+
+import numpy as np
+
+import fake_bpy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+bpy = fake_bpy.install()
+from Submission import mesh_upload
+from Submission.topology import ring_strip_topology
+
+
+def make_grid(rings, profile_points):
+    theta = np.linspace(0, 2 * np.pi, profile_points, endpoint=False)
+    z = np.arange(rings, dtype=np.float64)
+    vertices = np.empty((rings, profile_points, 3))
+    vertices[:, :, 0] = np.cos(theta)
+    vertices[:, :, 1] = np.sin(theta)
+    vertices[:, :, 2] = z[:, None]
+    faces, edges = ring_strip_topology(rings, profile_points)
+    return vertices.reshape(-1, 3), faces, edges
+
+
+def upload_pydata(vertices, faces, edges):
+    # What generate_mesh receives: nested Python lists
+    mesh = bpy.data.meshes.new("pydata")
+    start = time.perf_counter()
+    vertex_list = vertices.tolist()
+    edge_list = edges.tolist()
+    face_list = faces.tolist()
+    mesh.from_pydata(vertex_list, edge_list, face_list)
+    return time.perf_counter() - start, mesh
+
+
+def upload_bulk(vertices, faces, edges):
+    mesh = bpy.data.meshes.new("bulk")
+    start = time.perf_counter()
+    mesh_upload.fill_mesh(mesh, vertices, faces, edges)
+    return time.perf_counter() - start, mesh
+
+
+def main():
+    rings = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    profile_points = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    vertices, faces, edges = make_grid(rings, profile_points)
+
+    pydata_time, pydata_mesh = upload_pydata(vertices, faces, edges)
+    bulk_time, bulk_mesh = upload_bulk(vertices, faces, edges)
+
+    identical = all(
+        np.array_equal(a.data[name], b.data[name])
+        for a, b in [
+            (pydata_mesh.vertices, bulk_mesh.vertices),
+            (pydata_mesh.edges, bulk_mesh.edges),
+            (pydata_mesh.loops, bulk_mesh.loops),
+            (pydata_mesh.polygons, bulk_mesh.polygons),
+        ]
+        for name in a.data
+    )
+
+    print("vertices={0} faces={1} edges={2}".format(len(vertices), len(faces), len(edges)))
+    print("from_pydata  {0:8.3f}s".format(pydata_time))
+    print("foreach_set  {0:8.3f}s".format(bulk_time))
+    print("speedup {0:.1f}x, identical mesh data: {1}".format(pydata_time / bulk_time, identical))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# Compares generate_sweep against generate_sweep_array outside of Blender.
+#
+#   python benchmarks/bench_sweep_array.py [iterations] [profile points]
+import math
+import os
+import sys
+import time
+from unittest import mock
+
+import numpy as np
+
+import fake_bpy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# The legacy generate_sweep path uploads its mesh through bpy
+fake_bpy.install()
+from Submission import sweep
+from Submission.geometry import generate_sweep_array
+
+
+def make_axis(iterations, profile_points):
+    l = 1.01
+
+    def coiling_rate(n):
+        return n * math.pi / 18
+
+    def displacement(n):
+        return 5 * l ** (n - iterations * 3 // 4)
+
+    def coiling_radius(n):
+        return l ** (n - iterations * 3 // 4)
+
+    def scaling_factor(n):
+        return l ** (n - iterations * 3 // 4)
+
+    return sweep.coiling_axis(
+        sweep.Vector3(0, 0, 0), sweep.Vector3(0, 0, 1), sweep.Vector3(1, 0, 0),
+        coiling_rate, displacement, coiling_radius, scaling_factor,
+        sweep.profiles.circle(1, profile_points), iterations
+    )
+
+
+def run_generate_sweep(axis):
+    captured = {}
+
+    def capture(vertices, edges, faces):
+        captured["vertices"] = vertices
+
+    with mock.patch.object(sweep, "generate_mesh", capture), mock.patch.object(sweep, "USE_BULK_UPLOAD", False):
+        sweep.generate_sweep(axis)
+    return captured["vertices"]
+
+
+def best_of(function, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    profile_points = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    loop_time, loop_vertices = best_of(lambda: run_generate_sweep(make_axis(iterations, profile_points)), 1)
+    array_time, array_vertices = best_of(lambda: generate_sweep_array(make_axis(iterations, profile_points)), 3)
+
+    identical = np.array_equal(np.array(loop_vertices, dtype=np.float64), array_vertices)
+    n_vertices = len(array_vertices)
+
+    print("iterations={0} profile={1} vertices={2}".format(iterations, profile_points, n_vertices))
+    print("generate_sweep        {0:8.3f}s  {1:12.0f} vertices/s".format(loop_time, n_vertices / loop_time))
+    print("generate_sweep_array  {0:8.3f}s  {1:12.0f} vertices/s".format(array_time, n_vertices / array_time))
+    print("speedup {0:.1f}x, identical output: {1}".format(loop_time / array_time, identical))
+
+
+if __name__ == "__main__":
+    main()
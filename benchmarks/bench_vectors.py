@@ -0,0 +1,131 @@
+# Microbenchmarks for the Vector2 / Vector3 hot path: the ring vertex
+# pattern center + a * normal + b * tangent written with the original
+# (slot-less, allocate-per-op) Vector3, with the current Vector3 operators,
+# with Vector3.axpy, and with Vec3Array for a whole ring at once. Also
+# checks that every variant produces the same coordinates.
+#
+#   python benchmarks/bench_vectors.py [rings] [profile points]
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from Submission.geometry import Vector3, Vec3Array
+from Submission import profiles
+
+
+class LegacyVector3(object):
+    # Vector3 as it was before __slots__ and axpy, kept here for comparison
+    def __init__(self, x, y, z):
+        self.x = x
+        self.y =y
+        self.z = z
+
+    def __add__(self, other):
+        return LegacyVector3(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __mul__(self, other):
+        if type(other) is type(self):
+            return self.x * other.x + self.y * other.y + self.z * other.z
+        else:
+            return LegacyVector3(other * self.x, other * self.y, other * self.z)
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __abs__(self):
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    def normalize(self):
+        return self.__mul__(1/ self.__abs__())
+
+    def to_list(self):
+        return [self.x, self.y, self.z]
+
+
+def ring_frames(rings):
+    # (center, normal, tangent, scale) per ring, like generate_sweep's loop
+    for n in range(rings):
+        angle = n * math.pi / 18
+        yield (n * 0.01, 0.0, 0.1 * n), (math.cos(angle), math.sin(angle), 0.0), (0.0, 0.0, 1.0), 1.01 ** (n - rings)
+
+
+def legacy_ring(vector, profile, rings):
+    vertices = []
+    for center, normal, tangent, scale in ring_frames(rings):
+        center, normal, tangent = vector(*center), vector(*normal), vector(*tangent)
+        for x, y in profile:
+            v = center + (scale * x) * normal + (scale * y) * tangent
+            vertices.append(v.to_list())
+    return vertices
+
+
+def axpy_ring(profile, rings):
+    vertices = []
+    for center, normal, tangent, scale in ring_frames(rings):
+        center, normal, tangent = Vector3(*center), Vector3(*normal), Vector3(*tangent)
+        for x, y in profile:
+            vertices.append(center.axpy(scale * x, normal, scale * y, tangent).to_list())
+    return vertices
+
+
+def array_ring(profile, rings):
+    profile = np.array(profile)
+    blocks = []
+    for center, normal, tangent, scale in ring_frames(rings):
+        center = Vec3Array.repeat(Vector3(*center), len(profile))
+        ring = center.axpy(scale * profile[:, 0], Vector3(*normal), scale * profile[:, 1], Vector3(*tangent))
+        blocks.append(ring.to_array())
+    return np.concatenate(blocks).tolist()
+
+
+def time_ops(vector, count):
+    a = vector(1.0, 2.0, 3.0)
+    b = vector(0.5, -1.0, 0.25)
+    start = time.perf_counter()
+    for _ in range(count):
+        c = a + 2.0 * b
+        c.normalize()
+    return time.perf_counter() - start
+
+
+def main():
+    rings = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    profile_points = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    profile = profiles.circle(1, profile_points).tolist()
+
+    count = 200000
+    legacy = time_ops(LegacyVector3, count)
+    current = time_ops(Vector3, count)
+    print("a + 2 * b, normalize x{0}".format(count))
+    print("  legacy Vector3   {0:8.3f}s".format(legacy))
+    print("  Vector3          {0:8.3f}s   {1:.2f}x".format(current, legacy / current))
+
+    print("ring vertices, rings={0} profile={1}".format(rings, profile_points))
+    results = {}
+    timings = {}
+    for name, run in [
+        ("legacy Vector3", lambda: legacy_ring(LegacyVector3, profile, rings)),
+        ("Vector3 operators", lambda: legacy_ring(Vector3, profile, rings)),
+        ("Vector3.axpy", lambda: axpy_ring(profile, rings)),
+        ("Vec3Array.axpy", lambda: array_ring(profile, rings)),
+    ]:
+        start = time.perf_counter()
+        results[name] = run()
+        timings[name] = time.perf_counter() - start
+
+    base = timings["legacy Vector3"]
+    for name, elapsed in timings.items():
+        print("  {0:18s}{1:8.3f}s   {2:.2f}x".format(name, elapsed, base / elapsed))
+
+    reference = results["legacy Vector3"]
+    print("identical output: " + ", ".join(
+        "{0} {1}".format(name, result == reference) for name, result in results.items() if name != "legacy Vector3"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# Checks genTexture.setup_material against the fake bpy from fake_bpy.py
+# and the fake compiler from fake_oslc.py: script nodes point at the
+# precompiled .oso, else at the .osl in shaders/, else at the .blend's text
+# blocks with turbulence.h inlined; building the materials again changes
+# nothing and leaves one node tree and one inlined text per shader; and a
+# changed shader source rebuilds them. Then assigns them to a scene of
+# shells: placements sharing a mesh each get their own material, the
+# levels of a LOD pyramid one between them, and the hidden profile of the
+# Geometry Nodes backend none. Exits with status 1 on a failure.
+#
+#   python benchmarks/check_materials.py
+import math
+import os
+import sys
+import tempfile
+
+import fake_bpy
+import fake_oslc
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, ".."))
+
+scratch = tempfile.mkdtemp(prefix="check_materials-")
+os.environ["OSLC"] = fake_oslc.install(scratch)
+os.environ["SEASHELLS_OSO_CACHE"] = os.path.join(scratch, "oso")
+
+bpy = fake_bpy.install()
+
+from Submission import genTexture, osl_cache, sweep, profiles
+from Submission.geometry import Vector3, coiling_axis
+from Submission.geometry_nodes import new_profile_object
+from Submission.growth import Linear, Power
+
+failures = 0
+
+
+def check(description, passed):
+    global failures
+    failures += not passed
+    print("{0:64} {1}".format(description, "ok" if passed else "FAIL"))
+
+
+def script_nodes():
+    # {material name: its script node}
+    return {mat.name: next(node for node in mat.node_tree.nodes if node.bl_idname == 'ShaderNodeScript')
+        for mat in bpy.data.materials}
+
+
+def one_tree_each():
+    # One material per shader, each a script node linked to an output
+    return (sorted(bpy.data.materials.keys()) == sorted(genTexture.texture_names) and
+        all(len(mat.node_tree.nodes) == 2 and len(mat.node_tree.links) == 1 for mat in bpy.data.materials))
+
+
+def build_twice(description):
+    # Builds the materials, then again, checking the second run keeps
+    # every node and text as it was
+    genTexture.setup_materials()
+    nodes = script_nodes()
+    texts = dict(bpy.data.texts)
+    genTexture.setup_materials()
+    check(description + ": one node tree per material", one_tree_each())
+    check(description + ": second run changes nothing",
+        all(script_nodes()[name] is node for name, node in nodes.items()) and dict(bpy.data.texts) == texts)
+    return nodes
+
+
+def make_axis(x, l=1.03):
+    return coiling_axis(Vector3(x, 0, 0), Vector3(0, 0, 1), Vector3(1, 0, 0),
+        Linear(math.pi, divisor=18), Power(0.75, l, 60), 0, Power(0.5, l, 60), profiles.circle(1, 16), 80)
+
+
+def first_material(obj):
+    return obj.material_slots[0].material if obj.material_slots else None
+
+
+def check_assignment(materials):
+    # A and B differ only in where they start, so B is a linked duplicate
+    # of A; C is a shell of its own, D a LOD pyramid
+    sweep.MESH_CACHE = None
+    a, b, c = sweep.build_scene({"A": make_axis(0), "B": make_axis(10), "C": make_axis(20, 1.02)})
+    check("placements share one mesh", a.data is b.data and c.data is not a.data)
+
+    sweep.LEVELS_OF_DETAIL = dict(levels=3, distances=(0, 25, 60))
+    lods = sweep.generate_sweep(make_axis(30))
+    sweep.LEVELS_OF_DETAIL = None
+    profile = new_profile_object(profiles.circle(1, 16))
+
+    genTexture.assign_materials(materials)
+    check("shells get materials round-robin, placements their own",
+        sorted(first_material(obj).name for obj in (a, b, c)) == sorted(mat.name for mat in materials[:3]))
+    check("LOD levels share one material", all(first_material(obj) is materials[3] for obj in lods))
+    check("hidden Geometry Nodes profile left out", not profile.data.materials)
+    check("assigning again changes nothing", genTexture.assign_materials(materials) == 0)
+
+
+def main():
+    # Precompiled: EXTERNAL nodes on .oso files in the cache
+    nodes = build_twice("precompiled")
+    check("precompiled: nodes load the cached .oso", all(node.mode == 'EXTERNAL' and
+        node.filepath.endswith(".oso") and node.filepath.startswith(os.environ["SEASHELLS_OSO_CACHE"])
+        for node in nodes.values()))
+
+    # No compiler: EXTERNAL nodes on the .osl files, rebuilt from the above
+    genTexture.USE_PRECOMPILED = False
+    nodes = build_twice("no oslc")
+    check("no oslc: nodes compile shaders/*.osl", all(node.mode == 'EXTERNAL' and
+        node.filepath == genTexture.shader_path(name) for name, node in nodes.items()))
+
+    # No shaders/ either: the .blend's text blocks, headers inlined
+    for filename in os.listdir(osl_cache.SHADER_DIRECTORY):
+        with open(os.path.join(osl_cache.SHADER_DIRECTORY, filename)) as f:
+            bpy.data.texts.new(filename).from_string(f.read())
+    osl_cache.SHADER_DIRECTORY = os.path.join(scratch, "no shaders")
+    nodes = build_twice("text blocks")
+    check("text blocks: nodes use the inlined texts", all(node.mode == 'INTERNAL' and
+        node.script is bpy.data.texts[name.lower() + ".osl (inlined)"] for name, node in nodes.items()))
+    check("text blocks: turbulence.h inlined", all(not osl_cache.include_pattern.search(node.script.as_string()) and
+        "surface_point" in node.script.as_string() for node in nodes.values()))
+
+    # Editing the header rebuilds every material, in place
+    texts = len(bpy.data.texts)
+    header = bpy.data.texts["turbulence.h"]
+    header.from_string(header.as_string() + "\n/* edited */\n")
+    genTexture.setup_materials()
+    check("edited header: every material rebuilt",
+        all(script_nodes()[name] is not node for name, node in nodes.items()))
+    check("edited header: one node tree and inlined text per shader",
+        one_tree_each() and len(bpy.data.texts) == texts and
+        all("/* edited */" in node.script.as_string() for node in script_nodes().values()))
+
+    check_assignment(genTexture.setup_materials())
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
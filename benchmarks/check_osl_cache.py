@@ -0,0 +1,73 @@
+# Checks the .oso cache in osl_cache.py on a scratch copy of shaders/, with
+# the fake compiler from fake_oslc.py: an unchanged shader is compiled once
+# and then reused, touching a file without changing it keeps its hash, and
+# editing turbulence.h changes the hash of every shader including it and
+# compiles them again. Exits with status 1 on a failure.
+#
+#   python benchmarks/check_osl_cache.py
+import os
+import shutil
+import sys
+import tempfile
+
+import fake_oslc
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, ".."))
+
+from Submission import osl_cache
+
+failures = 0
+
+
+def check(description, passed):
+    global failures
+    failures += not passed
+    print("{0:64} {1}".format(description, "ok" if passed else "FAIL"))
+
+
+def main():
+    scratch = tempfile.mkdtemp(prefix="check_osl_cache-")
+    oslc = fake_oslc.install(scratch)
+    shaders = os.path.join(scratch, "shaders")
+    cache = os.path.join(scratch, "oso")
+    shutil.copytree(osl_cache.SHADER_DIRECTORY, shaders)
+    header = os.path.join(shaders, "turbulence.h")
+    names = sorted(f[:-len(".osl")] for f in os.listdir(shaders) if f.endswith(".osl"))
+
+    def hashes():
+        return {name: osl_cache.source_hash(os.path.join(shaders, name + ".osl")) for name in names}
+
+    first = osl_cache.compile_shaders(shaders, cache, oslc)
+    check("every shader compiled once", len(fake_oslc.compiles(scratch)) == len(names))
+    before = hashes()
+
+    again = osl_cache.compile_shaders(shaders, cache, oslc)
+    check("unchanged shaders reused", again == first and len(fake_oslc.compiles(scratch)) == len(names))
+
+    os.utime(header)
+    check("touched header keeps the hashes", hashes() == before)
+
+    with open(header, "a") as f:
+        f.write("\n/* edited */\n")
+    after = hashes()
+    check("edited header changes every hash", all(after[name] != before[name] for name in names))
+
+    edited = osl_cache.compile_shaders(shaders, cache, oslc)
+    check("edited header compiles every shader again",
+        all(edited[name] != first[name] and os.path.isfile(edited[name]) for name in names) and
+        len(fake_oslc.compiles(scratch)) == 2 * len(names))
+
+    missing = osl_cache.compiled_shader(os.path.join(shaders, "fire.osl"), cache, oslc=os.path.join(scratch, "no oslc"))
+    check("cached shader found without a compiler", missing == edited["fire"])
+    with open(os.path.join(shaders, "fire.osl"), "a") as f:
+        f.write("\n// edited\n")
+    missing = osl_cache.compiled_shader(os.path.join(shaders, "fire.osl"), cache, oslc=os.path.join(scratch, "no oslc"))
+    check("edited shader without a compiler falls back to the .osl", missing is None)
+
+    shutil.rmtree(scratch, ignore_errors=True)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,416 @@
+# A tiny stand-in for the parts of bpy the shell scripts touch, so geometry
+# generation and mesh upload can be run and timed outside of Blender.
+#
+#   import fake_bpy
+#   fake_bpy.install()   # before importing sweep.py / extrude.py
+#
+# Mesh data is stored in NumPy arrays the way Blender stores it in flat
+# attribute arrays, and from_pydata mirrors Blender's own pure Python
+# implementation so comparisons against it are fair.
+import copy
+import os
+import sys
+import types
+from itertools import accumulate, chain, islice
+
+import numpy as np
+
+
+class FakeCollection(object):
+    """A mesh element collection (vertices, edges, loops, polygons) holding
+    one flat array per attribute."""
+
+    def __init__(self, attributes, readonly=()):
+        # attribute name -> (dtype, components per element)
+        self.attributes = attributes
+        self.readonly = readonly
+        self.data = {name: np.zeros(0, dtype=dtype) for name, (dtype, _) in attributes.items()}
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def add(self, count):
+        self.length += count
+        for name, (dtype, size) in self.attributes.items():
+            grown = np.zeros(self.length * size, dtype=dtype)
+            grown[:len(self.data[name])] = self.data[name]
+            self.data[name] = grown
+
+    def foreach_set(self, attr, seq):
+        if attr in self.readonly:
+            raise TypeError("foreach_set(..., '{0}') attribute is read-only".format(attr))
+        dtype, size = self.attributes[attr]
+        values = np.asarray(seq, dtype=dtype).ravel()
+        if len(values) != self.length * size:
+            raise TypeError("foreach_set(..., '{0}') expected {1} items, got {2}".format(
+                attr, self.length * size, len(values)))
+        self.data[attr] = values.copy()
+
+    def foreach_get(self, attr, seq):
+        seq[:] = self.data[attr]
+
+
+class FakeUVLayers(dict):
+    def __init__(self, mesh):
+        super().__init__()
+        self.mesh = mesh
+
+    def new(self, name="UVMap"):
+        layer = types.SimpleNamespace(name=name, data=FakeCollection({"uv": (np.float32, 2)}))
+        layer.data.add(len(self.mesh.loops))
+        self[name] = layer
+        return layer
+
+
+class FakeAttributes(dict):
+    # Mesh.attributes, point domain only
+    def __init__(self, mesh):
+        super().__init__()
+        self.mesh = mesh
+
+    def new(self, name, type, domain):
+        components = {'FLOAT': 1, 'FLOAT_VECTOR': 3}[type]
+        attribute = types.SimpleNamespace(name=name, data_type=type, domain=domain,
+            data=FakeCollection({"value" if components == 1 else "vector": (np.float32, components)}))
+        attribute.data.add(len(self.mesh.vertices))
+        self[name] = attribute
+        return attribute
+
+
+class FakeCornerNormals(object):
+    # Mesh.corner_normals: one normal per loop
+    def __init__(self, mesh):
+        self.mesh = mesh
+
+    def __len__(self):
+        return len(self.mesh.loops)
+
+    def foreach_get(self, attr, seq):
+        normals = self.mesh.custom_normals
+        if normals is None:
+            normals = np.zeros((len(self.mesh.vertices), 3), dtype=np.float32)
+        seq[:] = normals[self.mesh.loops.data["vertex_index"]].ravel()
+
+
+class FakeIDProperties(object):
+    # obj["key"] custom properties, as on any Blender ID
+    def __getitem__(self, key):
+        return self.__dict__.setdefault("_properties", {})[key]
+
+    def __setitem__(self, key, value):
+        self.__dict__.setdefault("_properties", {})[key] = value
+
+    def get(self, key, default=None):
+        return self.__dict__.setdefault("_properties", {}).get(key, default)
+
+
+class FakeMesh(FakeIDProperties):
+    def __init__(self, name):
+        self.name = name
+        self.vertices = FakeCollection({"co": (np.float32, 3)})
+        self.edges = FakeCollection({"vertices": (np.int32, 2)})
+        self.loops = FakeCollection({"vertex_index": (np.int32, 1)})
+        self.polygons = FakeCollection({
+            "loop_start": (np.int32, 1),
+            "loop_total": (np.int32, 1),
+            "use_smooth": (bool, 1),
+        }, readonly=("loop_total",))
+        self.materials = []
+        self.uv_layers = FakeUVLayers(self)
+        self.attributes = FakeAttributes(self)
+        self.custom_normals = None
+        self.corner_normals = FakeCornerNormals(self)
+
+    @property
+    def users(self):
+        # Objects using the mesh
+        return sum(obj.data is self for obj in sys.modules["bpy"].data.objects)
+
+    def copy(self):
+        # A new mesh with the same data, custom properties and materials,
+        # named as Blender would (.001, ...)
+        mesh = sys.modules["bpy"].data.meshes.new(self.name)
+        memo = {id(self): mesh}
+        memo.update((id(material), material) for material in self.materials)
+        state = copy.deepcopy(self.__dict__, memo)
+        state["name"] = mesh.name
+        mesh.__dict__.update(state)
+        return mesh
+
+    def normals_split_custom_set_from_vertices(self, normals):
+        normals = np.asarray(normals, dtype=np.float32)
+        if normals.shape != (len(self.vertices), 3):
+            raise ValueError("expected one normal per vertex")
+        self.custom_normals = normals.copy()
+
+    def clear_geometry(self):
+        # Removes all elements, keeping materials and custom properties
+        materials = self.materials
+        self.__init__(self.name)
+        self.materials = materials
+
+    def from_pydata(self, vertices, edges, faces):
+        # Same steps as bpy.types.Mesh.from_pydata (Blender 3.6 and later)
+        face_lengths = tuple(map(len, faces))
+
+        self.vertices.add(len(vertices))
+        self.edges.add(len(edges))
+        self.loops.add(sum(face_lengths))
+        self.polygons.add(len(faces))
+
+        self.vertices.foreach_set("co", tuple(chain.from_iterable(vertices)))
+        self.edges.foreach_set("vertices", tuple(chain.from_iterable(edges)))
+
+        vertex_indices = tuple(chain.from_iterable(faces))
+        loop_starts = tuple(islice(chain([0], accumulate(face_lengths)), len(faces)))
+
+        self.polygons.foreach_set("loop_start", loop_starts)
+        self.loops.foreach_set("vertex_index", vertex_indices)
+
+        if edges or faces:
+            self.update(calc_edges=not edges)
+
+    def update(self, calc_edges=False):
+        # loop_total follows from loop_start, as in Blender since 3.6
+        starts = self.polygons.data["loop_start"]
+        self.polygons.data["loop_total"] = np.diff(starts, append=len(self.loops)).astype(np.int32)
+
+        if calc_edges and len(self.polygons):
+            self.edges = FakeCollection({"vertices": (np.int32, 2)})
+            faces = self.polygon_vertices()
+            pairs = np.concatenate([np.stack([f, np.roll(f, -1)], axis=-1) for f in faces])
+            pairs = np.unique(np.sort(pairs, axis=1), axis=0)
+            self.edges.add(len(pairs))
+            self.edges.foreach_set("vertices", pairs)
+
+    def polygon_vertices(self):
+        # Vertex indices of each polygon, for checking results
+        starts = self.polygons.data["loop_start"]
+        totals = self.polygons.data["loop_total"]
+        indices = self.loops.data["vertex_index"]
+        return [indices[s:s + t] for s, t in zip(starts, totals)]
+
+
+class FakeDriverTarget(object):
+    def __init__(self):
+        self.id = None
+
+
+class FakeDriverVariable(object):
+    def __init__(self):
+        self.name = ""
+        self.type = 'SINGLE_PROP'
+        self.targets = [FakeDriverTarget(), FakeDriverTarget()]
+
+
+class FakeDriverVariables(list):
+    def new(self):
+        variable = FakeDriverVariable()
+        self.append(variable)
+        return variable
+
+
+class FakeDriver(object):
+    def __init__(self):
+        self.type = 'AVERAGE'
+        self.expression = ""
+        self.variables = FakeDriverVariables()
+
+
+class FakeMaterialSlot(object):
+    # A slot's material comes from the mesh unless the slot is linked to
+    # the object
+    def __init__(self, obj, index):
+        self.obj = obj
+        self.index = index
+        self.link = 'DATA'
+        self.object_material = None
+
+    @property
+    def material(self):
+        if self.link == 'OBJECT':
+            return self.object_material
+        return self.obj.data.materials[self.index]
+
+    @material.setter
+    def material(self, material):
+        if self.link == 'OBJECT':
+            self.object_material = material
+        else:
+            self.obj.data.materials[self.index] = material
+
+
+class FakeObject(FakeIDProperties):
+    def __init__(self, name, data):
+        self.name = name
+        self.data = data
+        self.type = 'MESH' if isinstance(data, FakeMesh) else 'EMPTY'
+        self.location = [0.0, 0.0, 0.0]
+        self.drivers = {}
+        self.slots = []
+
+    @property
+    def material_slots(self):
+        # One per material of the mesh, as in Blender
+        count = len(self.data.materials) if self.type == 'MESH' else 0
+        while len(self.slots) < count:
+            self.slots.append(FakeMaterialSlot(self, len(self.slots)))
+        return self.slots[:count]
+
+    def driver_add(self, path):
+        self.drivers[path] = types.SimpleNamespace(driver=FakeDriver())
+        return self.drivers[path]
+
+
+class FakeObjects(list):
+    def link(self, obj):
+        self.append(obj)
+
+    def __contains__(self, item):
+        # Blender collections can be tested by name as well
+        if isinstance(item, str):
+            return any(obj.name == item for obj in self)
+        return list.__contains__(self, item)
+
+
+class FakeCollectionData(object):
+    def __init__(self, name):
+        self.name = name
+        self.objects = FakeObjects()
+        self.children = FakeObjects()
+
+    @property
+    def all_objects(self):
+        # Objects of this collection and all of its children
+        objects = list(self.objects)
+        for child in self.children:
+            objects.extend(obj for obj in child.all_objects if obj not in objects)
+        return objects
+
+
+class FakeText(FakeIDProperties):
+    def __init__(self, name):
+        self.name = name
+        self.body = ""
+        self.filepath = ""
+
+    def write(self, text):
+        self.body += text
+
+    def clear(self):
+        self.body = ""
+
+    def from_string(self, text):
+        self.body = text
+
+    def as_string(self):
+        return self.body
+
+
+class FakeSocket(object):
+    def __init__(self, node, name):
+        self.node = node
+        self.name = name
+
+
+class FakeNode(object):
+    def __init__(self, bl_idname):
+        self.bl_idname = bl_idname
+        self.name = bl_idname
+        self.location = (0, 0)
+        self.inputs = [FakeSocket(self, "Surface")]
+        self.outputs = [FakeSocket(self, "Output")]
+        # ShaderNodeScript
+        self.mode = 'INTERNAL'
+        self.script = None
+        self.filepath = ""
+
+
+class FakeNodes(list):
+    def __init__(self, links):
+        super().__init__()
+        self.links = links
+
+    def new(self, bl_idname):
+        node = FakeNode(bl_idname)
+        self.append(node)
+        return node
+
+    def remove(self, node):
+        # Along with the links to and from it, as in Blender
+        self.links[:] = [link for link in self.links
+            if link.from_socket.node is not node and link.to_socket.node is not node]
+        list.remove(self, node)
+
+
+class FakeLinks(list):
+    def new(self, from_socket, to_socket):
+        link = types.SimpleNamespace(from_socket=from_socket, to_socket=to_socket)
+        self.append(link)
+        return link
+
+
+class FakeNodeTree(object):
+    def __init__(self):
+        self.links = FakeLinks()
+        self.nodes = FakeNodes(self.links)
+
+
+class FakeMaterial(FakeIDProperties):
+    def __init__(self, name):
+        self.name = name
+        self.use_nodes = False
+        self.node_tree = FakeNodeTree()
+
+
+class FakeDataBlocks(dict):
+    def __init__(self, factory):
+        super().__init__()
+        self.factory = factory
+
+    def new(self, name, *args):
+        # Blender appends .001, .002, ... to clashing names
+        unique_name = name
+        suffix = 0
+        while unique_name in self:
+            suffix += 1
+            unique_name = "{0}.{1:03d}".format(name, suffix)
+        block = self.factory(unique_name, *args)
+        self[unique_name] = block
+        return block
+
+    def __iter__(self):
+        return iter(self.values())
+
+
+def make_module():
+    bpy = types.ModuleType("bpy")
+    bpy.data = types.SimpleNamespace(
+        meshes=FakeDataBlocks(FakeMesh),
+        objects=FakeDataBlocks(FakeObject),
+        collections=FakeDataBlocks(FakeCollectionData),
+        materials=FakeDataBlocks(FakeMaterial),
+        texts=FakeDataBlocks(FakeText),
+    )
+    bpy.context = types.SimpleNamespace(
+        scene=types.SimpleNamespace(
+            collection=FakeCollectionData("Scene Collection"), camera=None,
+            render=types.SimpleNamespace(engine='BLENDER_EEVEE'),
+            cycles=types.SimpleNamespace(shading_system=False),
+        )
+    )
+    bpy.types = types.SimpleNamespace(Mesh=FakeMesh, Object=FakeObject)
+    bpy.app = types.SimpleNamespace(version=(4, 2, 0))
+    bpy.data.filepath = ""
+    # Blender's "//" prefix is relative to the .blend file
+    bpy.path = types.SimpleNamespace(abspath=lambda path: os.path.join(os.path.dirname(bpy.data.filepath), path[2:])
+        if path.startswith("//") else path)
+    return bpy
+
+
+def install():
+    # Registers a fresh fake as `bpy` and returns it
+    bpy = make_module()
+    sys.modules["bpy"] = bpy
+    return bpy
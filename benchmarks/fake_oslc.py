@@ -0,0 +1,65 @@
+# A stand-in for the OSL compiler, so osl_cache.py and genTexture.py can be
+# checked where oslc isn't installed.
+#
+#   import fake_oslc
+#   os.environ["OSLC"] = fake_oslc.install(directory)   # before importing osl_cache
+#
+# Like oslc it fails when an #include doesn't resolve on the include path,
+# and writes a placeholder .oso otherwise. Every compile is appended to
+# compiled.log in the directory it was installed to.
+import os
+import re
+import sys
+
+include_pattern = re.compile(r'^\s*#\s*include\s+[<"]([^">]+)[">]', re.MULTILINE)
+
+
+def install(directory):
+    # Writes an executable `oslc` into directory and returns its path
+    path = os.path.join(directory, "oslc")
+    with open(path, "w") as f:
+        f.write('#!/bin/sh\nFAKE_OSLC_DIR="{0}" exec "{1}" "{2}" "$@"\n'.format(
+            os.path.abspath(directory), sys.executable, os.path.abspath(__file__)))
+    os.chmod(path, 0o755)
+    return path
+
+
+def compiles(directory):
+    # The .osl files compiled so far, in order
+    log = os.path.join(directory, "compiled.log")
+    if not os.path.isfile(log):
+        return []
+    with open(log) as f:
+        return f.read().splitlines()
+
+
+def main(argv):
+    output = None
+    include_dirs = []
+    sources = []
+    args = iter(argv)
+    for arg in args:
+        if arg == "-o":
+            output = next(args)
+        elif arg.startswith("-I"):
+            include_dirs.append(arg[2:])
+        elif not arg.startswith("-"):
+            sources.append(arg)
+
+    source = sources[0]
+    with open(source) as f:
+        text = f.read()
+    for name in include_pattern.findall(text):
+        if not any(os.path.isfile(os.path.join(d, name)) for d in include_dirs):
+            sys.stderr.write("{0}: error: Could not find include file \"{1}\"\n".format(source, name))
+            return 1
+
+    with open(output, "w") as f:
+        f.write("OpenShadingLanguage 1.00\n# {0}\n".format(os.path.basename(source)))
+    with open(os.path.join(os.environ["FAKE_OSLC_DIR"], "compiled.log"), "a") as f:
+        f.write(os.path.abspath(source) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
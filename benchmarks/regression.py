@@ -0,0 +1,270 @@
+# Benchmark and regression suite for geometry generation, run outside of
+# Blender against the fake bpy from fake_bpy.py. Every case is timed across
+# a matrix of iteration counts and profile sizes, reporting throughput
+# (vertices, points or samples per second), peak traced memory and a hash
+# of the geometry it produced.
+#
+#   python benchmarks/regression.py --save baseline.json
+#   python benchmarks/regression.py --baseline baseline.json [--tolerance 0.25]
+#
+# Against a baseline, the run fails (exit status 1) when a case's
+# throughput drops by more than the tolerance or its output hash changes,
+# so an optimization has to produce the same geometry to pass. Throughput
+# only compares meaningfully on the machine the baseline was saved on;
+# hashes compare anywhere with the same NumPy.
+import argparse
+import gc
+import hashlib
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import fake_bpy
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, ".."))
+sys.path.append(os.path.join(here, "..", "Misc"))
+
+bpy = fake_bpy.install()
+
+import extrude
+from Submission import sweep, geometry, profiles
+from Submission.growth import Linear, Quadratic, Power, Piecewise
+from Submission.noise import PerlinNoiseFactory
+
+
+def output_hash(array):
+    array = np.ascontiguousarray(array)
+    h = hashlib.sha1(str((array.dtype.str, array.shape)).encode("utf-8"))
+    h.update(array.tobytes())
+    return h.hexdigest()
+
+
+def last_mesh_vertices():
+    mesh = list(bpy.data.meshes.values())[-1]
+    return mesh.vertices.data["co"].reshape(-1, 3)
+
+
+def reset_scene():
+    for blocks in (bpy.data.meshes, bpy.data.objects, bpy.data.collections):
+        blocks.clear()
+    bpy.context.scene.collection.children.clear()
+
+
+def make_axis(iterations, profile_points):
+    # The classical shell, growing for the last quarter of its iterations
+    l = 1.01
+    k = iterations * 3 // 4
+    return geometry.coiling_axis(
+        geometry.Vector3(0, 0, 0), geometry.Vector3(0, 0, 1), geometry.Vector3(1, 0, 0),
+        Linear(math.pi, divisor=18), Power(5, l, k), Power(1, l, k), Power(1, l, k),
+        profiles.circle(1, profile_points), iterations
+    )
+
+
+# Each case maps (iterations, profile points) to (items, run), where run()
+# does the timed work and returns the output to hash. Cases with a limit
+# are skipped once items exceeds it (the pure Python paths).
+
+def case_generate_sweep(bulk, surface=False):
+    def setup(iterations, profile_points):
+        def run():
+            sweep.USE_BULK_UPLOAD = bulk
+            sweep.NORMALS_AND_UVS = surface
+            sweep.MESH_CACHE = None
+            sweep.generate_sweep(make_axis(iterations, profile_points))
+            if surface:
+                mesh = list(bpy.data.meshes.values())[-1]
+                return np.concatenate([last_mesh_vertices().ravel(), mesh.custom_normals.ravel(),
+                    mesh.uv_layers["UVMap"].data.data["uv"]])
+            return last_mesh_vertices()
+        return (iterations - 1) * profile_points, run
+    return setup
+
+
+def case_generate_sweep_array(iterations, profile_points):
+    def run():
+        return geometry.generate_sweep_array(make_axis(iterations, profile_points))
+    return (iterations - 1) * profile_points, run
+
+
+def case_growth(iterations, profile_points):
+    # Growth functions over an index array, including an integer base raised
+    # to negative powers
+    functions = [Linear(math.pi, divisor=18), Quadratic(1, -2, 3, divisor=profile_points),
+        Power(0.0075, 2, iterations - 10), Power(0.5, 1.03, iterations * 3 // 4, divisor=6),
+        Piecewise([(0, 1), (iterations // 2, Power(1, 2, iterations))])]
+    n = np.arange(1, iterations)
+
+    def run():
+        return np.stack([np.broadcast_to(f(n), n.shape) for f in functions])
+    return len(functions) * len(n), run
+
+
+def case_interpolate_mesh(bulk):
+    def setup(iterations, profile_points):
+        start = extrude.profile_at(profiles.circle(1, profile_points), 0, 0, 0)
+        end = extrude.profile_at(profiles.square(2, profile_points), 0, 0, 10)
+
+        def run():
+            extrude.USE_BULK_UPLOAD = bulk
+            extrude.MESH_CACHE = None
+            extrude.interpolate_mesh(start, end, iterations)
+            return last_mesh_vertices()
+        return (iterations + 1) * profile_points, run
+    return setup
+
+
+def case_profiles(iterations, profile_points):
+    # Building the unit tables from scratch, then scaling cached copies
+    def run():
+        profiles.unit_profile.cache_clear()
+        shapes = [profiles.circle(2, profile_points), profiles.square(2, profile_points),
+            profiles.hexagon(2, profile_points), profiles.polygon(5, 2, profile_points)]
+        for _ in range(iterations):
+            profiles.circle(1.5, profile_points)
+        return np.concatenate(shapes)
+    return (4 + iterations) * profile_points, run
+
+
+def case_noise(vectorized):
+    def setup(iterations, profile_points):
+        points = np.random.default_rng(0).uniform(-20, 20, size=(iterations * profile_points, 3))
+
+        def run():
+            perlin = PerlinNoiseFactory(3, octaves=4, seed=0)
+            if vectorized:
+                return perlin.noise_array(points)
+            return np.array([perlin(*p) for p in points.tolist()])
+        return len(points), run
+    return setup
+
+
+cases = [
+    ("generate_sweep", case_generate_sweep(True), None),
+    ("generate_sweep (legacy loop)", case_generate_sweep(False), 100000),
+    ("generate_sweep (normals, uvs)", case_generate_sweep(True, True), None),
+    ("generate_sweep_array", case_generate_sweep_array, None),
+    ("growth functions", case_growth, None),
+    ("interpolate_mesh", case_interpolate_mesh(True), None),
+    ("interpolate_mesh (legacy loop)", case_interpolate_mesh(False), 100000),
+    ("profiles", case_profiles, None),
+    ("noise_array", case_noise(True), None),
+    ("PerlinNoiseFactory", case_noise(False), 50000),
+]
+
+
+def measure(setup, iterations, profile_points, repeat, min_time=0.2):
+    items, run = setup(iterations, profile_points)
+
+    # Best of at least `repeat` runs, and of enough runs to take min_time,
+    # so fast cases aren't at the mercy of a single noisy timing
+    best = float("inf")
+    runs = 0
+    total = 0.0
+    while runs < repeat or (total < min_time and runs < 100):
+        reset_scene()
+        # As timeit does, keep the collector out of the timings; what earlier
+        # cases left on the heap would otherwise slow down later ones
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            output = run()
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        best = min(best, elapsed)
+        total += elapsed
+        runs += 1
+
+    # A separate run for memory, since tracing slows everything down
+    reset_scene()
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    reset_scene()
+
+    return {
+        "items": items,
+        "seconds": best,
+        "rate": items / best,
+        "peak_bytes": peak,
+        "hash": output_hash(output),
+    }
+
+
+def run_suite(iteration_counts, profile_sizes, repeat, only=None, min_time=0.2):
+    results = {}
+    for name, setup, limit in cases:
+        if only and not any(word in name for word in only):
+            continue
+        for iterations in iteration_counts:
+            for profile_points in profile_sizes:
+                if limit and iterations * profile_points > limit:
+                    continue
+                key = "{0} [{1} x {2}]".format(name, iterations, profile_points)
+                results[key] = measure(setup, iterations, profile_points, repeat, min_time)
+                r = results[key]
+                print("{0:48s} {1:12.0f}/s {2:9.1f} MiB  {3}".format(
+                    key, r["rate"], r["peak_bytes"] / 2 ** 20, r["hash"][:12]))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    # Returns a list of failure messages
+    failures = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        expected = baseline[key]
+        if result["hash"] != expected["hash"]:
+            failures.append("{0}: output changed ({1} != {2})".format(key, result["hash"][:12], expected["hash"][:12]))
+        if result["rate"] < expected["rate"] * (1 - tolerance):
+            failures.append("{0}: {1:.0f}/s is {2:.0%} slower than the baseline {3:.0f}/s".format(
+                key, result["rate"], 1 - result["rate"] / expected["rate"], expected["rate"]))
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time geometry generation and check it against a baseline.")
+    parser.add_argument("--iterations", type=int, nargs="+", default=[100, 1000, 4000])
+    parser.add_argument("--profiles", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--repeat", type=int, default=3, help="best of this many timed runs")
+    parser.add_argument("--min-time", type=float, default=0.2,
+        help="keep repeating a case until its runs add up to this many seconds")
+    parser.add_argument("--only", nargs="+", help="run only cases whose name contains one of these")
+    parser.add_argument("--save", help="write the results to this JSON baseline")
+    parser.add_argument("--baseline", help="compare against this JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+        help="allowed fractional drop in throughput before failing")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.iterations, args.profiles, args.repeat, args.only, args.min_time)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print("Saved {0} results to {1}".format(len(results), args.save))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        failures = compare(results, baseline, args.tolerance)
+        for failure in failures:
+            print("FAIL " + failure)
+        if failures:
+            return 1
+        print("OK: {0} cases within {1:.0%} of the baseline with identical output".format(
+            len([key for key in results if key in baseline]), args.tolerance))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())